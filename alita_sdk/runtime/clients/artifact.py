@@ -1,10 +1,12 @@
 
-from typing import Any
+from typing import Any, Generator
 from json import dumps
-import chardet
 import logging
 
-from alita_sdk.tools.utils.content_parser import parse_file_content
+from langchain_core.documents import Document
+from langchain_core.tools import ToolException
+
+from alita_sdk.tools.utils.content_parser import decode_text, iter_file_content, parse_file_content
 
 logger = logging.getLogger(__name__)
 
@@ -40,11 +42,11 @@ class Artifact:
             return ""
         if isinstance(data, dict) and data['error']:
             return f"{data['error']}. {data['content'] if data['content'] else ''}"
-        detected = chardet.detect(data)
-        if detected['encoding'] is not None:
-            return data.decode(detected['encoding'])
-        else:
-            return parse_file_content(file_name=artifact_name,
+        text_content = decode_text(data)
+        if text_content is not None:
+            return text_content
+        logger.debug(f"Artifact {artifact_name} is not text, parsing as document")
+        return parse_file_content(file_name=artifact_name,
                                   file_content=data,
                                   is_capture_image=is_capture_image,
                                   page_number=page_number,
@@ -52,6 +54,27 @@ class Artifact:
                                   excel_by_sheets=excel_by_sheets,
                                   llm=llm)
 
+    def iter_pages(self,
+                   artifact_name: str,
+                   bucket_name: str = None,
+                   is_capture_image: bool = False,
+                   llm = None) -> Generator[Document, None, None]:
+        """ Yield artifact content page by page (PDF pages, PPTX slides, Excel sheets) """
+        if not bucket_name:
+            bucket_name = self.bucket_name
+        data = self.client.download_artifact(bucket_name, artifact_name)
+        if isinstance(data, dict) and data['error']:
+            raise ToolException(f"{data['error']}. {data.get('content') or ''}")
+        if len(data) == 0:
+            return
+        text_content = decode_text(data)
+        if text_content is not None:
+            yield Document(page_content=text_content, metadata={'source': artifact_name, 'page': 1})
+            return
+        logger.debug(f"Artifact {artifact_name} is not text, parsing as document")
+        yield from iter_file_content(file_name=artifact_name, file_content=data,
+                                     is_capture_image=is_capture_image, llm=llm)
+
     def delete(self, artifact_name: str, bucket_name = None):
         if not bucket_name:
             bucket_name = self.bucket_name
@@ -1,6 +1,9 @@
+import copy
 import logging
 import requests
+from requests.adapters import HTTPAdapter
 from urllib.parse import quote
+from urllib3.util.retry import Retry
 
 from typing import Dict, List, Any, Optional
 
@@ -18,10 +21,37 @@ from .prompt import AlitaPrompt
 from .datasource import AlitaDataSource
 from .artifact import Artifact
 from ..langchain.chat_message_template import Jinja2TemplatedChatMessagesTemplate
+from ..utils.cache import InstanceCache, make_cache_key
 
 
 logger = logging.getLogger(__name__)
 
+# Metadata (configurations, integrations, secrets, app versions) is cached for this long by default
+METADATA_CACHE_TTL = 300
+
+
+def create_session(pool_connections: int = 10, pool_maxsize: int = 32,
+                   max_retries: int = 3, backoff_factor: float = 0.5) -> requests.Session:
+    """
+    HTTP session with keep-alive connection pooling and retries.
+
+    Only idempotent methods (GET, HEAD, PUT, DELETE, OPTIONS, TRACE) are retried on connection errors
+    and 429/502/503/504 responses, with exponential backoff honoring Retry-After.
+    """
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(429, 502, 503, 504),
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
 
 class ApiDetailsRequestError(Exception):
     ...
@@ -66,11 +96,47 @@ class AlitaClient:
         self.configurations_url = f'{self.base_url}{self.api_path}/integrations/integrations/default/{self.project_id}?section=configurations&unsecret=true'
         self.ai_section_url = f'{self.base_url}{self.api_path}/integrations/integrations/default/{self.project_id}?section=ai'
         self.configurations: list = configurations or []
+        self.session = create_session(
+            pool_maxsize=kwargs.get('http_pool_maxsize', 32),
+            max_retries=kwargs.get('http_max_retries', 3),
+        )
+        self._metadata_cache = InstanceCache(
+            maxsize=256, ttl=kwargs.get('metadata_cache_ttl', METADATA_CACHE_TTL), name="platform metadata"
+        )
+
+    def _get_cached(self, key: tuple, fetch):
+        """ Return a copy of cached metadata, fetching it if needed; fetch returns (value, cacheable) """
+        value = self._metadata_cache.get(key)
+        if value is None:
+            value, cacheable = fetch()
+            if not cacheable:
+                return value
+            self._metadata_cache.set(key, value)
+        # callers (e.g. application variables) modify returned data
+        return copy.deepcopy(value)
+
+    def invalidate_cache(self, kind: Optional[str] = None):
+        """
+        Drop cached metadata.
+
+        Args:
+            kind: one of 'configurations', 'integration', 'secret', 'app_version'; all metadata if not set
+        """
+        if kind is None:
+            self._metadata_cache.clear()
+            return
+        for key in self._metadata_cache.keys():
+            if key[0] == kind:
+                self._metadata_cache.invalidate(key)
+
+    def close(self):
+        """ Release pooled HTTP connections """
+        self.session.close()
 
     def get_mcp_toolkits(self):
         if user_id := self._get_real_user_id():
             url = f"{self.mcp_tools_list}/{user_id}"
-            data = requests.get(url, headers=self.headers, verify=False).json()
+            data = self.session.get(url, headers=self.headers, verify=False).json()
             return data
         else:
             return []
@@ -78,14 +144,14 @@ class AlitaClient:
     def mcp_tool_call(self, params: dict[str, Any]):
         if user_id := self._get_real_user_id():
             url = f"{self.mcp_tools_call}/{user_id}"
-            data = requests.post(url, headers=self.headers, json=params, verify=False).json()
+            data = self.session.post(url, headers=self.headers, json=params, verify=False).json()
             return data
         else:
             return f"Error: Could not determine user ID for MCP tool call"
 
     def prompt(self, prompt_id, prompt_version_id, chat_history=None, return_tool=False):
         url = f"{self.prompt_versions}/{prompt_id}/{prompt_version_id}"
-        data = requests.get(url, headers=self.headers, verify=False).json()
+        data = self.session.get(url, headers=self.headers, verify=False).json()
         model_settings = data['model_settings']
         messages = [SystemMessage(content=data['context'])]
         variables = {}
@@ -114,12 +180,12 @@ class AlitaClient:
             return template
         else:
             url = f"{self.prompts}/{prompt_id}"
-            data = requests.get(url, headers=self.headers, verify=False).json()
+            data = self.session.get(url, headers=self.headers, verify=False).json()
             return AlitaPrompt(self, template, data['name'], data['description'], model_settings)
 
     def get_app_details(self, application_id: int):
         url = f"{self.app}/{application_id}"
-        data = requests.get(url, headers=self.headers, verify=False).json()
+        data = self.session.get(url, headers=self.headers, verify=False).json()
         return data
 
     def get_list_of_apps(self):
@@ -130,7 +196,7 @@ class AlitaClient:
 
         while total_count is None or offset < total_count:
             params = {'offset': offset, 'limit': limit}
-            resp = requests.get(self.list_apps_url, headers=self.headers, params=params, verify=False)
+            resp = self.session.get(self.list_apps_url, headers=self.headers, params=params, verify=False)
 
             if resp.ok:
                 data = resp.json()
@@ -143,13 +209,15 @@ class AlitaClient:
         return apps
             
     def fetch_available_configurations(self) -> list:
-        resp = requests.get(self.configurations_url, headers=self.headers, verify=False)
-        if resp.ok:
-            return resp.json()
-        return []
+        def _fetch():
+            resp = self.session.get(self.configurations_url, headers=self.headers, verify=False)
+            if resp.ok:
+                return resp.json(), True
+            return [], False
+        return self._get_cached(('configurations',), _fetch)
 
     def all_models_and_integrations(self):
-        resp = requests.get(self.ai_section_url, headers=self.headers, verify=False)
+        resp = self.session.get(self.ai_section_url, headers=self.headers, verify=False)
         if resp.ok:
             return resp.json()
         return []
@@ -190,23 +258,40 @@ class AlitaClient:
         else:
             configs = self.fetch_available_configurations()
 
-        resp = requests.patch(url, headers=self.headers, verify=False, json={'configurations': configs})
-        if resp.ok:
-            return resp.json()
+        def _fetch():
+            resp = self.session.patch(url, headers=self.headers, verify=False, json={'configurations': configs})
+            if resp.ok:
+                return resp.json(), True
+            return resp, False
+
+        resp = self._get_cached(
+            ('app_version', application_id, application_version_id, make_cache_key(configs)), _fetch
+        )
+        if not isinstance(resp, requests.Response):
+            return resp
         logger.error(f"Failed to fetch application version details: {resp.status_code} - {resp.text}."
                      f" Application ID: {application_id}, Version ID: {application_version_id}")
         raise ApiDetailsRequestError(f"Failed to fetch application version details for {application_id}/{application_version_id}.")
 
     def get_integration_details(self, integration_id: str, format_for_model: bool = False):
         url = f"{self.integration_details}/{integration_id}"
-        data = requests.get(url, headers=self.headers, verify=False).json()
-        return data
+
+        def _fetch():
+            resp = self.session.get(url, headers=self.headers, verify=False)
+            return resp.json(), resp.ok
+
+        return self._get_cached(('integration', integration_id), _fetch)
 
     def unsecret(self, secret_name: str):
         url = f"{self.secrets_url}/{secret_name}"
-        data = requests.get(url, headers=self.headers, verify=False).json()
-        logger.info(f"Unsecret response: {data}")
-        return data.get('value', None)
+
+        def _fetch():
+            resp = self.session.get(url, headers=self.headers, verify=False)
+            data = resp.json()
+            logger.info(f"Unsecret response: {data}")
+            return data.get('value', None), resp.ok
+
+        return self._get_cached(('secret', secret_name), _fetch)
 
     def application(self, application_id: int, application_version_id: int,
                     tools: Optional[list] = None, chat_history: Optional[List[Any]] = None,
@@ -263,7 +348,7 @@ class AlitaClient:
 
     def datasource(self, datasource_id: int) -> AlitaDataSource:
         url = f"{self.datasources}/{datasource_id}"
-        response = requests.get(url, headers=self.headers, verify=False)
+        response = self.session.get(url, headers=self.headers, verify=False)
         if not response.ok:
             raise Exception(f'Datasource request failed with code {response.status_code}\n{response.content}')
         data = response.json()
@@ -300,7 +385,7 @@ class AlitaClient:
     def bucket_exists(self, bucket_name):
         try:
             resp = self._process_requst(
-                requests.get(f'{self.bucket_url}', headers=self.headers, verify=False)
+                self.session.get(f'{self.bucket_url}', headers=self.headers, verify=False)
             )
             for each in resp.get('rows', []):
                 if each['name'] == bucket_name:
@@ -315,24 +400,24 @@ class AlitaClient:
             "expiration_measure": expiration_measure,
             "expiration_value": expiration_value
         }
-        resp = requests.post(f'{self.bucket_url}', headers=self.headers, json=post_data, verify=False)
+        resp = self.session.post(f'{self.bucket_url}', headers=self.headers, json=post_data, verify=False)
         return self._process_requst(resp)
 
     def list_artifacts(self, bucket_name: str):
         url = f'{self.artifacts_url}/{bucket_name}'
-        data = requests.get(url, headers=self.headers, verify=False)
+        data = self.session.get(url, headers=self.headers, verify=False)
         return self._process_requst(data)
 
     def create_artifact(self, bucket_name, artifact_name, artifact_data):
         url = f'{self.artifacts_url}/{bucket_name.lower()}'
-        data = requests.post(url, headers=self.headers, files={
+        data = self.session.post(url, headers=self.headers, files={
             'file': (artifact_name, artifact_data)
         }, verify=False)
         return self._process_requst(data)
 
     def download_artifact(self, bucket_name, artifact_name):
         url = f'{self.artifact_url}/{bucket_name.lower()}/{artifact_name}'
-        data = requests.get(url, headers=self.headers, verify=False)
+        data = self.session.get(url, headers=self.headers, verify=False)
         if data.status_code == 403:
             return {"error": "You are not authorized to access this resource"}
         elif data.status_code == 404:
@@ -346,7 +431,7 @@ class AlitaClient:
 
     def delete_artifact(self, bucket_name, artifact_name):
         url = f'{self.artifact_url}/{bucket_name}/{quote(artifact_name)}'
-        data = requests.delete(url, headers=self.headers, verify=False)
+        data = self.session.delete(url, headers=self.headers, verify=False)
         return self._process_requst(data)
 
     def _prepare_messages(self, messages: list[BaseMessage]):
@@ -387,7 +472,7 @@ class AlitaClient:
     def async_predict(self, messages: list[BaseMessage], model_settings: dict, variables: list[dict] = None):
         # TODO: Modify to make it appropriate stream response
         prompt_data = self._prepare_payload(messages, model_settings, variables)
-        response = requests.post(self.predict_url, headers=self.headers, json=prompt_data, verify=False)
+        response = self.session.post(self.predict_url, headers=self.headers, json=prompt_data, verify=False)
         logger.info(response.content)
         response_data = response.json()
         for message in response_data['messages']:
@@ -398,7 +483,7 @@ class AlitaClient:
 
     def predict(self, messages: list[BaseMessage], model_settings: dict, variables: list[dict] = None):
         prompt_data = self._prepare_payload(messages, model_settings, variables)
-        response = requests.post(self.predict_url, headers=self.headers, json=prompt_data, verify=False)
+        response = self.session.post(self.predict_url, headers=self.headers, json=prompt_data, verify=False)
         
         if response.status_code != 200:
             logger.error(f"Error in response of predict: {response.content}")
@@ -433,7 +518,7 @@ class AlitaClient:
         if datasource_predict_settings is not None:
             data["datasource_predict_settings"] = datasource_predict_settings
         headers = self.headers | {"Content-Type": "application/json"}
-        response = requests.post(f"{self.datasources_predict}/{datasource_id}", headers=headers, json=data,
+        response = self.session.post(f"{self.datasources_predict}/{datasource_id}", headers=headers, json=data,
                                  verify=False).json()
         return AIMessage(content=response['response'], additional_kwargs={"references": response['references']})
 
@@ -455,7 +540,7 @@ class AlitaClient:
             "str_content": True
         }
         headers = self.headers | {"Content-Type": "application/json"}
-        response = requests.post(f"{self.datasources_search}/{datasource_id}", headers=headers, json=data, verify=False)
+        response = self.session.post(f"{self.datasources_search}/{datasource_id}", headers=headers, json=data, verify=False)
         if not response.ok:
             raise Exception(f'Search request failed with code {response.status_code}\n{response.content}')
         resp_data = response.json()
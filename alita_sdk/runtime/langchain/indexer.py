@@ -68,6 +68,7 @@ def main(
         summarize,
         llm_predict,
         add_documents,
+        with_embeddings_cache,
     )
     from .interfaces.loaders import loader
     from .interfaces.splitters import Splitter
@@ -97,6 +98,11 @@ def main(
     # 5. Embedder and its params to get embeddings (for the splitted data)
     #
     embedding = get_embeddings(embedding_model, embedding_model_params)
+    if isinstance(indexer_extras, dict) and indexer_extras.get("embedding_cache_path"):
+        # unchanged chunks are taken from persistent cache instead of being re-embedded after pre-cleanup
+        embedding = with_embeddings_cache(
+            embedding, embedding_model, embedding_model_params, indexer_extras["embedding_cache_path"],
+        )
     vectorstore = get_vectorstore(vectorstore, vectorstore_params, embedding_func=embedding)
     #
     vectoradapter = VectorAdapter(
@@ -126,8 +132,10 @@ def main(
         loader_params['llm'] = llmodel
     #
     # Delete stale 'dataset' documents from vectorstore before (re-)indexing
-    vectoradapter.delete_dataset(dataset)
+    deleted = vectoradapter.delete_dataset(dataset)
     vectoradapter.persist()
+    if deleted is not None:
+        log.info("Deleted %d stale documents of dataset %s", deleted, dataset)
     #
     vectoradapter.vacuum()
     #
@@ -651,11 +659,14 @@ def deduplicate(
         preview_top=15,
         exclude_fields=None, # List of strings which should not participate in comparison
         show_additional_metadata=False, # the checkbox which will allow the metadata to be shown in main report
+        tile_size=1024, # size of score matrix tiles (memory is O(tile_size^2))
+        approximate=False, # score only LSH candidate pairs (for very large libraries)
 ):
     """ Deduplication """
     #
     log.info("Importing packages")
     #
+    import numpy as np  # pylint: disable=C0415,E0401
     from langchain_core.documents import Document
     #
     from .interfaces.llm_processor import (
@@ -675,16 +686,29 @@ def deduplicate(
         embeddings=embedding,
     )
     #
-    data = vectoradapter.get_data(
-        where={"$and": [{"library": collection}, {"type": "data"}]},
-        include=["documents", "metadatas"],
-    )
+    data = {"documents": [], "metadatas": [], "embeddings": []}
+    # float32 matrix per batch (lists of python floats take ~8x more memory)
+    embedding_batches = []
+    #
+    # Stored embeddings are reused, documents are embedded only if vectors are not available
+    for batch in vectoradapter.iter_data(
+            where={"$and": [{"library": collection}, {"type": "data"}]},
+            include=["documents", "metadatas", "embeddings"],
+    ):
+        missing = [idx for idx, item in enumerate(batch["embeddings"]) if item is None]
+        if missing:
+            vectors = vectoradapter.embeddings.embed_documents([batch["documents"][idx] for idx in missing])
+            for idx, vector in zip(missing, vectors):
+                batch["embeddings"][idx] = vector
+        #
+        data["documents"].extend(batch["documents"])
+        data["metadatas"].extend(batch["metadatas"])
+        embedding_batches.append(np.asarray(batch["embeddings"], dtype=np.float32))
     #
-    log.debug("Got %d documents from vectoradapter", len(data["documents"]))
+    data["embeddings"] = np.vstack(embedding_batches) if embedding_batches else np.empty((0, 0), dtype=np.float32)
+    del embedding_batches
     #
-    data["embeddings"] = []
-    for doc_data in data["documents"]:
-        data["embeddings"].append(vectoradapter.embeddings.embed_query(doc_data))
+    log.debug("Got %d documents from vectoradapter", len(data["documents"]))
     #
     cutoff = cut_off_score
     cutoff_op = getattr(operator, cutoff_func)
@@ -747,7 +771,7 @@ def deduplicate(
                 )
             else:
                 items = vectorstore.similarity_search_by_vector_with_relevance_scores(
-                    data["embeddings"][idx],
+                    data["embeddings"][idx].tolist(),
                     k=search_top,
                 )
             #
@@ -844,105 +868,79 @@ def deduplicate(
             else:
                 embeddins_lib["sentences"].append(data["documents"][idx])
         #
-        from sentence_transformers import util
-        #
-        if score_func == "cdist":
-            import torch
-            score_op = torch.cdist
-            score_arg = torch.Tensor(embeddins_lib["embeddings"])
-        elif score_func in ["cos_sim", "dot_score"]:
-            score_op = getattr(util, score_func)
-            score_arg = embeddins_lib["embeddings"]
-        elif score_func in ["l2", "cosine", "ip"]:
-            import numpy
-            from chromadb.utils import distance_functions
-            score_op_func = getattr(distance_functions, score_func)
-            def score_op(a, b):
-                class _outer:
-                    def __getitem__(self, outer_key):
-                        class _inner:
-                            def __getitem__(self, inner_key):
-                                return score_op_func(
-                                    numpy.array(a[outer_key]),
-                                    numpy.array(b[inner_key])
-                                )
-                        return _inner()
-                return _outer()
-            score_arg = embeddins_lib["embeddings"]
-        else:
-            raise ValueError(f"Unknown score function: {score_func}")
-        #
-        # Ported and updated 'legacy' code below
+        from .tools.dedup import similar_pairs
         #
-        cosine_scores = score_op(score_arg, score_arg)
-        score_dim = len(embeddins_lib["embeddings"])
+        # Scores are computed in tiles, only pairs passing cutoff are kept
         #
-        for iindex in range(score_dim):
-            for jindex in range(score_dim):
-                score = cosine_scores[iindex][jindex]
+        for iindex, jindex, score in similar_pairs(
+                embeddins_lib["embeddings"],
+                score_func,
+                cutoff_op,
+                cutoff,
+                tile_size=tile_size,
+                approximate=approximate,
+        ):
+            #
+            # Add record:
+            # - pairs: for preview
+            # - row: for xlsx
+            #
+            record = {
+                "score": round(score, 3),
+                "pairs": {},
+                "row": {},
+            }
+            #
+            if isinstance(embeddins_lib["sentences"][iindex], str):
+                col1, col2 = equalize_markdown(
+                    embeddins_lib["sentences"][iindex],
+                    embeddins_lib["sentences"][jindex]
+                )
                 #
-                if cutoff_op(score, cutoff) and iindex < jindex:
-                    #
-                    # Add record:
-                    # - pairs: for preview
-                    # - row: for xlsx
-                    #
-                    record = {
-                        "score": round(score.item(), 3),
-                        "pairs": {},
-                        "row": {},
-                    }
-                    #
-                    if isinstance(embeddins_lib["sentences"][iindex], str):
+                record["pairs"]["Document Content #1"] = col1
+                record["pairs"]["Document Content #2"] = col2
+                #
+                xcol1, xcol2 = equalize_openpyxl(
+                    embeddins_lib["sentences"][iindex],
+                    embeddins_lib["sentences"][jindex]
+                )
+                #
+                record["row"]["Document Content #1"] = xcol1
+                record["row"]["Document Content #2"] = xcol2
+            else:
+                for col in embeddins_lib["sentences"][0].keys():
+                    # For the columns excluded from comparizon don't do the difference analysis since they are used only for grouping the results
+                    if col in excluded_fields_set:
+                        col1, col2 = (embeddins_lib["sentences"][iindex][col],
+                                      embeddins_lib["sentences"][jindex][col])
+                        xcol1, xcol2 = (embeddins_lib["sentences"][iindex][col],
+                                        embeddins_lib["sentences"][jindex][col])
+                    else:
                         col1, col2 = equalize_markdown(
-                            embeddins_lib["sentences"][iindex],
-                            embeddins_lib["sentences"][jindex]
+                            embeddins_lib["sentences"][iindex][col],
+                            embeddins_lib["sentences"][jindex][col]
                         )
-                        #
-                        record["pairs"]["Document Content #1"] = col1
-                        record["pairs"]["Document Content #2"] = col2
-                        #
                         xcol1, xcol2 = equalize_openpyxl(
-                            embeddins_lib["sentences"][iindex],
-                            embeddins_lib["sentences"][jindex]
+                            embeddins_lib["sentences"][iindex][col],
+                            embeddins_lib["sentences"][jindex][col]
                         )
+                    # Set the columns content for markdown output
+                    record["pairs"][f'{col} #1'] = col1
+                    record["pairs"][f'{col} #2'] = col2
+                    # Set the columns content for Excel output
+                    record["row"][f'{col} #1'] = xcol1
+                    record["row"][f'{col} #2'] = xcol2
+                # Show the service data in the deduplication report
+                # Show service data only if special checkbox is switched on
+                if show_additional_metadata:
+                    for col in embeddins_lib["metadata"][0].keys():
+                        record["pairs"][f'{col} #1'] = embeddins_lib["metadata"][iindex][col]
+                        record["pairs"][f'{col} #2'] = embeddins_lib["metadata"][jindex][col]
                         #
-                        record["row"]["Document Content #1"] = xcol1
-                        record["row"]["Document Content #2"] = xcol2
-                    else:
-                        for col in embeddins_lib["sentences"][0].keys():
-                            # For the columns excluded from comparizon don't do the difference analysis since they are used only for grouping the results
-                            if col in excluded_fields_set:
-                                col1, col2 = (embeddins_lib["sentences"][iindex][col],
-                                              embeddins_lib["sentences"][jindex][col])
-                                xcol1, xcol2 = (embeddins_lib["sentences"][iindex][col],
-                                                embeddins_lib["sentences"][jindex][col])
-                            else:
-                                col1, col2 = equalize_markdown(
-                                    embeddins_lib["sentences"][iindex][col],
-                                    embeddins_lib["sentences"][jindex][col]
-                                )
-                                xcol1, xcol2 = equalize_openpyxl(
-                                    embeddins_lib["sentences"][iindex][col],
-                                    embeddins_lib["sentences"][jindex][col]
-                                )
-                            # Set the columns content for markdown output
-                            record["pairs"][f'{col} #1'] = col1
-                            record["pairs"][f'{col} #2'] = col2
-                            # Set the columns content for Excel output
-                            record["row"][f'{col} #1'] = xcol1
-                            record["row"][f'{col} #2'] = xcol2
-                        # Show the service data in the deduplication report
-                        # Show service data only if special checkbox is switched on
-                        if show_additional_metadata:
-                            for col in embeddins_lib["metadata"][0].keys():
-                                record["pairs"][f'{col} #1'] = embeddins_lib["metadata"][iindex][col]
-                                record["pairs"][f'{col} #2'] = embeddins_lib["metadata"][jindex][col]
-                                #
-                                record["row"][f'{col} #1'] = embeddins_lib["metadata"][iindex][col]
-                                record["row"][f'{col} #2'] = embeddins_lib["metadata"][jindex][col]
-                    # Append the result record to the records which will be shown in the deduplication report
-                    records.append(record)
+                        record["row"][f'{col} #1'] = embeddins_lib["metadata"][iindex][col]
+                        record["row"][f'{col} #2'] = embeddins_lib["metadata"][jindex][col]
+            # Append the result record to the records which will be shown in the deduplication report
+            records.append(record)
     #
     # Sort by score
     #
@@ -983,8 +981,13 @@ def delete(
         dataset: str = None,
         library: str = None,
         quota_params=None,
+        dry_run=False,
 ):
-    """ Delete dataset documents from vectorstore """
+    """ Delete dataset documents from vectorstore
+
+    Returns number of deleted documents per dataset/library (None if not supported by vectorstore).
+    If dry_run is set, documents are only counted.
+    """
     #
     log.info("Importing packages")
     #
@@ -1012,14 +1015,18 @@ def delete(
         verbose=True,
     )
     #
+    result = {}
+    #
     if dataset is not None:
-        vectoradapter.delete_dataset(dataset)
-        vectoradapter.persist()
+        result["dataset"] = vectoradapter.delete_dataset(dataset, dry_run=dry_run)
     #
     if library is not None:
-        vectoradapter.delete_library(library)
-        vectoradapter.persist()
+        result["library"] = vectoradapter.delete_library(library, dry_run=dry_run)
+    #
+    if dry_run:
+        return result
     #
+    vectoradapter.persist()
     vectoradapter.vacuum()
     #
     vectoradapter.quota_check(
@@ -1027,3 +1034,5 @@ def delete(
         tag=f"Quota (after deletion of ds={dataset}, lib={library})",
         verbose=True,
     )
+    #
+    return result
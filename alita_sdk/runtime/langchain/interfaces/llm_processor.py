@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import importlib
+import os
 from json import dumps
 from traceback import format_exc
 from langchain.chains.llm import LLMChain
@@ -30,6 +31,8 @@ from langchain.prompts import PromptTemplate  # pylint: disable=E0401
 from langchain.schema import HumanMessage, SystemMessage
 
 from ...llms.preloaded import PreloadedEmbeddings, PreloadedChatModel  # pylint: disable=E0401
+from ...llms.cached_embeddings import CachedEmbeddings, EmbeddingCacheStore
+from ...utils.cache import InstanceCache, make_cache_key
 from ..retrievers.AlitaRetriever import AlitaRetriever
 from ..tools.log import print_log
 
@@ -84,6 +87,69 @@ def get_embeddings(embeddings_model: str, embeddings_params: dict):
     raise RuntimeError(f"Unknown Embedding type: {embeddings_model}")
 
 
+def _dispose_vectorstore(_key, vectorstore):
+    """ Release DB resources held by evicted vectorstore """
+    for attr in ("_engine", "_bind"):
+        engine = getattr(vectorstore, attr, None)
+        if engine is not None and hasattr(engine, "dispose"):
+            engine.dispose()
+            break
+
+
+# Process-wide caches of heavy objects: local embedding models are loaded once
+# and vectorstores (with their SQLAlchemy engines) are reused across tool calls
+EMBEDDINGS_CACHE = InstanceCache(maxsize=8, name="embeddings")
+VECTORSTORE_CACHE = InstanceCache(maxsize=32, ttl=3600, on_evict=_dispose_vectorstore, name="vectorstores")
+EMBEDDING_CACHE_STORES = InstanceCache(maxsize=0, name="embedding cache stores")
+
+
+def with_embeddings_cache(embeddings, embeddings_model: str, embeddings_params: dict, cache_path: str = None):
+    """ Wrap *Embeddings with persistent content-hash cache (SQLite database at cache_path)
+
+    Vectors are keyed by embedding model, hash of its params and sha256 of text,
+    so unchanged chunks are never sent to the embedding provider again.
+    """
+    if embeddings is None or not cache_path:
+        return embeddings
+    cache_path = os.path.abspath(cache_path)
+    store = EMBEDDING_CACHE_STORES.get_or_create(cache_path, lambda: EmbeddingCacheStore(cache_path))
+    return CachedEmbeddings(embeddings, store, namespace=make_cache_key(embeddings_model, embeddings_params))
+
+
+def get_cached_embeddings(embeddings_model: str, embeddings_params: dict, cache_path: str = None):
+    """ Get *Embeddings from process-wide cache keyed by model and its params
+
+    Args:
+        cache_path: optional path of persistent embeddings cache database (see with_embeddings_cache)
+    """
+    if embeddings_model is None:
+        return None
+    return EMBEDDINGS_CACHE.get_or_create(
+        make_cache_key(embeddings_model, embeddings_params, cache_path),
+        lambda: with_embeddings_cache(
+            get_embeddings(embeddings_model, embeddings_params),
+            embeddings_model, embeddings_params, cache_path
+        )
+    )
+
+
+def get_cached_vectorstore(vectorstore_type, vectorstore_params, embedding_func=None, embedding_key=None):
+    """ Get vector store obj from process-wide cache keyed by connection/collection params and embeddings
+
+    Args:
+        embedding_key: stable identity of embeddings (e.g. model name and params);
+            identity of embedding_func object is used if not provided
+    """
+    if vectorstore_type is None:
+        return None
+    if embedding_key is None:
+        embedding_key = id(embedding_func)
+    return VECTORSTORE_CACHE.get_or_create(
+        make_cache_key(vectorstore_type, vectorstore_params, embedding_key),
+        lambda: get_vectorstore(vectorstore_type, vectorstore_params, embedding_func=embedding_func)
+    )
+
+
 def summarize(llmodel, document, summorization_prompt, metadata_key='document_summary'):
     if llmodel is None:
         return document
@@ -172,10 +238,8 @@ def get_vectorstore(vectorstore_type, vectorstore_params, embedding_func=None):
     #
     raise RuntimeError(f"Unknown VectorStore type: {vectorstore_type}")
 
-def add_documents(vectorstore, documents):
-    """ Add documents to vectorstore """
-    if vectorstore is None:
-        return None
+def prepare_documents(documents):
+    """ Split documents to texts and metadatas suitable for vectorstore (lists and dicts are serialized) """
     texts = []
     metadata = []
     for document in documents:
@@ -186,6 +250,13 @@ def add_documents(vectorstore, documents):
             if isinstance(document.metadata[key], dict):
                 document.metadata[key] = dumps(document.metadata[key])
         metadata.append(document.metadata)
+    return texts, metadata
+
+def add_documents(vectorstore, documents):
+    """ Add documents to vectorstore """
+    if vectorstore is None:
+        return None
+    texts, metadata = prepare_documents(documents)
     vectorstore.add_texts(texts, metadatas=metadata)
 
 
@@ -1,5 +1,7 @@
 import logging
-from typing import Union, Any, Optional, Annotated, get_type_hints
+from collections import defaultdict
+from copy import copy
+from typing import Union, Any, Optional, Annotated, NamedTuple, get_type_hints
 from uuid import uuid4
 from typing import Dict
 
@@ -15,6 +17,7 @@ from langgraph.graph import StateGraph
 from langgraph.graph.graph import END, START
 from langgraph.graph.state import CompiledStateGraph
 from langgraph.managed.base import is_managed_value
+from langgraph.pregel.write import ChannelWrite
 from langgraph.prebuilt import InjectedStore
 from langgraph.store.base import BaseStore
 
@@ -26,7 +29,8 @@ from ..tools.llm import LLMNode
 from ..tools.loop import LoopNode
 from ..tools.loop_output import LoopToolNode
 from ..tools.tool import ToolNode
-from ..utils.evaluate import EvaluateTemplate
+from ..utils.cache import InstanceCache, make_cache_key
+from ..utils.evaluate import EvaluateTemplate, compile_template, precompile_template, summarize_state
 from ..utils.utils import clean_string, TOOLKIT_SPLITTER
 from ..tools.router import RouterNode
 
@@ -125,12 +129,13 @@ class ConditionalEdge(Runnable):
     def __init__(self, condition: str, condition_inputs: Optional[list[str]] = [],
                  conditional_outputs: Optional[list[str]] = [], default_output: str = END):
         self.condition = condition
+        self.condition_template = precompile_template(condition)
         self.condition_inputs = condition_inputs
         self.conditional_outputs = {clean_string(cond if not 'END' == cond else '__end__') for cond in conditional_outputs}
         self.default_output = clean_string(default_output)
 
     def invoke(self, state: Annotated[BaseStore, InjectedStore()], config: Optional[RunnableConfig] = None) -> str:
-        logger.info(f"Current state in condition edge - {state}")
+        logger.info("Current state in condition edge - %s", summarize_state(state))
         input_data = {}
         for field in self.condition_inputs:
             if field == 'messages':
@@ -139,7 +144,7 @@ class ConditionalEdge(Runnable):
                 input_data['last_message'] = state['messages'][-1].content
             else:
                 input_data[field] = state.get(field, "")
-        template = EvaluateTemplate(self.condition, input_data)
+        template = EvaluateTemplate(self.condition, input_data, template=self.condition_template)
         result = template.evaluate()
         if isinstance(result, str):
             result = clean_string(result)
@@ -176,6 +181,12 @@ Answer only with step name, no need to add descrip in case none of the steps are
         self.decisional_inputs = decisional_inputs
         self.default_output = default_output if default_output != 'END' else END
 
+    def bind_client(self, client) -> 'DecisionEdge':
+        """ Copy of the edge using another LLM client """
+        edge = copy(self)
+        edge.client = client
+        return edge
+
     def invoke(self, state: Annotated[BaseStore, InjectedStore()], config: Optional[RunnableConfig] = None) -> str:
         additional_info = ""
         decision_input = []
@@ -239,12 +250,13 @@ class StateModifierNode(Runnable):
                  input_variables: Optional[list[str]] = None, 
                  output_variables: Optional[list[str]] = None):
         self.template = template
+        self.compiled_template = precompile_template(template)
         self.variables_to_clean = variables_to_clean or []
         self.input_variables = input_variables or ["messages"]
         self.output_variables = output_variables or []
 
     def invoke(self, state: Annotated[BaseStore, InjectedStore()], config: Optional[RunnableConfig] = None) -> dict:
-        logger.info(f"Modifying state with template: {self.template}")
+        logger.debug(f"Modifying state with template: {self.template}")
 
         # Collect input variables from state
         input_data = {}
@@ -253,8 +265,8 @@ class StateModifierNode(Runnable):
                 input_data[var] = state.get(var)
 
         # Render the template using Jinja
-        from jinja2 import Template
-        rendered_message = Template(self.template).render(**input_data)
+        template = self.compiled_template or compile_template(self.template)
+        rendered_message = template.render(**input_data)
         result = {}
         # Store the rendered message in the state or messages
         if len(self.output_variables) > 0:
@@ -280,7 +292,7 @@ class StateModifierNode(Runnable):
                 else:
                     # For other types, set to None
                     result[var] = None
-        logger.info(f"State modifier result: {result}")
+        logger.info("State modifier result: %s", summarize_state(result))
         return result
 
 
@@ -350,6 +362,153 @@ def prepare_output_schema(lg_builder, memory, store, debug=False, interrupt_befo
     return compiled
 
 
+def _tools_by_name(tools: list) -> dict:
+    """ Tools by name, last tool wins for duplicated names (as in the former per-node lookups) """
+    return {tool.name: tool for tool in tools}
+
+
+def _tool_signature(tool) -> tuple:
+    """ Name, type and arguments schema of a tool (compiled subgraphs have no arguments schema) """
+    args = None
+    if isinstance(tool, BaseTool):
+        try:
+            args = tool.args
+        except Exception:  # pylint: disable=W0703
+            args = None
+    return tool.name, type(tool).__name__, args
+
+
+def _graph_cache_key(yaml_schema: str, tools: list, debug: bool) -> str:
+    """ Key of compiled graph: schema, registered subgraphs and tool set """
+    subgraphs = [(name, entry.get('yaml')) for name, entry in sorted(SUBGRAPH_REGISTRY.items())]
+    return make_cache_key(yaml_schema, debug, subgraphs, [_tool_signature(tool) for tool in tools])
+
+
+class _ToolRef:
+    """ Name-only placeholder of a tool in cached graph templates """
+
+    def __init__(self, name: str):
+        self.name = name
+
+
+class _SubgraphRef(NamedTuple):
+    """ Placeholder of a SubgraphRunnable node in cached graph templates """
+    name: str
+    tool_name: str
+    input_mapping: Dict[str, Any]
+    output_mapping: Dict[str, Any]
+
+
+class GraphTemplate:
+    """
+    Compiled top-level graph which can be bound to per-request client, tools, memory and store.
+
+    Template holds no request objects: LLM client, tools, subgraphs, checkpointer and store are stripped
+    and node tools are kept as name references, resolved from the request tools on bind.
+    """
+
+    # node fields holding a single tool (looked up by tool name on bind)
+    tool_fields = ('tool', 'loop_tool', 'index_tool')
+
+    def __init__(self, graph: CompiledStateGraph, subgraph_schema: Optional[str] = None):
+        # unflattened schema, subgraph tools are taken from the registry on every bind
+        self.subgraph_schema = subgraph_schema
+        # nodes which use LLM client
+        self.client_nodes = frozenset(
+            key for key, node in graph.nodes.items() if getattr(node.bound, 'client', None) is not None
+        )
+        self.graph = self._copy_graph(graph, self._strip_node, client=None)
+
+    def _strip_node(self, key: str, runnable):
+        if isinstance(runnable, SubgraphRunnable):
+            return _SubgraphRef(runnable.name, runnable.inner.name, runnable.input_mapping, runnable.output_mapping)
+        if not isinstance(runnable, BaseTool):
+            # router, state modifier, state defaults: no request objects
+            return runnable
+        update = {}
+        if key in self.client_nodes:
+            update['client'] = None
+        for field in self.tool_fields:
+            tool = getattr(runnable, field, None)
+            if tool is not None:
+                update[field] = _ToolRef(tool.name)
+        if getattr(runnable, 'available_tools', None) is not None:
+            update['available_tools'] = [_ToolRef(tool.name) for tool in runnable.available_tools]
+        return runnable.model_copy(update=update) if update else runnable
+
+    def _bind_node(self, key: str, runnable, client, tools_by_name: dict):
+        if isinstance(runnable, _SubgraphRef):
+            return SubgraphRunnable(
+                inner=tools_by_name[runnable.tool_name],
+                name=runnable.name,
+                input_mapping=runnable.input_mapping,
+                output_mapping=runnable.output_mapping,
+            )
+        if not isinstance(runnable, BaseTool):
+            return runnable
+        update = {}
+        if key in self.client_nodes:
+            update['client'] = client
+        for field in self.tool_fields:
+            tool = getattr(runnable, field, None)
+            if tool is not None:
+                update[field] = tools_by_name[tool.name]
+        if getattr(runnable, 'available_tools', None) is not None:
+            update['available_tools'] = [tools_by_name[tool.name] for tool in runnable.available_tools]
+        return runnable.model_copy(update=update) if update else runnable
+
+    @staticmethod
+    def _copy_graph(graph: CompiledStateGraph, map_node, client, memory=None, store=None) -> CompiledStateGraph:
+        """ Copy of compiled graph and its builder with node runnables mapped and decision edges using client """
+        builder = copy(graph.builder)
+        builder.nodes = {key: spec._replace(runnable=map_node(key, spec.runnable))
+                         for key, spec in graph.builder.nodes.items()}
+        builder.branches = defaultdict(dict)
+        decision_nodes = set()
+        for start, branches in graph.builder.branches.items():
+            for name, branch in branches.items():
+                if isinstance(branch.path, DecisionEdge):
+                    branch = branch._replace(path=branch.path.bind_client(client))
+                    decision_nodes.add(start)
+                builder.branches[start][name] = branch
+        nodes = {}
+        for key, node in graph.nodes.items():
+            update = {}
+            if key in builder.nodes:
+                # subgraphs are found again from the new runnable
+                update.update(bound=builder.nodes[key].runnable, subgraphs=None)
+            if key in decision_nodes:
+                # branch writers hold decision edges: keep state writers only, branches are re-attached below
+                update['writers'] = [writer for writer in node.writers if isinstance(writer, ChannelWrite)]
+            nodes[key] = node.copy(update) if update else node
+        result = graph.copy(update={
+            "builder": builder,
+            "nodes": nodes,
+            "checkpointer": memory,
+            "store": store,
+            "schema_to_mapper": dict(graph.schema_to_mapper),
+        })
+        for start in decision_nodes:
+            for name, branch in builder.branches[start].items():
+                result.attach_branch(start, name, branch)
+        return result
+
+    def bind(self, client, tools: list, memory=None, store=None) -> CompiledStateGraph:
+        """ Copy of compiled graph with nodes and decision edges bound to request objects """
+        tools = list(tools)
+        if self.subgraph_schema is not None:
+            tools += detect_and_flatten_subgraphs(self.subgraph_schema)[1]
+        tools_by_name = _tools_by_name(tools)
+        return self._copy_graph(
+            self.graph, lambda key, runnable: self._bind_node(key, runnable, client, tools_by_name),
+            client, memory=memory, store=store,
+        )
+
+
+# Compiled top-level graphs by schema and tool set
+GRAPH_CACHE = InstanceCache(maxsize=32, name="graphs")
+
+
 def create_graph(
         client: Any,
         yaml_schema: str,
@@ -363,9 +522,24 @@ def create_graph(
 ):
     """ Create a message graph from a yaml schema """
 
+    # Top-level graphs are compiled once per schema and tool set, cached template is bound to request objects
+    cache_key = None
+    if not for_subgraph:
+        cache_key = _graph_cache_key(yaml_schema, tools, debug)
+        template = GRAPH_CACHE.get(cache_key)
+        if template is not None:
+            try:
+                return template.bind(client, tools, memory=memory, store=store)
+            except KeyError as e:
+                logger.warning(f"Cached graph can not be bound to tools, rebuilding: {e}")
+                GRAPH_CACHE.invalidate(cache_key)
+
+    subgraph_schema = None
     # For top-level graphs (not subgraphs), detect and flatten any subgraphs
     if not for_subgraph:
         flattened_yaml, additional_tools = detect_and_flatten_subgraphs(yaml_schema)
+        if additional_tools:
+            subgraph_schema = yaml_schema
         # Add collected tools from subgraphs to the tools list
         tools = list(tools) + additional_tools
         # Use the flattened YAML for building the graph
@@ -375,6 +549,7 @@ def create_graph(
     logger.debug(f"Schema: {schema}")
     logger.debug(f"Tools: {tools}")
     logger.info(f"Tools: {[tool.name for tool in tools]}")
+    tools_by_name = _tools_by_name(tools)
     state = schema.get('state', {})
     state_class = create_state(state)
     lg_builder = StateGraph(state_class)
@@ -390,108 +565,108 @@ def create_graph(
                 tool_name = f"{clean_string(toolkit_name)}{TOOLKIT_SPLITTER}{tool_name}"
             logger.info(f"Node: {node_id} : {node_type} - {tool_name}")
             if node_type in ['function', 'tool', 'loop', 'loop_from_tool', 'indexer', 'subgraph', 'pipeline', 'agent']:
-                for tool in tools:
-                    if tool.name == tool_name:
-                        if node_type == 'function':
-                            lg_builder.add_node(node_id, FunctionTool(
-                                tool=tool, name=node['id'], return_type='dict',
-                                output_variables=node.get('output', []),
-                                input_mapping=node.get('input_mapping',
-                                                       {'messages': {'type': 'variable', 'value': 'messages'}}),
-                                input_variables=node.get('input', ['messages'])))
-                        elif node_type == 'agent':
-                            input_params = node.get('input', ['messages'])
-                            input_mapping = {'task': {'type': 'fstring', 'value': f"{node.get('task', '')}"},
-                                                      'chat_history': {'type': 'fixed', 'value': []}}
-                            # Add 'chat_history' to input_mapping only if 'messages' is in input_params
-                            if 'messages' in input_params:
-                                input_mapping['chat_history'] = {'type': 'variable', 'value': 'messages'}
-                            lg_builder.add_node(node_id, FunctionTool(
-                                client=client, tool=tool,
-                                name=node['id'], return_type='dict',
-                                output_variables=node.get('output', []),
-                                input_variables=input_params,
-                                input_mapping= input_mapping
-                            ))
-                        elif node_type == 'subgraph' or node_type == 'pipeline':
-                            # assign parent memory/store
-                            # tool.checkpointer = memory
-                            # tool.store = store
-                            # wrap with mappings
-                            pipeline_name = node.get('tool', None)
-                            if not pipeline_name:
-                                raise ValueError("Subgraph must have a 'tool' node: add required tool to the subgraph node")
-                            node_fn = SubgraphRunnable(
-                                inner=tool,
-                                name=pipeline_name,
-                                input_mapping=node.get('input_mapping', {}),
-                                output_mapping=node.get('output_mapping', {}),
-                            )
-                            lg_builder.add_node(node_id, node_fn)
-                            break  # skip legacy handling
-                        elif node_type == 'tool':
-                            lg_builder.add_node(node_id, ToolNode(
-                                client=client, tool=tool,
-                                name=node['id'], return_type='dict',
-                                output_variables=node.get('output', []),
-                                input_variables=node.get('input', ['messages']),
-                                structured_output=node.get('structured_output', False),
-                                task=node.get('task')
-                            ))
-                        # TODO: decide on struct output for agent nodes
-                        # elif node_type == 'agent':
-                        #     lg_builder.add_node(node_id, AgentNode(
-                        #         client=client, tool=tool,
-                        #         name=node['id'], return_type='dict',
-                        #         output_variables=node.get('output', []),
-                        #         input_variables=node.get('input', ['messages']),
-                        #         task=node.get('task')
-                        #     ))
-                        elif node_type == 'loop':
-                            lg_builder.add_node(node_id, LoopNode(
-                                client=client, tool=tool,
-                                name=node['id'], return_type='dict',
-                                output_variables=node.get('output', []),
-                                input_variables=node.get('input', ['messages']),
-                                task=node.get('task', '')
-                            ))
-                        elif node_type == 'loop_from_tool':
-                            loop_toolkit_name = node.get('loop_toolkit_name')
-                            loop_tool_name = node.get('loop_tool')
-                            if (loop_toolkit_name and loop_tool_name) or loop_tool_name:
-                                loop_tool_name = f"{clean_string(loop_toolkit_name)}{TOOLKIT_SPLITTER}{loop_tool_name}" if loop_toolkit_name else clean_string(loop_tool_name)
-                                for t in tools:
-                                    if t.name == loop_tool_name:
-                                        logger.debug(f"Loop tool discovered: {t}")
-                                        lg_builder.add_node(node_id, LoopToolNode(
-                                            client=client,
-                                            name=node['id'], return_type='dict',
-                                            tool=tool, loop_tool=t,
-                                            variables_mapping=node.get('variables_mapping', {}),
-                                            output_variables=node.get('output', []),
-                                            input_variables=node.get('input', ['messages']),
-                                            structured_output=node.get('structured_output', False),
-                                            task=node.get('task')
-                                        ))
-                                        break
-                        elif node_type == 'indexer':
-                            indexer_tool = None
-                            indexer_tool_name = clean_string(node.get('indexer_tool', None))
-                            for t in tools:
-                                if t.name == indexer_tool_name:
-                                    indexer_tool = t
-                            logger.info(f"Indexer tool: {indexer_tool}")
-                            lg_builder.add_node(node_id, IndexerNode(
-                                client=client, tool=tool,
-                                index_tool=indexer_tool,
-                                input_mapping=node.get('input_mapping', {}),
-                                name=node['id'], return_type='dict',
-                                chunking_tool=node.get('chunking_tool', None),
-                                chunking_config=node.get('chunking_config', {}),
-                                output_variables=node.get('output', []),
-                                input_variables=node.get('input', ['messages']),
-                                structured_output=node.get('structured_output', False)))
-                        break
+                tool = tools_by_name.get(tool_name)
+                if tool is not None:
+                    if node_type == 'function':
+                        lg_builder.add_node(node_id, FunctionTool(
+                            tool=tool, name=node['id'], return_type='dict',
+                            output_variables=node.get('output', []),
+                            input_mapping=node.get('input_mapping',
+                                                   {'messages': {'type': 'variable', 'value': 'messages'}}),
+                            input_variables=node.get('input', ['messages'])))
+                    elif node_type == 'agent':
+                        input_params = node.get('input', ['messages'])
+                        input_mapping = {'task': {'type': 'fstring', 'value': f"{node.get('task', '')}"},
+                                                  'chat_history': {'type': 'fixed', 'value': []}}
+                        # Add 'chat_history' to input_mapping only if 'messages' is in input_params
+                        if 'messages' in input_params:
+                            input_mapping['chat_history'] = {'type': 'variable', 'value': 'messages'}
+                        lg_builder.add_node(node_id, FunctionTool(
+                            client=client, tool=tool,
+                            name=node['id'], return_type='dict',
+                            output_variables=node.get('output', []),
+                            input_variables=input_params,
+                            input_mapping= input_mapping
+                        ))
+                    elif node_type == 'subgraph' or node_type == 'pipeline':
+                        # assign parent memory/store
+                        # tool.checkpointer = memory
+                        # tool.store = store
+                        # wrap with mappings
+                        pipeline_name = node.get('tool', None)
+                        if not pipeline_name:
+                            raise ValueError("Subgraph must have a 'tool' node: add required tool to the subgraph node")
+                        node_fn = SubgraphRunnable(
+                            inner=tool,
+                            name=pipeline_name,
+                            input_mapping=node.get('input_mapping', {}),
+                            output_mapping=node.get('output_mapping', {}),
+                        )
+                        lg_builder.add_node(node_id, node_fn)
+                    elif node_type == 'tool':
+                        lg_builder.add_node(node_id, ToolNode(
+                            client=client, tool=tool,
+                            name=node['id'], return_type='dict',
+                            output_variables=node.get('output', []),
+                            input_variables=node.get('input', ['messages']),
+                            structured_output=node.get('structured_output', False),
+                            task=node.get('task')
+                        ))
+                    # TODO: decide on struct output for agent nodes
+                    # elif node_type == 'agent':
+                    #     lg_builder.add_node(node_id, AgentNode(
+                    #         client=client, tool=tool,
+                    #         name=node['id'], return_type='dict',
+                    #         output_variables=node.get('output', []),
+                    #         input_variables=node.get('input', ['messages']),
+                    #         task=node.get('task')
+                    #     ))
+                    elif node_type == 'loop':
+                        lg_builder.add_node(node_id, LoopNode(
+                            client=client, tool=tool,
+                            name=node['id'], return_type='dict',
+                            output_variables=node.get('output', []),
+                            input_variables=node.get('input', ['messages']),
+                            task=node.get('task', ''),
+                            max_concurrency=node.get('max_concurrency'),
+                            item_timeout=node.get('item_timeout'),
+                            fail_fast=node.get('fail_fast', False)
+                        ))
+                    elif node_type == 'loop_from_tool':
+                        loop_toolkit_name = node.get('loop_toolkit_name')
+                        loop_tool_name = node.get('loop_tool')
+                        if (loop_toolkit_name and loop_tool_name) or loop_tool_name:
+                            loop_tool_name = f"{clean_string(loop_toolkit_name)}{TOOLKIT_SPLITTER}{loop_tool_name}" if loop_toolkit_name else clean_string(loop_tool_name)
+                            t = tools_by_name.get(loop_tool_name)
+                            if t is not None:
+                                logger.debug(f"Loop tool discovered: {t}")
+                                lg_builder.add_node(node_id, LoopToolNode(
+                                    client=client,
+                                    name=node['id'], return_type='dict',
+                                    tool=tool, loop_tool=t,
+                                    variables_mapping=node.get('variables_mapping', {}),
+                                    output_variables=node.get('output', []),
+                                    input_variables=node.get('input', ['messages']),
+                                    structured_output=node.get('structured_output', False),
+                                    task=node.get('task'),
+                                    max_concurrency=node.get('max_concurrency'),
+                                    item_timeout=node.get('item_timeout'),
+                                    fail_fast=node.get('fail_fast', False)
+                                ))
+                    elif node_type == 'indexer':
+                        indexer_tool_name = clean_string(node.get('indexer_tool', None))
+                        indexer_tool = tools_by_name.get(indexer_tool_name)
+                        logger.info(f"Indexer tool: {indexer_tool}")
+                        lg_builder.add_node(node_id, IndexerNode(
+                            client=client, tool=tool,
+                            index_tool=indexer_tool,
+                            input_mapping=node.get('input_mapping', {}),
+                            name=node['id'], return_type='dict',
+                            chunking_tool=node.get('chunking_tool', None),
+                            chunking_config=node.get('chunking_config', {}),
+                            output_variables=node.get('output', []),
+                            input_variables=node.get('input', ['messages']),
+                            structured_output=node.get('structured_output', False)))
             elif node_type == 'llm':
                 output_vars = node.get('output', [])
                 output_vars_dict = {
@@ -608,15 +783,15 @@ def create_graph(
                     else []
                 )
             )
-
-        # Compile into a CompiledStateGraph  for the subgraph
-        graph = lg_builder.compile(
-            checkpointer=True,
-            interrupt_before=interrupt_before,
-            interrupt_after=interrupt_after,
-            store=store,
-            debug=debug,
-        )
+        else:
+            # Compile into a CompiledStateGraph  for the subgraph
+            graph = lg_builder.compile(
+                checkpointer=True,
+                interrupt_before=interrupt_before,
+                interrupt_after=interrupt_after,
+                store=store,
+                debug=debug,
+            )
     except ValueError as e:
         raise ValueError(
             f"Validation of the schema failed. {e}\n\nDEBUG INFO:**Schema Nodes:**\n\n{lg_builder.nodes}\n\n**Schema Enges:**\n\n{lg_builder.edges}\n\n**Tools Available:**\n\n{tools}")
@@ -631,7 +806,9 @@ def create_graph(
         state_class={state_class: None},
         output_variables=node.get('output', [])
     )
-    return compiled.validate()
+    compiled = compiled.validate()
+    GRAPH_CACHE.set(cache_key, GraphTemplate(compiled, subgraph_schema))
+    return compiled
 
 
 def convert_dict_to_message(msg_dict):
@@ -18,7 +18,12 @@ from langchain_core.documents import Document
 from langchain_core.callbacks import CallbackManagerForRetrieverRun
 
 from ..tools.log import print_log
+from ..tools.vector import VectorAdapter
 from ..document_loaders.utils import cleanse_data
+from ...utils.cache import InstanceCache
+
+# Whether library data is stored in cleansed form ('data' in metadata), per collection and library
+_CLEANSE_DECISIONS = InstanceCache(maxsize=256, ttl=3600, name="cleanse decisions")
 
 
 class AlitaRetriever(BaseRetriever):
@@ -61,47 +66,58 @@ class AlitaRetriever(BaseRetriever):
             reverse=not self.lower_score_better,
         )
 
-    def merge_results(self, input:str, docs: List[dict]):
+    def _collection_key(self):
+        collection_name = getattr(self.vectorstore, "collection_name", None)
+        if collection_name is None:
+            collection_name = getattr(getattr(self.vectorstore, "_collection", None), "name", None)
+        return (self.vectorstore.__class__.__name__, collection_name, self.doc_library)
+
+    def _embed_query(self, input: str):
+        return VectorAdapter(self.vectorstore).embeddings.embed_query(input)
+
+    def merge_results(self, input:str, docs: List[dict], embedding: List[float] = None):
         results = {}
         #
-        for doc in docs:
-            if doc['metadata']['source'] not in results.keys():
-                results[doc['metadata']['source']] = {
-                    'page_content': [],
-                    'metadata': {
-                        'source' : doc['metadata']['source'],
-                    },
-                }
-                #
-                documents = self.vectorstore.similarity_search_with_score(
-                    input,
-                    filter={'source': doc["metadata"]['source']},
-                    k=self.fetch_k,
-                )
-                #
-                for (d, score) in documents:
-                    if d.metadata['type'] == 'data':
-                        if "data" in d.metadata:
-                            results[doc['metadata']['source']]['page_content'].append({
-                                "content": d.metadata['data'],
-                                "index": d.metadata['chunk_index'],
-                                "score": score,
-                            })
-                        else:
-                            results[doc['metadata']['source']]['page_content'].append({
-                                "content": d.page_content,
-                                "index": d.metadata['chunk_index'],
-                                "score": score,
-                            })
-                    elif d.metadata['type'] == 'document_summary':
-                        results[doc['metadata']['source']]['page_content'].append({
+        if embedding is None:
+            embedding = self._embed_query(input)
+        #
+        # Expand all candidate sources with a single query (top fetch_k chunks per source)
+        sources = list(dict.fromkeys(doc['metadata']['source'] for doc in docs))
+        source_documents = VectorAdapter(self.vectorstore).search_by_vector_per_group(
+            embedding, 'source', sources, self.fetch_k,
+        )
+        #
+        for source in sources:
+            results[source] = {
+                'page_content': [],
+                'metadata': {
+                    'source' : source,
+                },
+            }
+            #
+            for (d, score) in source_documents.get(source, []):
+                if d.metadata['type'] == 'data':
+                    if "data" in d.metadata:
+                        results[source]['page_content'].append({
+                            "content": d.metadata['data'],
+                            "index": d.metadata['chunk_index'],
+                            "score": score,
+                        })
+                    else:
+                        results[source]['page_content'].append({
                             "content": d.page_content,
-                            "index": -1,
+                            "index": d.metadata['chunk_index'],
                             "score": score,
                         })
-                #
-                if not results[doc['metadata']['source']]['page_content']:
-                    results.pop(doc['metadata']['source'])
+                elif d.metadata['type'] == 'document_summary':
+                    results[source]['page_content'].append({
+                        "content": d.page_content,
+                        "index": -1,
+                        "score": score,
+                    })
+            #
+            if not results[source]['page_content']:
+                results.pop(source)
             #
             if len(results.keys()) >= self.top_k:
                 break
@@ -139,25 +155,34 @@ class AlitaRetriever(BaseRetriever):
         **kwargs: Any,
     ) -> List[Document]:
         #
-        # detect if cleanse_data on input is needed
+        # Query is embedded once and the vector is reused by all searches below
+        adapter = VectorAdapter(self.vectorstore)
+        embedding = self._embed_query(input)
+        #
+        # detect if cleanse_data on input is needed (once per library)
         #
         if not self.no_cleanse:
-            test_docs = self.vectorstore.similarity_search_with_score(
-                input,
-                filter={"$and": [{"library": self.doc_library}, {"type": "data"}]},
-                k=1,
-            )
+            def _probe():
+                test_docs = adapter.search_by_vector(
+                    embedding,
+                    filter={"$and": [{"library": self.doc_library}, {"type": "data"}]},
+                    k=1,
+                )
+                return bool(test_docs) and "data" in test_docs[0][0].metadata
             #
-            if test_docs and "data" in test_docs[0][0].metadata:
-                input = cleanse_data(input)
+            if _CLEANSE_DECISIONS.get_or_create(self._collection_key(), _probe):
+                cleansed_input = cleanse_data(input)
+                if cleansed_input != input:
+                    input = cleansed_input
+                    embedding = self._embed_query(input)
         #
         if self.document_debug:
             print_log("using input =", input)
         #
         # process
         #
-        docs = self.vectorstore.similarity_search_with_score(
-            input,
+        docs = adapter.search_by_vector(
+            embedding,
             filter={'library': self.doc_library},
             k=self.fetch_k,
         )
@@ -170,7 +195,7 @@ class AlitaRetriever(BaseRetriever):
         if self.document_debug:
             print_log("rerank_documents =", docs)
         #
-        docs = self.merge_results(input, docs)
+        docs = self.merge_results(input, docs, embedding=embedding)
         #
         if self.document_debug:
             print_log("merge_results =", docs)
@@ -9,20 +9,26 @@ class StoreManager:
     _instance = None
     _lock = threading.Lock()
 
+    # connection pool settings of PostgresStore (one pool per connection string)
+    pool_min_size = 1
+    pool_max_size = 10
+    pool_timeout = 30.0
+    pool_max_idle = 300.0
+
     def __new__(cls):
         if cls._instance is None:
             with cls._lock:
                 if cls._instance is None:
                     cls._instance = super().__new__(cls)
                     cls._instance._stores = {}
+                    cls._instance._pools = {}
         return cls._instance
 
     def _parse_connection_string(self, conn_str: str) -> dict:
         """
         Parse the connection string from SQLAlchemy style to args dict.
         """
-        if conn_str.startswith("postgresql+psycopg://"):
-            url = conn_str[len("postgresql+psycopg://"):]
+        url = conn_str.split("://", 1)[-1]
 
         parsed = urlparse(f"//{url}")
 
@@ -35,29 +41,54 @@ class StoreManager:
         }
 
     def get_store(self, conn_str: str):
-        from psycopg import Connection
-        from langgraph.store.postgres import PostgresStore
-        
         store = self._stores.get(conn_str)
         if store is None:
-            logger.info(f"Creating new PostgresStore for connection: {conn_str}")
-            conn_params = self._parse_connection_string(conn_str)
-            conn_params.update({'autocommit': True, 'prepare_threshold': 0})
-            conn = Connection.connect(**conn_params)
-            store = PostgresStore(conn)
+            with self._lock:
+                store = self._stores.get(conn_str)
+                if store is None:
+                    store = self._create_store(conn_str)
+                    self._stores[conn_str] = store
+        return store
+
+    def _create_store(self, conn_str: str):
+        from psycopg_pool import ConnectionPool
+        from langgraph.store.postgres import PostgresStore
+
+        logger.info(f"Creating new PostgresStore for connection: {conn_str}")
+        conn_params = self._parse_connection_string(conn_str)
+        conn_params.update({'autocommit': True, 'prepare_threshold': 0})
+        # pool is shared by all threads using the store, connections are checked before use
+        pool = ConnectionPool(
+            kwargs={key: value for key, value in conn_params.items() if value is not None},
+            min_size=self.pool_min_size,
+            max_size=self.pool_max_size,
+            timeout=self.pool_timeout,
+            max_idle=self.pool_max_idle,
+            check=ConnectionPool.check_connection,
+            name=f"store-{len(self._pools)}",
+            open=True,
+        )
+        try:
+            store = PostgresStore(pool)
             store.setup()
-            self._stores[conn_str] = store
+        except Exception:
+            pool.close()
+            raise
+        self._pools[conn_str] = pool
         return store
 
+    def get_stats(self) -> dict:
+        """ Connection pool statistics by connection pool name """
+        return {pool.name: pool.get_stats() for pool in list(self._pools.values())}
+
     def shutdown(self) -> None:
         logger.info("Shutting down StoreManager and closing all stores")
-        for store in list(self._stores.values()):
+        for pool in list(self._pools.values()):
             try:
-                conn = getattr(store, 'conn', None)
-                if conn:
-                    conn.close()
+                pool.close()
             except Exception:
                 pass
+        self._pools.clear()
         self._stores.clear()
 
 _store_manager = StoreManager()
@@ -0,0 +1,112 @@
+# pylint: disable=C0103
+
+""" Vectorized all-pairs similarity scoring for deduplication """
+
+import numpy as np  # pylint: disable=E0401
+
+# Supported score functions:
+#   cos_sim, dot_score - similarity (sentence_transformers.util)
+#   cdist - euclidean distance (torch.cdist)
+#   l2, cosine, ip - distances (chromadb.utils.distance_functions)
+SCORE_FUNCS = ["cos_sim", "dot_score", "cdist", "l2", "cosine", "ip"]
+
+# chromadb uses the same epsilon to prevent division by zero
+NORM_EPS = 1e-30
+
+
+def _block_scores(score_func, a, b, a_norms, b_norms):
+    """ Compute score matrix between rows of a and b """
+    dot = a @ b.T
+    #
+    if score_func == "dot_score":
+        return dot
+    if score_func == "ip":
+        return 1.0 - dot
+    if score_func == "cos_sim":
+        return dot / np.maximum(np.outer(a_norms, b_norms), 1e-8)
+    if score_func == "cosine":
+        return 1.0 - dot / (np.outer(a_norms, b_norms) + NORM_EPS)
+    #
+    squared = np.maximum(
+        (a_norms ** 2)[:, None] + (b_norms ** 2)[None, :] - 2.0 * dot, 0.0
+    )
+    if score_func == "l2":
+        return squared
+    if score_func == "cdist":
+        return np.sqrt(squared)
+    #
+    raise ValueError(f"Unknown score function: {score_func}")
+
+
+def _tiled_pairs(embeddings, norms, indices, score_func, cutoff_op, cutoff, tile_size):
+    """ Yield (i, j, score) for i < j among indices, scoring in tiles of tile_size x tile_size """
+    count = len(indices)
+    for a_start in range(0, count, tile_size):
+        a_idx = indices[a_start:a_start + tile_size]
+        a = embeddings[a_idx]
+        for b_start in range(a_start, count, tile_size):
+            b_idx = indices[b_start:b_start + tile_size]
+            scores = _block_scores(score_func, a, embeddings[b_idx], norms[a_idx], norms[b_idx])
+            mask = np.asarray(cutoff_op(scores, cutoff))
+            if b_start == a_start:
+                # only upper triangle of diagonal tiles: each pair once, no self-pairs
+                mask &= np.triu(np.ones(mask.shape, dtype=bool), k=1)
+            rows, cols = np.nonzero(mask)
+            for row, col, score in zip(rows, cols, scores[rows, cols]):
+                i, j = int(a_idx[row]), int(b_idx[col])
+                yield (i, j, float(score)) if i < j else (j, i, float(score))
+
+
+def _lsh_buckets(embeddings, n_tables, n_bits, seed):
+    """ Random hyperplane LSH (cosine): yield groups of indices sharing a signature in any table """
+    rng = np.random.default_rng(seed)
+    weights = 1 << np.arange(n_bits, dtype=np.int64)
+    for _ in range(n_tables):
+        planes = rng.standard_normal((embeddings.shape[1], n_bits)).astype(embeddings.dtype)
+        signatures = ((embeddings @ planes) > 0).astype(np.int64) @ weights
+        order = np.argsort(signatures, kind="stable")
+        boundaries = np.flatnonzero(np.diff(signatures[order])) + 1
+        for group in np.split(order, boundaries):
+            if len(group) > 1:
+                yield np.sort(group)
+
+
+def similar_pairs(embeddings, score_func, cutoff_op, cutoff, tile_size=1024,
+                  approximate=False, lsh_tables=8, lsh_bits=12, seed=0):
+    """
+    Find pairs of embeddings which scores pass cutoff
+
+    Exact mode scores all pairs with blocked matrix multiplications, so memory usage is
+    O(tile_size^2) on top of embeddings. Approximate mode only scores pairs that share a
+    random hyperplane LSH bucket in at least one of lsh_tables tables (suitable for cos_sim/cosine
+    on very large libraries; some pairs may be missed).
+
+    Args:
+        embeddings: N x D vectors
+        score_func: one of SCORE_FUNCS
+        cutoff_op: comparison operator (operator.ge, operator.le, etc.)
+        cutoff: cutoff value
+
+    Returns:
+        Generator of (i, j, score) with i < j
+    """
+    if score_func not in SCORE_FUNCS:
+        raise ValueError(f"Unknown score function: {score_func}")
+    #
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    if embeddings.ndim != 2 or embeddings.shape[0] < 2:
+        return
+    norms = np.linalg.norm(embeddings, axis=1)
+    #
+    if not approximate:
+        yield from _tiled_pairs(
+            embeddings, norms, np.arange(embeddings.shape[0]), score_func, cutoff_op, cutoff, tile_size
+        )
+        return
+    #
+    seen = set()
+    for group in _lsh_buckets(embeddings, lsh_tables, lsh_bits, seed):
+        for i, j, score in _tiled_pairs(embeddings, norms, group, score_func, cutoff_op, cutoff, tile_size):
+            if (i, j) not in seen:
+                seen.add((i, j))
+                yield i, j, score
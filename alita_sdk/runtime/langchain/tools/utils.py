@@ -5,9 +5,10 @@ import difflib
 import re
 import threading
 
-from PIL.Image import Image
-from openpyxl.cell.text import InlineFont
-from openpyxl.cell.rich_text import TextBlock, CellRichText
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from PIL.Image import Image
 
 
 def tokenize(s):
@@ -19,6 +20,8 @@ def untokenize(ts):
 
 
 def untokenize_cellrichtext(ts):
+    from openpyxl.cell.rich_text import CellRichText
+
     result = CellRichText()
     #
     if not ts:
@@ -82,6 +85,9 @@ def equalize_markdown(s1, s2):
 
 
 def equalize_openpyxl(s1, s2):
+    from openpyxl.cell.text import InlineFont
+    from openpyxl.cell.rich_text import TextBlock
+
     l1 = tokenize(s1)
     l2 = tokenize(s2)
     #
@@ -180,7 +186,7 @@ def path_to_base64(path) -> str:
     with open(path, 'rb') as binary_file:
         return base64.b64encode(binary_file.read()).decode('utf-8')
 
-def image_to_byte_array(image: Image) -> bytes:
+def image_to_byte_array(image: 'Image') -> bytes:
     raw_bytes = io.BytesIO()
     image.save(raw_bytes, format='PNG')
     return raw_bytes.getvalue()
@@ -2,9 +2,19 @@
 
 """ Multiple vectorstore support tools """
 
+import threading
+
 from .quota import quota_check, sqlite_vacuum
 from . import log
 
+_SUPPORTED_INCLUDES = ["ids", "documents", "metadatas", "embeddings"]
+
+# (engine, table index) already ensured by this process
+_KEY_INDEXES = set()
+# indexes being built
+_KEY_INDEXES_PENDING = set()
+_KEY_INDEXES_LOCK = threading.Lock()
+
 
 class VectorAdapter:
     """ Vectorstore adapter """
@@ -56,36 +66,54 @@ class VectorAdapter:
         #
         return {"ok": True}
 
-    def delete_dataset(self, dataset):
-        """ Delete dataset documents """
+    def delete_dataset(self, dataset, dry_run=False):
+        """ Delete dataset documents
+
+        Returns number of deleted (or matching, if dry_run) documents if supported by vectorstore
+        """
         if self._vs_cls_name == "Chroma":
+            if dry_run:
+                return len(self._vectorstore._collection.get(where={"dataset": dataset}, include=[])["ids"])  # pylint: disable=W0212
             self._vectorstore._collection.delete(where={"dataset": dataset})  # pylint: disable=W0212
+            return None
         #
-        elif self._vs_cls_name == "PGVector":
-            self._pgvector_delete_by_filter(where={"dataset": dataset})
+        if self._vs_cls_name == "PGVector":
+            return self._pgvector_delete_by_filter(where={"dataset": dataset}, dry_run=dry_run)
         #
-        else:
-            raise RuntimeError(f"Unsupported vectorstore: {self._vs_cls_name}")
+        raise RuntimeError(f"Unsupported vectorstore: {self._vs_cls_name}")
+
+    def delete_library(self, library, dry_run=False):
+        """ Delete datasource (library) documents
 
-    def delete_library(self, library):
-        """ Delete datasource (library) documents """
+        Returns number of deleted (or matching, if dry_run) documents if supported by vectorstore
+        """
         if self._vs_cls_name == "Chroma":
-            if library == self._vectorstore._collection.name:  # pylint: disable=W0212
+            is_collection = library == self._vectorstore._collection.name  # pylint: disable=W0212
+            if dry_run:
+                if is_collection:
+                    return self._vectorstore._collection.count()  # pylint: disable=W0212
+                return len(self._vectorstore._collection.get(where={"library": library}, include=[])["ids"])  # pylint: disable=W0212
+            if is_collection:
                 self._vectorstore._client.delete_collection(self._vectorstore._collection.name)  # pylint: disable=W0212
             else:
                 self._vectorstore._collection.delete(where={"library": library})  # pylint: disable=W0212
+            return None
         #
-        elif self._vs_cls_name == "PGVector":
+        if self._vs_cls_name == "PGVector":
             if library == self._vectorstore.collection_name:
+                if dry_run:
+                    return self._pgvector_delete_by_filter(where=None, dry_run=True)
                 self._vectorstore.delete_collection()
-            else:
-                self._pgvector_delete_by_filter(where={"library": library})
+                return None
+            return self._pgvector_delete_by_filter(where={"library": library}, dry_run=dry_run)
         #
-        else:
-            raise RuntimeError(f"Unsupported vectorstore: {self._vs_cls_name}")
+        raise RuntimeError(f"Unsupported vectorstore: {self._vs_cls_name}")
 
     def get_data(self, where, include):
-        """ Get data (documents, metadatas) from store """
+        """ Get data (documents, metadatas) from store
+
+        Note: all matching data is loaded into memory, use iter_data for large collections
+        """
         if self._vs_cls_name == "Chroma":  # pylint: disable=R1705
             return self._vectorstore.get(
                 where=where,
@@ -101,119 +129,369 @@ class VectorAdapter:
         else:
             raise RuntimeError(f"Unsupported vectorstore: {self._vs_cls_name}")
 
-    def _pgvector_get_data(self, where, include):
-        # Adapted from langchain_community/vectorstores/pgvector.py
-        from sqlalchemy.orm import Session  # pylint: disable=C0415,E0401
+    def get_collection_metadata(self):
+        """ Get metadata of the collection itself (not of its documents), e.g. indexing state """
+        if self._vs_cls_name == "Chroma":
+            return dict(self._vectorstore._collection.metadata or {})  # pylint: disable=W0212
         #
-        if not isinstance(include, list):
-            raise ValueError("Unsupported include type")
+        if self._vs_cls_name == "PGVector":
+            from sqlalchemy.orm import Session  # pylint: disable=C0415,E0401
+            #
+            with Session(self._pgvector_engine()) as session:
+                collection = self._vectorstore.get_collection(session)
+                if not collection:
+                    raise ValueError("Collection not found")
+                return dict(collection.cmetadata or {})
         #
-        supported_includes = ["documents", "metadatas"]
-        for item in include:
-            if item not in supported_includes:
-                raise ValueError(f"Unsupported include value: {item}")
+        raise RuntimeError(f"Unsupported vectorstore: {self._vs_cls_name}")
+
+    def update_collection_metadata(self, values):
+        """ Merge values into metadata of the collection """
+        if self._vs_cls_name == "Chroma":
+            collection = self._vectorstore._collection  # pylint: disable=W0212
+            # distance function can not be modified, it is kept by index segments of the collection
+            metadata = {key: value for key, value in (collection.metadata or {}).items() if key != "hnsw:space"}
+            metadata.update(values)
+            collection.modify(metadata=metadata)
+            return
+        #
+        if self._vs_cls_name == "PGVector":
+            from sqlalchemy.orm import Session  # pylint: disable=C0415,E0401
+            #
+            with Session(self._pgvector_engine()) as session:
+                collection = self._vectorstore.get_collection(session)
+                if not collection:
+                    raise ValueError("Collection not found")
+                collection.cmetadata = {**(collection.cmetadata or {}), **values}
+                session.commit()
+            return
+        #
+        raise RuntimeError(f"Unsupported vectorstore: {self._vs_cls_name}")
+
+    def search_by_vector(self, embedding, k, filter=None):  # pylint: disable=W0622
+        """ Similarity search (with scores) by already computed query embedding """
+        if hasattr(self._vectorstore, "similarity_search_with_score_by_vector"):
+            return self._vectorstore.similarity_search_with_score_by_vector(embedding, k=k, filter=filter)
+        #
+        if hasattr(self._vectorstore, "similarity_search_by_vector_with_relevance_scores"):
+            return self._vectorstore.similarity_search_by_vector_with_relevance_scores(embedding, k=k, filter=filter)
         #
-        data_result = {}
+        raise RuntimeError(f"Unsupported vectorstore: {self._vs_cls_name}")
+
+    def search_by_vector_per_group(self, embedding, field, values, k, filter=None):  # pylint: disable=W0622
+        """ Top k documents (with scores) by query embedding for each value of metadata field
+
+        Uses single query for all values: windowed query on PGVector, '$in' filter otherwise.
+        Returns dict: value -> list of (document, score) ordered by score as returned by vectorstore
+        """
+        values = list(dict.fromkeys(values))
+        if not values:
+            return {}
+        #
+        if self._vs_cls_name == "PGVector":
+            try:
+                return self._pgvector_search_per_group(embedding, field, values, k, filter)
+            except Exception as e:  # pylint: disable=W0703
+                log.warning("Windowed search failed, falling back to filtered search: %s", str(e))
+        #
+        group_filter = {field: {"$in": values}}
+        if filter:
+            group_filter = {"$and": [filter, group_filter]}
         #
-        if "documents" in include:
-            data_result["documents"] = []
+        results = {value: [] for value in values}
+        for document, score in self.search_by_vector(embedding, k=k * len(values), filter=group_filter):
+            group = results.get(document.metadata.get(field))
+            if group is not None and len(group) < k:
+                group.append((document, score))
         #
-        if "metadatas" in include:
-            data_result["metadatas"] = []
+        return results
+
+    def _pgvector_search_per_group(self, embedding, field, values, k, filter=None):  # pylint: disable=W0622
+        from sqlalchemy import func, select  # pylint: disable=C0415,E0401
+        from sqlalchemy.orm import Session  # pylint: disable=C0415,E0401
+        from langchain_core.documents import Document  # pylint: disable=C0415,E0401
         #
+        _type = self._vectorstore.EmbeddingStore
+        distance = self._vectorstore.distance_strategy(embedding)
+        group = _type.cmetadata[field].astext
+        #
+        with Session(self._pgvector_engine()) as session:  # pylint: disable=W0212
+            filter_by = self._pgvector_filter_by(session, filter)
+            ranked = (
+                select(
+                    _type.document,
+                    _type.cmetadata,
+                    distance.label("distance"),
+                    func.row_number().over(partition_by=group, order_by=distance).label("rank"),  # pylint: disable=E1102
+                )
+                .where(*filter_by, group.in_([str(value) for value in values]))
+                .subquery()
+            )
+            rows = session.execute(
+                select(ranked.c.document, ranked.c.cmetadata, ranked.c.distance)
+                .where(ranked.c.rank <= k)
+                .order_by(ranked.c.distance)
+            ).all()
+        #
+        results = {value: [] for value in values}
+        by_text = {str(value): value for value in values}
+        for document, cmetadata, score in rows:
+            value = by_text.get(str(cmetadata.get(field)))
+            if value is not None:
+                results[value].append((Document(page_content=document, metadata=cmetadata), score))
+        #
+        return results
+
+    @property
+    def supports_key_lookup(self):
+        """ Check if metadata of documents can be looked up by key on server side (see get_data_by_keys) """
+        return self._vs_cls_name == "PGVector"
+
+    def get_data_by_keys(self, field, keys):
+        """ Get ids and metadatas of documents which have metadata field value in keys """
+        if self._vs_cls_name == "PGVector":
+            return self._pgvector_get_data_by_keys(field, keys)
+        #
+        raise RuntimeError(f"Unsupported vectorstore: {self._vs_cls_name}")
+
+    def _pgvector_engine(self):
         try:
-            engine_bind = self._vectorstore._bind  # pylint: disable=W0212
+            return self._vectorstore._bind  # pylint: disable=W0212
         except:  # pylint: disable=W0702
-            engine_bind = self._vectorstore._engine  # pylint: disable=W0212
+            return self._vectorstore._engine  # pylint: disable=W0212
+
+    def _pgvector_ensure_key_index(self, field):
+        """ Create expression index on (collection_id, cmetadata->>field) once per table and field
+
+        The index is built with CREATE INDEX CONCURRENTLY (writers are not blocked) outside of the process-wide
+        lock, callers do not wait for a build in progress. An INVALID index left by a failed build is recreated,
+        failed builds are retried by the next call.
+        """
+        import sqlalchemy  # pylint: disable=C0415,E0401
+        from sqlalchemy.schema import CreateIndex  # pylint: disable=C0415,E0401
+        #
+        _type = self._vectorstore.EmbeddingStore
+        index_name = f"ix_{_type.__tablename__}_cmetadata_{field}"
+        engine_bind = self._pgvector_engine()
+        index_key = (str(engine_bind.url), str(engine_bind.get_execution_options()), index_name)
+        #
+        with _KEY_INDEXES_LOCK:
+            if index_key in _KEY_INDEXES or index_key in _KEY_INDEXES_PENDING:
+                return
+            _KEY_INDEXES_PENDING.add(index_key)
+        #
+        ready = False
+        try:
+            index = sqlalchemy.Index(
+                index_name,
+                _type.collection_id,
+                _type.cmetadata[field].astext,
+                _table=_type.__table__,
+                postgresql_concurrently=True,
+            )
+            schema = _type.__table__.schema
+            qualified_name = f"{schema}.{index_name}" if schema else index_name
+            valid_sql = sqlalchemy.text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)")
+            # CONCURRENTLY can not run inside transaction
+            with engine_bind.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+                valid = connection.execute(valid_sql, {"name": qualified_name}).scalar()
+                if valid is False:
+                    log.warning("Recreating invalid index %s", index_name)
+                    connection.execute(sqlalchemy.text(f'DROP INDEX CONCURRENTLY IF EXISTS {qualified_name}'))
+                if not valid:
+                    connection.execute(CreateIndex(index, if_not_exists=True))
+                    valid = connection.execute(valid_sql, {"name": qualified_name}).scalar()
+                ready = bool(valid)
+        except Exception as e:  # pylint: disable=W0703
+            log.warning("Failed to create index %s: %s", index_name, str(e))
         #
-        with Session(engine_bind) as session:  # pylint: disable=W0212
+        with _KEY_INDEXES_LOCK:
+            _KEY_INDEXES_PENDING.discard(index_key)
+            if ready:
+                _KEY_INDEXES.add(index_key)
+
+    def _pgvector_get_data_by_keys(self, field, keys):
+        data_result = {"ids": [], "metadatas": []}
+        keys = [str(key) for key in keys if key is not None]
+        if not keys:
+            return data_result
+        #
+        from sqlalchemy.orm import Session  # pylint: disable=C0415,E0401
+        #
+        self._pgvector_ensure_key_index(field)
+        _type = self._vectorstore.EmbeddingStore
+        #
+        with Session(self._pgvector_engine()) as session:  # pylint: disable=W0212
             collection = self._vectorstore.get_collection(session)
             if not collection:
                 raise ValueError("Collection not found")
             #
-            filter_by = [self._vectorstore.EmbeddingStore.collection_id == collection.uuid]
-            if where:
-                if self._vectorstore.use_jsonb:
-                    filter_clauses = self._vectorstore._create_filter_clause(where)  # pylint: disable=W0212
+            query = (
+                session.query(_type.id, _type.cmetadata)
+                .filter(_type.collection_id == collection.uuid)
+                .filter(_type.cmetadata[field].astext.in_(keys))
+            )
+            #
+            log.debug("PGV query: %s", str(query))
+            #
+            for row_id, cmetadata in query:
+                data_result["ids"].append(row_id)
+                data_result["metadatas"].append(cmetadata)
+        #
+        return data_result
+
+    def _pgvector_filter_by(self, session, where):
+        """ Build filter clauses for collection documents matching where """
+        collection = self._vectorstore.get_collection(session)
+        if not collection:
+            raise ValueError("Collection not found")
+        #
+        filter_by = [self._vectorstore.EmbeddingStore.collection_id == collection.uuid]
+        if where:
+            if self._vectorstore.use_jsonb:
+                filter_clauses = self._vectorstore._create_filter_clause(where)  # pylint: disable=W0212
+                #
+                if filter_clauses is not None:
+                    filter_by.append(filter_clauses)
+                #
+                log.debug("PG (JSONB) filter clauses: %s", filter_by)
+                for idx, clause in enumerate(filter_by):
+                    log.debug("- %d: %s", idx, str(clause))
+            else:
+                # --- FIXME: support converting 'new' filters
+                # to '_create_filter_clause_deprecated' format
+                if isinstance(where, dict) and len(where) == 1 and "$and" in where:
+                    where_fixed = {}
                     #
-                    if filter_clauses is not None:
-                        filter_by.append(filter_clauses)
+                    for where_item in where["$and"]:
+                        where_fixed.update(where_item)
                     #
-                    log.debug("PG (JSONB) filter clauses: %s", filter_by)
-                    for idx, clause in enumerate(filter_by):
-                        log.debug("- %d: %s", idx, str(clause))
-                else:
-                    # --- FIXME: support converting 'new' filters
-                    # to '_create_filter_clause_deprecated' format
-                    if isinstance(where, dict) and len(where) == 1 and "$and" in where:
-                        where_fixed = {}
-                        #
-                        for where_item in where["$and"]:
-                            where_fixed.update(where_item)
-                        #
-                        filter_clauses = self._vectorstore._create_filter_clause_json_deprecated(where_fixed)  # pylint: disable=W0212,C0301
-                        #
-                        filter_by.extend(filter_clauses)
-                    else:  # just pass as-is
-                        # Old way of doing things
-                        filter_clauses = self._vectorstore._create_filter_clause_json_deprecated(where)  # pylint: disable=W0212,C0301
-                        #
-                        filter_by.extend(filter_clauses)
+                    filter_clauses = self._vectorstore._create_filter_clause_json_deprecated(where_fixed)  # pylint: disable=W0212,C0301
                     #
-                    log.debug("PG (JSON) filter clauses: %s", filter_by)
-                    for idx, clause in enumerate(filter_by):
-                        log.debug("- %d: %s", idx, str(clause))
+                    filter_by.extend(filter_clauses)
+                else:  # just pass as-is
+                    # Old way of doing things
+                    filter_clauses = self._vectorstore._create_filter_clause_json_deprecated(where)  # pylint: disable=W0212,C0301
+                    #
+                    filter_by.extend(filter_clauses)
+                #
+                log.debug("PG (JSON) filter clauses: %s", filter_by)
+                for idx, clause in enumerate(filter_by):
+                    log.debug("- %d: %s", idx, str(clause))
+        #
+        return filter_by
+
+    def iter_data(self, where, include, batch_size=1000):
+        """ Iterate over data (ids, documents, metadatas, embeddings) from store in batches
+
+        Each batch is a dict with lists for requested include items (same shape as get_data result)
+        of at most batch_size elements, so collections of any size are walked in constant memory.
+        """
+        if not isinstance(include, list):
+            raise ValueError("Unsupported include type")
+        #
+        for item in include:
+            if item not in _SUPPORTED_INCLUDES:
+                raise ValueError(f"Unsupported include value: {item}")
+        #
+        if self._vs_cls_name == "Chroma":
+            yield from self._chroma_iter_data(where, include, batch_size)
+        #
+        elif self._vs_cls_name == "PGVector":
+            yield from self._pgvector_iter_data(where, include, batch_size)
+        #
+        else:
+            raise RuntimeError(f"Unsupported vectorstore: {self._vs_cls_name}")
+
+    def _chroma_iter_data(self, where, include, batch_size):
+        offset = 0
+        while True:
+            data = self._vectorstore.get(
+                where=where,
+                include=[item for item in include if item != "ids"],
+                limit=batch_size,
+                offset=offset,
+            )
+            if not data["ids"]:
+                return
             #
-            _type = self._vectorstore.EmbeddingStore
+            yield {item: list(data[item]) for item in include}
             #
-            query = session.query(self._vectorstore.EmbeddingStore).filter(*filter_by)
+            if len(data["ids"]) < batch_size:
+                return
+            offset += batch_size
+
+    def _pgvector_iter_data(self, where, include, batch_size):
+        # Adapted from langchain_community/vectorstores/pgvector.py
+        from sqlalchemy.orm import Session  # pylint: disable=C0415,E0401
+        #
+        _type = self._vectorstore.EmbeddingStore
+        columns = {
+            "ids": _type.id,
+            "documents": _type.document,
+            "metadatas": _type.cmetadata,
+            "embeddings": _type.embedding,
+        }
+        # select only requested columns (vectors are not loaded unless requested)
+        selected = [item for item in _SUPPORTED_INCLUDES if item in include]
+        #
+        with Session(self._pgvector_engine()) as session:  # pylint: disable=W0212
+            filter_by = self._pgvector_filter_by(session, where)
             #
-            log.debug("PGV query: %s", str(query))
+            query = (
+                session.query(*[columns[item] for item in selected])
+                .filter(*filter_by)
+                .yield_per(batch_size)  # server-side cursor
+            )
             #
-            results = query.all()
+            log.debug("PGV query: %s", str(query))
             #
-            for result in results:
-                if "documents" in data_result:
-                    data_result["documents"].append(result.document)
-                if "metadatas" in data_result:
-                    data_result["metadatas"].append(result.cmetadata)
+            batch = {item: [] for item in selected}
+            size = 0
+            for row in query:
+                for item, value in zip(selected, row):
+                    batch[item].append(value)
+                size += 1
+                if size >= batch_size:
+                    yield batch
+                    batch = {item: [] for item in selected}
+                    size = 0
+            if size:
+                yield batch
+
+    def _pgvector_get_data(self, where, include):
+        data_result = {item: [] for item in include}
+        #
+        for batch in self.iter_data(where, include):
+            for item, values in batch.items():
+                data_result[item].extend(values)
         #
         return data_result
 
-    def _pgvector_delete_by_filter(self, where):
+    def _pgvector_delete_by_filter(self, where, dry_run=False):
+        """ Delete documents matching filter with a single set-based DELETE statement
+
+        Args:
+            where: metadata filter
+            dry_run: only count matching documents
+
+        Returns number of deleted (or matching, if dry_run) documents
+        """
         # Adapted from langchain_community/vectorstores/pgvector.py
+        from sqlalchemy import delete, func  # pylint: disable=C0415,E0401
         from sqlalchemy.orm import Session  # pylint: disable=C0415,E0401
         #
-        try:
-            engine_bind = self._vectorstore._bind  # pylint: disable=W0212
-        except:  # pylint: disable=W0702
-            engine_bind = self._vectorstore._engine  # pylint: disable=W0212
-        #
-        with Session(engine_bind) as session:  # pylint: disable=W0212
-            collection = self._vectorstore.get_collection(session)
-            if not collection:
-                raise ValueError("Collection not found")
-            #
-            filter_by = [self._vectorstore.EmbeddingStore.collection_id == collection.uuid]
-            if where:
-                if self._vectorstore.use_jsonb:
-                    filter_clauses = self._vectorstore._create_filter_clause(where)  # pylint: disable=W0212
-                    if filter_clauses is not None:
-                        filter_by.append(filter_clauses)
-                else:
-                    # Old way of doing things
-                    filter_clauses = self._vectorstore._create_filter_clause_json_deprecated(where)  # pylint: disable=W0212
-                    filter_by.extend(filter_clauses)
+        with Session(self._pgvector_engine()) as session:  # pylint: disable=W0212
+            filter_by = self._pgvector_filter_by(session, where)
             #
             _type = self._vectorstore.EmbeddingStore
             #
-            results = (
-                session.query(self._vectorstore.EmbeddingStore)
-                .filter(*filter_by)
-                .all()
-            )
-            #
-            for result in results:
-                session.delete(result)
+            if dry_run:
+                return session.query(func.count(_type.id)).filter(*filter_by).scalar()  # pylint: disable=E1102
             #
+            result = session.execute(
+                delete(_type).where(*filter_by).execution_options(synchronize_session=False)
+            )
             session.commit()
+            log.debug("PGV deleted %d rows", result.rowcount)
+            return result.rowcount
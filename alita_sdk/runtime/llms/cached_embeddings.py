@@ -0,0 +1,109 @@
+""" Content-hash embeddings cache """
+
+import hashlib
+import os
+import sqlite3
+import threading
+from array import array
+from typing import Any, Dict, Iterable, List
+
+from langchain_core.embeddings import Embeddings  # pylint: disable=E0401
+
+# SQLite limits number of host parameters per statement
+_SQLITE_BATCH = 500
+
+
+def text_hash(text: str) -> str:
+    """ sha256 of text used as cache key of its embedding """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCacheStore:
+    """ SQLite-backed persistent store of embedding vectors keyed by (namespace, text hash) """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "namespace TEXT NOT NULL, "
+                "text_hash TEXT NOT NULL, "
+                "vector BLOB NOT NULL, "
+                "PRIMARY KEY (namespace, text_hash))"
+            )
+            self._conn.commit()
+
+    def get_many(self, namespace: str, hashes: Iterable[str]) -> Dict[str, List[float]]:
+        """ Get cached vectors for hashes (missing hashes are not present in result) """
+        hashes = list(hashes)
+        result = {}
+        with self._lock:
+            for idx in range(0, len(hashes), _SQLITE_BATCH):
+                batch = hashes[idx:idx + _SQLITE_BATCH]
+                placeholders = ", ".join("?" for _ in batch)
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings "
+                    f"WHERE namespace = ? AND text_hash IN ({placeholders})",
+                    [namespace, *batch],
+                ).fetchall()
+                for key, blob in rows:
+                    result[key] = array("d", blob).tolist()
+        return result
+
+    def put_many(self, namespace: str, vectors: Dict[str, List[float]]):
+        """ Save vectors by hashes """
+        if not vectors:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (namespace, text_hash, vector) VALUES (?, ?, ?)",
+                [(namespace, key, array("d", vector).tobytes()) for key, vector in vectors.items()],
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CachedEmbeddings(Embeddings):
+    """ Embeddings wrapper: documents with already known text are not sent to embedding provider again """
+
+    def __init__(self, embeddings: Embeddings, store: EmbeddingCacheStore, namespace: str):
+        self.embeddings = embeddings
+        self.store = store
+        self.namespace = namespace
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        hashes = [text_hash(text) for text in texts]
+        vectors = self.store.get_many(self.namespace, set(hashes))
+        #
+        missing = {}
+        for key, text in zip(hashes, texts):
+            if key not in vectors and key not in missing:
+                missing[key] = text
+        #
+        if missing:
+            new_vectors = self.embeddings.embed_documents(list(missing.values()))
+            computed = dict(zip(missing.keys(), new_vectors))
+            self.store.put_many(self.namespace, computed)
+            vectors.update(computed)
+        #
+        return [vectors[key] for key in hashes]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await self.embeddings.aembed_query(text)
+
+    def __getattr__(self, name: str) -> Any:
+        # expose attributes of wrapped embeddings (model name, client, etc.)
+        if name == "embeddings":
+            raise AttributeError(name)
+        return getattr(self.embeddings, name)
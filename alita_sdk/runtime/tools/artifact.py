@@ -1,5 +1,4 @@
 import hashlib
-import json
 from typing import Any, Optional, Generator, List
 
 from langchain_core.documents import Document
@@ -84,15 +83,11 @@ class ArtifactWrapper(BaseVectorStoreToolApiWrapper):
         return hasher.hexdigest()
 
     def _process_document(self, document: Document) -> Generator[Document, None, None]:
-        page_content = self.read_file(document.metadata['name'], is_capture_image=True, excel_by_sheets=True)
-        if isinstance(page_content, dict):
-            for key, value in page_content.items():
-                metadata = document.metadata
-                metadata['page'] = key
-                yield Document(page_content=str(value), metadata=metadata)
-        else:
-            document.page_content = json.dumps(str(page_content))
-            yield document
+        # pages are parsed one at a time, so large files are chunked and embedded incrementally
+        for page in self.artifact.iter_pages(document.metadata['name'], is_capture_image=True, llm=self.llm):
+            metadata = dict(document.metadata)
+            metadata['page'] = page.metadata['page']
+            yield Document(page_content=page.page_content, metadata=metadata)
 
     @extend_with_vector_tools
     def get_available_tools(self):
@@ -1,10 +1,13 @@
 import logging
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from json import dumps
-from typing import Any, Optional, Union
+from typing import Any, Callable, List, Optional, Tuple, Union
 
 from langchain_core.callbacks import dispatch_custom_event
 from langchain_core.messages import HumanMessage, ToolCall
 from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import ContextThreadPoolExecutor
 from langchain_core.tools import BaseTool
 from langchain_core.utils.function_calling import convert_to_openai_tool
 from pydantic import ValidationError
@@ -12,24 +15,97 @@ from pydantic import ValidationError
 from ..langchain.utils import _old_extract_json
 
 logger = logging.getLogger(__name__)
-from traceback import format_exc
 
 
-def process_response(response, return_type, accumulated_response):
+def response_text(response) -> str:
+    """ Text of a single loop step response """
+    if isinstance(response, dict):
+        if response.get('messages'):
+            return "\n\n".join([message['content'] for message in response['messages']]) + "\n\n"
+        return f"{dumps(response)}\n\n"
+    return f"{response}\n\n"
+
+
+def join_responses(responses: List[Any], return_type: str):
+    """ Accumulated response of all loop steps, built with a single join """
     if return_type == "str":
-        accumulated_response += f'{response}\n\n'
-    else:
-        if isinstance(response, str):
-            accumulated_response['messages'][-1]["content"] += f'{response}\n\n'
-        elif isinstance(response, dict):
-            if response.get('messages'):
-                accumulated_response['messages'][-1]["content"] += "\n\n".join(
-                    [message['content'] for message in response['messages']]) + "\n\n"
+        return "".join(f'{response}\n\n' for response in responses)
+    content = "".join(response_text(response) for response in responses)
+    return {"messages": [{"role": "assistant", "content": content}]}
+
+
+def run_iterations(invoke: Callable[[Any], Any], items: List[Any], max_concurrency: Optional[int] = None,
+                   item_timeout: Optional[float] = None,
+                   fail_fast: bool = False) -> List[Tuple[Any, Optional[Exception]]]:
+    """
+    Run invoke for every item, sequentially or with a bounded thread pool
+
+    Args:
+        invoke: function called with each item
+        items: loop items
+        max_concurrency: number of items processed at the same time (None or 1 - sequential)
+        item_timeout: seconds allowed for a single item (timed out items keep running in background and hold
+            their workers; once every worker is held, items not started yet fail with TimeoutError)
+        fail_fast: re-raise first error and skip not started items instead of collecting errors
+
+    Returns:
+        list of (result, error) in the order of items
+    """
+    workers = max(1, max_concurrency or 1)
+    if workers == 1 and item_timeout is None:
+        results = []
+        for item in items:
+            try:
+                results.append((invoke(item), None))
+            except Exception as e:
+                if fail_fast:
+                    raise
+                results.append((None, e))
+        return results
+    #
+    started = {}
+
+    def _invoke(idx, item):
+        started[idx] = time.monotonic()
+        return invoke(item)
+
+    # futures of timed out items, they keep running in their worker threads
+    timed_out = []
+
+    def _wait(idx, future):
+        while True:
+            start = started.get(idx)
+            if start is None:
+                # still queued, timeout is counted from start of the item
+                if sum(not held.done() for held in timed_out) >= workers and future.cancel():
+                    raise TimeoutError(f"Loop item {idx} was not started: all {workers} workers "
+                                       f"are held by timed out items")
+                timeout = 0.1
             else:
-                accumulated_response['messages'][-1]['content'] += f"{dumps(response)}\n\n"
-        else:
-            accumulated_response['messages'][-1]['content'] += f"{str(response)}\n\n"
-    return accumulated_response
+                timeout = max(start + item_timeout - time.monotonic(), 0) if item_timeout is not None else None
+            try:
+                return future.result(timeout=timeout)
+            except FutureTimeoutError:
+                if start is not None:
+                    timed_out.append(future)
+                    raise TimeoutError(f"Loop item {idx} timed out after {item_timeout} seconds")
+    #
+    executor = ContextThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = [executor.submit(_invoke, idx, item) for idx, item in enumerate(items)]
+        results = []
+        for idx, future in enumerate(futures):
+            try:
+                results.append((_wait(idx, future), None))
+            except Exception as e:
+                if fail_fast:
+                    for pending in futures:
+                        pending.cancel()
+                    raise
+                results.append((None, e))
+        return results
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
 
 
 class LoopNode(BaseTool):
@@ -41,6 +117,9 @@ class LoopNode(BaseTool):
     output_variables: Optional[list] = None
     input_variables: Optional[list] = None
     return_type: str = "str"
+    max_concurrency: Optional[int] = None
+    item_timeout: Optional[float] = None
+    fail_fast: bool = False
     prompt: str = """# ROLE: AI assistant generating tool arguments based on user intent.
 
 Input Data:
@@ -104,48 +183,41 @@ Input Data:
         logger.debug(f"LoopNode pure output: {completion}")
         loop_data = _old_extract_json(completion.content.strip())
         logger.debug(f"LoopNode output: {loop_data}")
-        if self.return_type == "str":
-            accumulated_response = ''
-        else:
-            accumulated_response = {"messages": [{"role": "assistant", "content": ""}]}
-        if len(self.output_variables) > 0:
-            output_varibles = {self.output_variables[0]: ""}
+        # responses of steps and text of the output variable, joined once after the loop
+        responses = []
+        outputs = []
         if isinstance(loop_data, dict):
             loop_data = [loop_data]
         if isinstance(loop_data, list):
-            for each in loop_data:
-                logger.debug(f"LoopNode step input: {each}")
-                try:
-                    tool_run = self.tool.invoke(each, config=config)
-                    if len(self.output_variables) > 0:
-                        output_varibles[self.output_variables[0]] += f'{tool_run}\n\n'
-                    accumulated_response = process_response(tool_run, self.return_type, accumulated_response)
-                except ValidationError:
+            results = run_iterations(
+                lambda each: self.tool.invoke(each, config=config), loop_data,
+                max_concurrency=self.max_concurrency, item_timeout=self.item_timeout, fail_fast=self.fail_fast
+            )
+            for tool_run, error in results:
+                if error is None:
+                    responses.append(tool_run)
+                    outputs.append(f'{tool_run}\n\n')
+                    continue
+                if isinstance(error, ValidationError):
                     resp = f"""Tool input to the {self.tool.name} with value {loop_data} raised ValidationError.
                         \n\nTool schema is {dumps(params)} \n\nand the input to LLM was {predict_input[-1].content}\n\n"""
-                    if len(self.output_variables) > 0:
-                        output_varibles[self.output_variables[0]] += resp
-                    accumulated_response = process_response(resp, self.return_type, accumulated_response)
-                    logger.error(f"ValidationError: {format_exc()}")
-                except Exception as e:
-                    resp = f"""Tool input to the {self.tool.name} with value {loop_data} raised an exception: {e}.                                             
+                    logger.error(f"ValidationError: {error}", exc_info=error)
+                else:
+                    resp = f"""Tool input to the {self.tool.name} with value {loop_data} raised an exception: {error}.                                             
                         \n\nTool schema is {dumps(params)} \n\nand the input to LLM was {predict_input[-1].content}\n\n"""
-                    if len(self.output_variables) > 0:
-                        output_varibles[self.output_variables[0]] += resp
-                    accumulated_response = process_response(resp, self.return_type, accumulated_response)
-                    logger.error(f"Exception: {format_exc()}")
-                logger.info(f"LoopNode response: {accumulated_response}")
+                    logger.error(f"Exception: {error}", exc_info=error)
+                responses.append(resp)
+                outputs.append(resp)
+            logger.info(f"LoopNode processed {len(results)} items")
         else:
-            resp = f"""Tool input to the {self.tool.name} with value {loop_data} is not a valid JSON. 
-                \n\nTool schema is {dumps(params)} \n\nand the input to LLM was  {predict_input[-1].content}\n\n"""
-            if len(self.output_variables) > 0:
-                output_varibles[self.output_variables[0]] += resp
-            accumulated_response = process_response(f"""Tool input to the {self.tool.name} with value {loop_data} is not a valid JSON. 
+            outputs.append(f"""Tool input to the {self.tool.name} with value {loop_data} is not a valid JSON. 
+                \n\nTool schema is {dumps(params)} \n\nand the input to LLM was  {predict_input[-1].content}\n\n""")
+            responses.append(f"""Tool input to the {self.tool.name} with value {loop_data} is not a valid JSON. 
                                                     \n\nTool schema is {dumps(params)} \n\nand the input to LLM was 
-                                                    {predict_input[-1].content}""", self.return_type,
-                                                    accumulated_response)
+                                                    {predict_input[-1].content}""")
+        accumulated_response = join_responses(responses, self.return_type)
         if len(self.output_variables) > 0:
-            accumulated_response[self.output_variables[0]] = output_varibles[self.output_variables[0]]
+            accumulated_response[self.output_variables[0]] = "".join(outputs)
         dispatch_custom_event(
             "on_loop_node", {
                 "input_variables": self.input_variables,
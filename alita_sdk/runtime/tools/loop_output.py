@@ -10,7 +10,7 @@ from langchain_core.tools import BaseTool
 from langchain_core.utils.function_calling import convert_to_openai_tool
 from pydantic import ValidationError
 
-from .loop import process_response
+from .loop import join_responses, run_iterations
 from ..langchain.utils import _extract_json, create_pydantic_model, propagate_the_input_mapping
 
 logger = logging.getLogger(__name__)
@@ -28,6 +28,9 @@ class LoopToolNode(BaseTool):
     output_variables: Optional[list[str]] = None
     structured_output: Optional[bool] = False
     task: Optional[str] = None
+    max_concurrency: Optional[int] = None
+    item_timeout: Optional[float] = None
+    fail_fast: bool = False
     prompt: str = """You are tasked to formulate arguments for the tool according to user task and conversation history.
 Tool name: {tool_name}
 Tool description: {tool_description}
@@ -81,10 +84,6 @@ Answer must be JSON only extractable by JSON.LOADS."""
                 schema=parameters,
                 task=task))
         ]
-        if self.return_type == "str":
-            accumulated_response = ''
-        else:
-            accumulated_response = {"messages": [{"role": "assistant", "content": ""}]}
         if self.structured_output:
             struct_model = create_pydantic_model(f"{self.tool.name}Output", struct_params)
             llm = self.client.with_structured_output(struct_model)
@@ -124,31 +123,33 @@ Answer must be JSON only extractable by JSON.LOADS."""
                 raise TypeError(f'Tool results expected to be List[dict], but got {type(tool_result)} {tool_result=}')
             #     tool_inputs.append({list(self.variables_mapping.keys())[0]: tool_result})
             logger.info(f"Loop tool inputs: {tool_inputs}")
-            output_variables = dict()
-            if len(self.output_variables) > 0:
-                output_variables = {self.output_variables[0]: ""}
-            for tool_input in tool_inputs:
-                logger.info(f"LoopToolNode step input: {tool_input}")
-                try:
-                    tool_run = self.loop_tool.invoke(tool_input, config=config, kwargs=kwargs)
-                    if len(self.output_variables) > 0:
-                        output_variables[self.output_variables[0]] += f'{tool_run}\n\n'
-                    accumulated_response = process_response(tool_run, self.return_type, accumulated_response)
-                except ValidationError:
+            # responses of steps and text of the output variable, joined once after the loop
+            responses = []
+            outputs = []
+            results = run_iterations(
+                lambda tool_input: self.loop_tool.invoke(tool_input, config=config, kwargs=kwargs), tool_inputs,
+                max_concurrency=self.max_concurrency, item_timeout=self.item_timeout, fail_fast=self.fail_fast
+            )
+            for tool_input, (tool_run, error) in zip(tool_inputs, results):
+                if error is None:
+                    responses.append(tool_run)
+                    outputs.append(f'{tool_run}\n\n')
+                    continue
+                if isinstance(error, ValidationError):
                     resp = f"""Tool input to the {self.tool.name} with value {tool_input} raised ValidationError.
                                 \n\nTool schema is {dumps(params)}"""
-                    if len(self.output_variables) > 0:
-                        output_variables[self.output_variables[0]] += resp
-                    accumulated_response = process_response(resp, self.return_type, accumulated_response)
-                    logger.error(f"ValidationError: {format_exc()}")
-                except Exception as e:
-                    resp = f"""Tool input to the {self.tool.name} with value {tool_input} raised an exception: {e}.                                             
+                    logger.error(f"ValidationError: {error}", exc_info=error)
+                else:
+                    resp = f"""Tool input to the {self.tool.name} with value {tool_input} raised an exception: {error}.                                             
                                 \n\nTool schema is {dumps(params)}"""
-                    if len(self.output_variables) > 0:
-                        output_variables[self.output_variables[0]] += resp
-                    accumulated_response = process_response(resp, self.return_type, accumulated_response)
-                    logger.error(f"Exception: {format_exc()}")
-                logger.info(f"LoopNode response: {accumulated_response}")
+                    logger.error(f"Exception: {error}", exc_info=error)
+                responses.append(resp)
+                outputs.append(resp)
+            accumulated_response = join_responses(responses, self.return_type)
+            output_variables = dict()
+            if len(self.output_variables) > 0:
+                output_variables = {self.output_variables[0]: "".join(outputs)}
+            logger.info(f"LoopToolNode processed {len(results)} items")
 
         except ValidationError:
             logger.error(f"ValidationError: {format_exc()}")
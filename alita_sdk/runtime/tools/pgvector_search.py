@@ -1,15 +1,158 @@
 import psycopg2
 import psycopg2.extras
+import psycopg2.pool
+import atexit
 import json
+import re
+import threading
+import time
+import weakref
+from contextlib import contextmanager
 from logging import getLogger
 from typing import List, Dict, Any, Optional, Union, Tuple
 
 logger = getLogger(__name__)
 
+# field names and text search configurations are inlined into SQL (required for expression index matching)
+_SAFE_NAME = re.compile(r'^[A-Za-z0-9_]+$')
+
+# (table, field, language) with text search index already ensured by this process
+_TEXT_INDEXES = set()
+# indexes being built (in background)
+_TEXT_INDEXES_PENDING = set()
+_TEXT_INDEXES_LOCK = threading.Lock()
+
+# distance strategy (langchain DistanceStrategy values) -> (pgvector operator, similarity score of distance)
+# scores follow relevance functions of langchain vectorstores for the same strategy
+_DISTANCES = {
+    'cosine': ('<=>', '1 - ({distance})'),
+    'l2': ('<->', '1 - ({distance}) / sqrt(2)'),
+    # <#> returns negative inner product
+    'inner': ('<#>', '-({distance})'),
+}
+_DISTANCE_ALIASES = {'euclidean': 'l2', 'euclidean_distance': 'l2', 'max_inner_product': 'inner'}
+
+
+class PGConnectionPool:
+    """Thread-safe pool of PostgreSQL connections with health checks"""
+    
+    def __init__(self, connection_string: str, min_size: int = 1, max_size: int = 10,
+                 timeout: float = 30.0, max_idle: float = 300.0):
+        """
+        Initialize connection pool
+        
+        Args:
+            connection_string: PostgreSQL connection string
+            min_size: Number of connections opened eagerly and kept in pool
+            max_size: Maximum number of connections
+            timeout: Seconds to wait for free connection
+            max_idle: Connections idle for longer are checked with a ping before use
+        """
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self._pool = psycopg2.pool.ThreadedConnectionPool(min_size, max_size, connection_string)
+        # ThreadedConnectionPool raises when exhausted, semaphore makes callers wait instead
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        # keyed by connection object (not id()) so that a discarded connection never matches a new one
+        self._released_at = weakref.WeakKeyDictionary()
+        self._stats = {"checkouts": 0, "in_use": 0, "waits": 0, "discarded": 0}
+    
+    @staticmethod
+    def _ping(conn) -> bool:
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+    
+    def _checkout(self):
+        conn = self._pool.getconn()
+        with self._lock:
+            released_at = self._released_at.pop(conn, None)
+        stale = released_at is not None and time.monotonic() - released_at > self.max_idle
+        if conn.closed or (stale and not self._ping(conn)):
+            self._pool.putconn(conn, close=True)
+            with self._lock:
+                self._stats["discarded"] += 1
+            conn = self._pool.getconn()
+        return conn
+    
+    @contextmanager
+    def connection(self):
+        """Borrow connection from pool (returned to pool on exit, broken connections are discarded)"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats["waits"] += 1
+            if not self._slots.acquire(timeout=self.timeout):
+                raise TimeoutError(f"No free PostgreSQL connection in {self.timeout} seconds")
+        conn = None
+        try:
+            conn = self._checkout()
+            with self._lock:
+                self._stats["checkouts"] += 1
+                self._stats["in_use"] += 1
+            yield conn
+        finally:
+            if conn is not None:
+                with self._lock:
+                    self._stats["in_use"] -= 1
+                    if conn.closed:
+                        self._stats["discarded"] += 1
+                    else:
+                        self._released_at[conn] = time.monotonic()
+                self._pool.putconn(conn, close=bool(conn.closed))
+            self._slots.release()
+    
+    def stats(self) -> Dict[str, int]:
+        """Pool usage statistics"""
+        with self._lock:
+            return {"min_size": self.min_size, "max_size": self.max_size, **self._stats}
+    
+    def close(self):
+        """Close all connections"""
+        self._pool.closeall()
+
+
+# connection string -> pool shared by all helpers in process
+_POOLS: Dict[str, PGConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_connection_pool(connection_string: str, **kwargs) -> PGConnectionPool:
+    """Get (or create) process-wide connection pool for connection string"""
+    with _POOLS_LOCK:
+        pool = _POOLS.get(connection_string)
+        if pool is None:
+            pool = PGConnectionPool(connection_string, **kwargs)
+            _POOLS[connection_string] = pool
+        return pool
+
+
+def close_connection_pools():
+    """Close all connection pools"""
+    with _POOLS_LOCK:
+        for pool in _POOLS.values():
+            try:
+                pool.close()
+            except Exception:
+                pass
+        _POOLS.clear()
+
+
+atexit.register(close_connection_pools)
+
+
 class PGVectorSearch:
     """Helper class for PostgreSQL vector search operations"""
     
-    def __init__(self, connection_string: str, collection_name: str, language: str = 'english'):
+    def __init__(self, connection_string: str, collection_name: str, language: str = 'english',
+                 table_name: Optional[str] = None, pool_min_size: int = 1, pool_max_size: int = 10,
+                 distance_strategy: Any = 'cosine'):
         """
         Initialize PGVector search helper
         
@@ -17,23 +160,30 @@ class PGVectorSearch:
             connection_string: PostgreSQL connection string
             collection_name: Name of the collection/table to search
             language: Language for full-text search (default: 'english')
+            table_name: Table to search if it differs from collection name
+            pool_min_size: Minimal size of connection pool (if pool is not created yet)
+            pool_max_size: Maximal size of connection pool (if pool is not created yet)
+            distance_strategy: Distance strategy of the vectorstore ('cosine', 'l2' or 'inner',
+                langchain DistanceStrategy is accepted as well)
         """
         self.connection_string = connection_string
         self.collection_name = collection_name
+        self.table_name = table_name or collection_name
         self.language = language
-        self._conn = None
+        strategy = str(getattr(distance_strategy, 'value', distance_strategy)).lower()
+        strategy = _DISTANCE_ALIASES.get(strategy, strategy)
+        if strategy not in _DISTANCES:
+            raise ValueError(f"Unsupported distance strategy: {distance_strategy}")
+        self.distance_strategy = strategy
+        self._pool = get_connection_pool(connection_string, min_size=pool_min_size, max_size=pool_max_size)
     
-    def _get_connection(self):
-        """Get a PostgreSQL connection"""
-        if not self._conn or self._conn.closed:
-            self._conn = psycopg2.connect(self.connection_string)
-        return self._conn
+    def _connection(self):
+        """Borrow a PostgreSQL connection from the shared pool"""
+        return self._pool.connection()
     
-    def _close_connection(self):
-        """Close the PostgreSQL connection"""
-        if self._conn and not self._conn.closed:
-            self._conn.close()
-            self._conn = None
+    def pool_stats(self) -> Dict[str, int]:
+        """Connection pool usage statistics"""
+        return self._pool.stats()
     
     def _process_filter_condition(self, key: str, value: Any, params: Dict) -> Tuple[str, Dict]:
         """
@@ -168,6 +318,92 @@ class PGVectorSearch:
         
         return " AND ".join(conditions), params
     
+    def _vector_sql(self) -> Tuple[str, str]:
+        """ SQL of (distance to query embedding, similarity score) for the distance strategy """
+        operator, score = _DISTANCES[self.distance_strategy]
+        distance = f"embedding {operator} %(embedding)s::vector"
+        return distance, score.format(distance=distance)
+
+    def _tsvector_sql(self, field_name: str) -> str:
+        """
+        SQL expression of tsvector for a metadata field
+
+        Language and field are inlined so that the expression matches the GIN index
+        created by ensure_text_index (parameters would prevent the index from being used).
+        """
+        if not _SAFE_NAME.match(field_name) or not _SAFE_NAME.match(self.language):
+            raise ValueError(f"Unsupported field name or language: {field_name}, {self.language}")
+        return f"to_tsvector('{self.language}'::regconfig, cmetadata->>'{field_name}')"
+
+    def ensure_text_index(self, field_name: str, wait: bool = False) -> bool:
+        """
+        Ensure GIN expression index for full-text search on a metadata field (once per process)
+
+        The index is built with CREATE INDEX CONCURRENTLY in a background thread, so searches do not wait
+        for the build (they run without the index meanwhile). Use wait=True to build it as a setup step.
+        Failed builds are retried on the next call.
+
+        Args:
+            field_name: Field name to index
+            wait: Build the index in the calling thread
+
+        Returns:
+            True if the index is ready
+        """
+        index_key = (self.connection_string, self.table_name, field_name, self.language)
+        with _TEXT_INDEXES_LOCK:
+            if index_key in _TEXT_INDEXES:
+                return True
+            if index_key in _TEXT_INDEXES_PENDING:
+                return False
+            _TEXT_INDEXES_PENDING.add(index_key)
+        if wait:
+            return self._build_text_index(index_key, field_name)
+        threading.Thread(target=self._build_text_index, args=(index_key, field_name),
+                         name=f"text-index-{field_name}", daemon=True).start()
+        return False
+
+    def _build_text_index(self, index_key: Tuple, field_name: str) -> bool:
+        """ Create the full-text index, an INVALID index left by failed or cancelled build is recreated """
+        index_name = re.sub(r'[^A-Za-z0-9_]', '_', f"ix_{self.table_name}_fts_{self.language}_{field_name}")[:63]
+        # index is created in the schema of the table
+        schema = self.table_name.rsplit('.', 1)[0] + '.' if '.' in self.table_name else ''
+        ready = False
+        try:
+            with self._connection() as conn:
+                try:
+                    # CONCURRENTLY does not lock table for writes but can not run inside transaction
+                    conn.autocommit = True
+                    with conn.cursor() as cursor:
+                        valid = self._index_valid(cursor, schema + index_name)
+                        if valid is False:
+                            logger.warning(f"Recreating invalid full-text index {index_name}")
+                            cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {schema}{index_name}")
+                        if not valid:
+                            cursor.execute(
+                                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} "
+                                f"ON {self.table_name} USING GIN (({self._tsvector_sql(field_name)}))"
+                            )
+                            valid = self._index_valid(cursor, schema + index_name)
+                        ready = bool(valid)
+                finally:
+                    if not conn.closed:
+                        conn.autocommit = False
+        except Exception as e:
+            logger.warning(f"Failed to create full-text index on {field_name}: {str(e)}")
+        with _TEXT_INDEXES_LOCK:
+            _TEXT_INDEXES_PENDING.discard(index_key)
+            if ready:
+                _TEXT_INDEXES.add(index_key)
+        return ready
+
+    @staticmethod
+    def _index_valid(cursor, index_name: str) -> Optional[bool]:
+        """ pg_index.indisvalid of the index, None if it does not exist """
+        cursor.execute("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)", (index_name,))
+        row = cursor.fetchone()
+        return None if row is None else bool(row[0])
+
     def full_text_search(self, field_name: str, query: str, limit: int = 30) -> List[Dict[str, Any]]:
         """
         Perform a full-text search on a specific field
@@ -180,44 +416,167 @@ class PGVectorSearch:
         Returns:
             List of document dictionaries with scores
         """
-        conn = self._get_connection()
-        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-        
-        try:
-            # Extract the field from JSON and perform text search
-            sql = f"""
-                SELECT 
-                    id, 
-                    (ts_rank(to_tsvector(%s, cmetadata->>%s), plainto_tsquery(%s, %s))) as text_score
-                FROM 
-                    {self.collection_name}
-                WHERE 
-                    cmetadata ? %s
-                    AND to_tsvector(%s, cmetadata->>%s) @@ plainto_tsquery(%s, %s)
-                ORDER BY 
-                    text_score DESC
-                LIMIT %s
-            """
-            
-            cursor.execute(
-                sql, 
-                (
-                    self.language, field_name, self.language, query, 
-                    field_name, self.language, field_name, 
-                    self.language, query, limit
+        self.ensure_text_index(field_name)
+        with self._connection() as conn:
+            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+
+            try:
+                # Extract the field from JSON and perform text search (uses GIN expression index)
+                tsvector = self._tsvector_sql(field_name)
+                sql = f"""
+                    SELECT 
+                        id, 
+                        (ts_rank({tsvector}, plainto_tsquery(%s, %s))) as text_score
+                    FROM 
+                        {self.table_name}
+                    WHERE 
+                        {tsvector} @@ plainto_tsquery(%s, %s)
+                    ORDER BY 
+                        text_score DESC
+                    LIMIT %s
+                """
+
+                cursor.execute(
+                    sql, 
+                    (
+                        self.language, query,
+                        self.language, query, limit
+                    )
                 )
-            )
-            
-            results = cursor.fetchall()
-            return [dict(row) for row in results]
-        
-        except Exception as e:
-            logger.error(f"Full-text search error: {str(e)}")
-            conn.rollback()
-            return []
-        finally:
-            cursor.close()
-    
+
+                results = cursor.fetchall()
+                return [dict(row) for row in results]
+
+            except Exception as e:
+                logger.error(f"Full-text search error: {str(e)}")
+                conn.rollback()
+                return []
+            finally:
+                cursor.close()
+
+    def hybrid_search(self, query: str, query_embedding: List[float], fields: List[str],
+                      limit: int = 30, filter_dict: Dict = None,
+                      vector_weight: float = 1.0, text_weight: float = 0.3,
+                      fusion: str = 'weighted', rrf_k: int = 60, candidates: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Perform vector kNN and full-text ranking in a single SQL statement and fuse the results
+
+        Args:
+            query: Search query (for full-text ranking)
+            query_embedding: Embedding of the query (for kNN by distance of the distance strategy)
+            fields: Metadata fields for full-text search
+            limit: Maximum number of results
+            filter_dict: Filter dictionary
+            vector_weight: Weight of vector results
+            text_weight: Weight of full-text results
+            fusion: 'weighted' (weighted sum of scores) or 'rrf' (weighted reciprocal rank fusion,
+                normalized so that a top hit of every ranking scores 1, comparable with score cut off)
+            rrf_k: Rank constant for reciprocal rank fusion
+            candidates: Number of candidates taken from each ranking (default: 3 * limit)
+
+        Returns:
+            List of dictionaries with id, document, cmetadata, score, vector_score (similarity derived
+            from distance, e.g. 1 - cosine distance) and text_score, ordered by fused score
+        """
+        if fusion not in ('rrf', 'weighted'):
+            raise ValueError(f"Unsupported fusion: {fusion}")
+        for field_name in fields:
+            self.ensure_text_index(field_name)
+        #
+        with self._connection() as conn:
+            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+
+            try:
+                params = {
+                    "query": query,
+                    "language": self.language,
+                    "embedding": "[" + ",".join(str(float(value)) for value in query_embedding) + "]",
+                    "candidates": candidates or limit * 3,
+                    "limit": limit,
+                    "vector_weight": vector_weight,
+                    "text_weight": text_weight,
+                    "rrf_k": rrf_k,
+                    # maximal fused rank score is sum of weights / (rrf_k + 1)
+                    "rrf_scale": (rrf_k + 1) / ((vector_weight + (text_weight if fields else 0)) or 1),
+                }
+
+                where_clause = "TRUE"
+                if filter_dict:
+                    where_clause, filter_params = self._process_filter(filter_dict)
+                    params.update(filter_params)
+
+                if fields:
+                    tsvectors = [self._tsvector_sql(field_name) for field_name in fields]
+                    # rank normalization 1: divide by 1 + log(document length)
+                    rank_sql = "GREATEST(" + ", ".join(f"ts_rank({tsv}, q, 1)" for tsv in tsvectors) + ")"
+                    match_sql = " OR ".join(f"{tsv} @@ q" for tsv in tsvectors)
+                    text_hits_sql = f"""
+                        SELECT id, score, ROW_NUMBER() OVER (ORDER BY score DESC) AS rank
+                        FROM (
+                            SELECT id, {rank_sql} AS score
+                            FROM {self.table_name}, plainto_tsquery(%(language)s, %(query)s) AS q
+                            WHERE ({where_clause}) AND ({match_sql})
+                            ORDER BY score DESC
+                            LIMIT %(candidates)s
+                        ) AS text_candidates
+                    """
+                else:
+                    text_hits_sql = "SELECT NULL::varchar AS id, NULL::float AS score, NULL::bigint AS rank WHERE FALSE"
+
+                if fusion == 'rrf':
+                    fused_score_sql = """
+                        (COALESCE(%(vector_weight)s / (%(rrf_k)s + v.rank), 0)
+                        + COALESCE(%(text_weight)s / (%(rrf_k)s + t.rank), 0)) * %(rrf_scale)s
+                    """
+                else:
+                    fused_score_sql = """
+                        COALESCE(%(vector_weight)s * v.score, 0) + COALESCE(%(text_weight)s * t.score, 0)
+                    """
+
+                distance_sql, vector_score_sql = self._vector_sql()
+                sql = f"""
+                    WITH vector_hits AS (
+                        SELECT id, score, ROW_NUMBER() OVER (ORDER BY score DESC) AS rank
+                        FROM (
+                            SELECT id, {vector_score_sql} AS score
+                            FROM {self.table_name}
+                            WHERE {where_clause}
+                            ORDER BY {distance_sql}
+                            LIMIT %(candidates)s
+                        ) AS vector_candidates
+                    ),
+                    text_hits AS ({text_hits_sql}),
+                    fused AS (
+                        SELECT 
+                            COALESCE(v.id, t.id) AS id,
+                            v.score AS vector_score,
+                            t.score AS text_score,
+                            {fused_score_sql} AS score
+                        FROM vector_hits v
+                        FULL OUTER JOIN text_hits t ON v.id = t.id
+                    )
+                    SELECT 
+                        f.id, e.document, e.cmetadata, f.score, f.vector_score, f.text_score
+                    FROM 
+                        fused f
+                        JOIN {self.table_name} e ON e.id = f.id
+                    ORDER BY 
+                        f.score DESC
+                    LIMIT 
+                        %(limit)s
+                """
+
+                cursor.execute(sql, params)
+                results = cursor.fetchall()
+                return [dict(row) for row in results]
+
+            except Exception as e:
+                logger.error(f"Hybrid search error: {str(e)}")
+                conn.rollback()
+                return []
+            finally:
+                cursor.close()
+
     def get_documents_by_ids(self, ids: List[str]) -> Dict[str, Dict[str, Any]]:
         """
         Retrieve documents by IDs
@@ -231,38 +590,38 @@ class PGVectorSearch:
         if not ids:
             return {}
             
-        conn = self._get_connection()
-        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-        
-        try:
-            placeholders = ", ".join(["%s" for _ in ids])
-            sql = f"""
-                SELECT 
-                    id, document, cmetadata
-                FROM 
-                    {self.collection_name}
-                WHERE 
-                    id IN ({placeholders})
-            """
-            
-            cursor.execute(sql, ids)
-            results = cursor.fetchall()
-            
-            # Build dictionary mapping IDs to document data
-            documents = {}
-            for row in results:
-                doc_id = row['id']
-                documents[doc_id] = dict(row)
-            
-            return documents
-            
-        except Exception as e:
-            logger.error(f"Error retrieving documents: {str(e)}")
-            conn.rollback()
-            return {}
-        finally:
-            cursor.close()
-    
+        with self._connection() as conn:
+            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+
+            try:
+                placeholders = ", ".join(["%s" for _ in ids])
+                sql = f"""
+                    SELECT 
+                        id, document, cmetadata
+                    FROM 
+                        {self.table_name}
+                    WHERE 
+                        id IN ({placeholders})
+                """
+
+                cursor.execute(sql, ids)
+                results = cursor.fetchall()
+
+                # Build dictionary mapping IDs to document data
+                documents = {}
+                for row in results:
+                    doc_id = row['id']
+                    documents[doc_id] = dict(row)
+
+                return documents
+
+            except Exception as e:
+                logger.error(f"Error retrieving documents: {str(e)}")
+                conn.rollback()
+                return {}
+            finally:
+                cursor.close()
+
     def search_with_filters(self, query: str, filter_dict: Dict = None, limit: int = 30) -> List[Dict[str, Any]]:
         """
         Perform a search with filters
@@ -275,39 +634,35 @@ class PGVectorSearch:
         Returns:
             List of document dictionaries
         """
-        conn = self._get_connection()
-        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-        
-        try:
-            params = {"query": query, "limit": limit}
-            
-            where_clause = "TRUE"
-            if filter_dict:
-                where_clause, filter_params = self._process_filter(filter_dict)
-                params.update(filter_params)
-            
-            sql = f"""
-                SELECT 
-                    id, document, cmetadata
-                FROM 
-                    {self.collection_name}
-                WHERE 
-                    {where_clause}
-                LIMIT 
-                    %(limit)s
-            """
-            
-            cursor.execute(sql, params)
-            results = cursor.fetchall()
-            return [dict(row) for row in results]
-            
-        except Exception as e:
-            logger.error(f"Error searching with filters: {str(e)}")
-            conn.rollback()
-            return []
-        finally:
-            cursor.close()
+        with self._connection() as conn:
+            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+
+            try:
+                params = {"query": query, "limit": limit}
+
+                where_clause = "TRUE"
+                if filter_dict:
+                    where_clause, filter_params = self._process_filter(filter_dict)
+                    params.update(filter_params)
+
+                sql = f"""
+                    SELECT 
+                        id, document, cmetadata
+                    FROM 
+                        {self.table_name}
+                    WHERE 
+                        {where_clause}
+                    LIMIT 
+                        %(limit)s
+                """
+
+                cursor.execute(sql, params)
+                results = cursor.fetchall()
+                return [dict(row) for row in results]
 
-    def __del__(self):
-        """Cleanup connection when object is deleted"""
-        self._close_connection()
+            except Exception as e:
+                logger.error(f"Error searching with filters: {str(e)}")
+                conn.rollback()
+                return []
+            finally:
+                cursor.close()
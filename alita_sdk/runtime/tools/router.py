@@ -2,7 +2,7 @@ import logging
 from typing import Any, Optional, Union, List
 from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import BaseTool
-from ..utils.evaluate import EvaluateTemplate
+from ..utils.evaluate import EvaluateTemplate, compile_template, summarize_state
 from ..utils.utils import clean_string
 
 logger = logging.getLogger(__name__)
@@ -19,9 +19,9 @@ class RouterNode(BaseTool):
         input_data = {}
         for field in self.input_variables or []:
             input_data[field] = state.get(field, "")
-        template = EvaluateTemplate(self.condition, input_data)
+        template = EvaluateTemplate(self.condition, input_data, template=compile_template(self.condition))
         result = template.evaluate()
-        logger.info(f"RouterNode evaluated condition '{self.condition}' with input {input_data} => {result}")
+        logger.info(f"RouterNode evaluated condition '{self.condition}' with input {summarize_state(input_data)} => {result}")
         result = clean_string(str(result))
         if result in self.routes:
             # If the result is one of the routes, return it
@@ -1,7 +1,10 @@
 import json
 import math
-import types
-from typing import Any, Optional, List, Dict, Callable, Generator
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional, List, Dict, Callable, Generator, Iterable
 
 from langchain_core.documents import Document
 from pydantic import BaseModel, model_validator, Field
@@ -10,11 +13,25 @@ from langchain_core.messages import HumanMessage
 from alita_sdk.tools.elitea_base import BaseToolApiWrapper
 from logging import getLogger
 
+from ..utils.concurrency import AdaptiveLimiter, is_rate_limit_error
 from ..utils.logging import dispatch_custom_event
 from ..utils.utils import IndexerKeywords
 
 logger = getLogger(__name__)
 
+# max number of retries of a single embedding batch throttled by embedding provider
+MAX_RATE_LIMIT_RETRIES = 5
+
+def _batched(iterable: Iterable[Any], size: int) -> Generator[List[Any], None, None]:
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
 class IndexDocumentsModel(BaseModel):
     documents: Any = Field(description="Generator of documents to index")
 
@@ -32,8 +49,12 @@ class SearchDocumentsModel(BaseModel):
             "enabled": true,
             "weight": 0.3,
             "fields": ["content", "title"],
-            "language": "english"
-        }""",
+            "language": "english",
+            "hybrid": false,
+            "fusion": "weighted"
+        }
+        With "hybrid": true vector and full-text results are fused in a single database query
+        ("fusion": "weighted" sums weighted scores, "rrf" uses reciprocal rank fusion normalized to 0..1).""",
         default=None
     )
     reranking_config: Optional[Dict[str, Dict[str, Any]]] = Field(
@@ -68,8 +89,12 @@ class StepBackSearchDocumentsModel(BaseModel):
             "enabled": true,
             "weight": 0.3,
             "fields": ["content", "title"],
-            "language": "english"
-        }""",
+            "language": "english",
+            "hybrid": false,
+            "fusion": "weighted"
+        }
+        With "hybrid": true vector and full-text results are fused in a single database query
+        ("fusion": "weighted" sums weighted scores, "rrf" uses reciprocal rank fusion normalized to 0..1).""",
         default=None
     )
     reranking_config: Optional[Dict[str, Dict[str, Any]]] = Field(
@@ -138,6 +163,10 @@ class VectorStoreWrapper(BaseToolApiWrapper):
     vectorstore_type: str
     vectorstore_params: dict
     max_docs_per_add: int = 100
+    # number of concurrent embedding workers; 1 means sequential embed + write of each batch
+    embedding_workers: int = 1
+    # max number of embedded batches waiting for the vectorstore writer (backpressure for embedding workers)
+    write_queue_size: int = 4
     dataset: str = None
     embedding: Any = None
     vectorstore: Any = None
@@ -164,7 +193,8 @@ class VectorStoreWrapper(BaseToolApiWrapper):
             raise ValueError("Collection name is required.")
         if not values.get('embeddings'):
             values['embeddings'] = get_embeddings(values['embedding_model'], values['embedding_model_params'])
-        values['vectorstore'] = get_vectorstore(values['vectorstore_type'], values['vectorstore_params'], embedding_func=values['embeddings'])
+        if not values.get('vectorstore'):
+            values['vectorstore'] = get_vectorstore(values['vectorstore_type'], values['vectorstore_params'], embedding_func=values['embeddings'])
         values['vectoradapter'] = VectorAdapter(
             vectorstore=values['vectorstore'],
             embeddings=values['embeddings'],
@@ -181,56 +211,109 @@ class VectorStoreWrapper(BaseToolApiWrapper):
                 self.pg_helper = PGVectorSearch(
                     self.vectorstore.connection_string,
                     self.vectorstore.collection_name,
-                    language=language
+                    language=language,
+                    distance_strategy=getattr(self.vectorstore, '_distance_strategy', None) or 'cosine',
                 )
             except ImportError:
                 logger.warning("PGVectorSearch not available - full-text search will be limited")
             except Exception as e:
                 logger.error(f"Failed to initialize PGVectorSearch: {str(e)}")
 
-    def _get_indexed_data(self, store):
-        """ Get all indexed data from vectorstore for non-code content """
+    def _hybrid_search(self, query: str, filter: Optional[dict], full_text_search: Dict[str, Any], k: int):
+        """
+        Vector and full-text search fused in one database query (PGVector only)
+
+        Returns list of (document, score) or None if hybrid search is not available
+        """
+        self._init_pg_helper(full_text_search.get('language', 'english'))
+        if not self.pg_helper:
+            return None
+        from langchain_core.documents import Document
+        try:
+            query_embedding = self.vectoradapter.embeddings.embed_query(query)
+            rows = self.pg_helper.hybrid_search(
+                query, query_embedding, full_text_search['fields'],
+                limit=k,
+                filter_dict=filter,
+                text_weight=full_text_search.get('weight', 0.3),
+                fusion=full_text_search.get('fusion', 'weighted'),
+            )
+        except Exception as e:
+            logger.error(f"Hybrid search error: {str(e)}")
+            return None
+        return [
+            (Document(page_content=row.get('document') or '', metadata=row.get('cmetadata') or {}), row['score'])
+            for row in rows
+        ]
+
+    def _get_indexed_data(self, store, keys: Optional[Iterable[str]] = None):
+        """ Get all indexed data from vectorstore for non-code content
+
+        Args:
+            keys: if provided, only documents with these ids (and their dependent documents)
+                are looked up on server side (see VectorAdapter.get_data_by_keys)
+        """
 
         # get already indexed data
         result = {}
         try:
-            self._log_data("Retrieving already indexed data from vectorstore",
-                           tool_name="index_documents")
-            data = store.get(include=['metadatas'])
-            # re-structure data to be more usable
-            for meta, db_id in zip(data['metadatas'], data['ids']):
-                # get document id from metadata
-                doc_id = str(meta['id'])
-                dependent_docs = meta.get(IndexerKeywords.DEPENDENT_DOCS.value, [])
-                if dependent_docs:
-                    dependent_docs = [d.strip() for d in dependent_docs.split(';') if d.strip()]
-                parent_id = meta.get(IndexerKeywords.PARENT.value, -1)
-                #
-                chunk_id = meta.get('chunk_id')
-                if doc_id in result and chunk_id:
-                    # if document with the same id already saved, add db_id fof current one as chunk
-                    result[doc_id]['all_chunks'].append(db_id)
-                else:
-                    result[doc_id] = {
-                        'metadata': meta,
-                        'id': db_id,
-                        'all_chunks': [db_id],
-                        IndexerKeywords.DEPENDENT_DOCS.value: dependent_docs,
-                        IndexerKeywords.PARENT.value: parent_id
-                    }
+            if keys is None:
+                self._log_data("Retrieving already indexed data from vectorstore",
+                               tool_name="index_documents")
+                data = store.get(include=['metadatas'])
+            else:
+                data = self.vectoradapter.get_data_by_keys('id', keys)
+            self._structure_indexed_data(data, result)
+            if keys is not None:
+                # dependent documents are required to remove them along with outdated parent document
+                dependent_ids = {dep_id for item in result.values()
+                                 for dep_id in item[IndexerKeywords.DEPENDENT_DOCS.value]} - set(result.keys())
+                if dependent_ids:
+                    self._structure_indexed_data(self.vectoradapter.get_data_by_keys('id', dependent_ids), result)
         except Exception as e:
             logger.error(f"Failed to get indexed data from vectorstore: {str(e)}. Continuing with empty index.")
         return result
 
-    def _get_code_indexed_data(self, store) -> Dict[str, Dict[str, Any]]:
-        """ Get all indexed data from vectorstore for code content """
+    @staticmethod
+    def _structure_indexed_data(data: dict, result: dict):
+        """ Re-structure ids and metadatas returned by vectorstore to dict by document id """
+        for meta, db_id in zip(data['metadatas'], data['ids']):
+            # get document id from metadata
+            doc_id = str(meta['id'])
+            dependent_docs = meta.get(IndexerKeywords.DEPENDENT_DOCS.value, [])
+            if dependent_docs:
+                dependent_docs = [d.strip() for d in dependent_docs.split(';') if d.strip()]
+            parent_id = meta.get(IndexerKeywords.PARENT.value, -1)
+            #
+            chunk_id = meta.get('chunk_id')
+            if doc_id in result and chunk_id:
+                # if document with the same id already saved, add db_id fof current one as chunk
+                result[doc_id]['all_chunks'].append(db_id)
+            else:
+                result[doc_id] = {
+                    'metadata': meta,
+                    'id': db_id,
+                    'all_chunks': [db_id],
+                    IndexerKeywords.DEPENDENT_DOCS.value: dependent_docs,
+                    IndexerKeywords.PARENT.value: parent_id
+                }
+
+    def _get_code_indexed_data(self, store, keys: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """ Get all indexed data from vectorstore for code content
+
+        Args:
+            keys: if provided, only files with these names are looked up on server side
+        """
 
         # get already indexed data
         result = {}
         try:
-            self._log_data("Retrieving already indexed code data from vectorstore",
-                           tool_name="index_documents")
-            data = store.get(include=['metadatas'])
+            if keys is None:
+                self._log_data("Retrieving already indexed code data from vectorstore",
+                               tool_name="index_documents")
+                data = store.get(include=['metadatas'])
+            else:
+                data = self.vectoradapter.get_data_by_keys('filename', keys)
             # re-structure data to be more usable
             for meta, db_id in zip(data['metadatas'], data['ids']):
                 filename = meta['filename']
@@ -255,39 +338,102 @@ class VectorStoreWrapper(BaseToolApiWrapper):
             key_fn: Callable,
             compare_fn: Callable,
             remove_ids_fn: Callable,
-            log_msg: str = "Verification of documents to index started"
-    ) -> List[Any]:
-        """Generic duplicate reduction logic for documents."""
+            log_msg: str = "Verification of documents to index started",
+            run_keys: Optional[set] = None,
+    ) -> Generator[Any, None, None]:
+        """Generic duplicate reduction logic for documents.
+
+        Yields documents which have to be (re-)indexed; outdated entries are removed from the store
+        in batches of `max_docs_per_add` while documents are streamed.
+
+        Args:
+            run_keys: keys of documents added to the store by the current run outside of this generator
+                (dependent documents), see _reduce_duplicates_incremental"""
         self._log_data(log_msg, tool_name="index_documents")
+        if self.vectoradapter.supports_key_lookup:
+            yield from self._reduce_duplicates_incremental(
+                documents, store, get_indexed_data, key_fn, compare_fn, remove_ids_fn, run_keys
+            )
+            return
         indexed_data = get_indexed_data(store)
         indexed_keys = set(indexed_data.keys())
         if not indexed_keys:
             self._log_data("Vectorstore is empty, indexing all incoming documents", tool_name="index_documents")
-            return list(documents)
+            yield from documents
+            return
 
-        final_docs = []
         docs_to_remove = set()
+        removed_count = 0
 
         for document in documents:
             key = key_fn(document)
             if key in indexed_keys:
                 if compare_fn(document, indexed_data[key]):
                     continue
-                final_docs.append(document)
                 docs_to_remove.update(remove_ids_fn(indexed_data, key))
-            else:
-                final_docs.append(document)
+                if len(docs_to_remove) >= self.max_docs_per_add:
+                    store.delete(ids=list(docs_to_remove))
+                    removed_count += len(docs_to_remove)
+                    docs_to_remove = set()
+            yield document
 
         if docs_to_remove:
+            store.delete(ids=list(docs_to_remove))
+            removed_count += len(docs_to_remove)
+        if removed_count:
             self._log_data(
-                f"Removing {len(docs_to_remove)} documents from vectorstore that are already indexed with different updated_on.",
+                f"Removed {removed_count} documents from vectorstore that are already indexed with different updated_on.",
                 tool_name="index_documents"
             )
-            store.delete(ids=list(docs_to_remove))
 
-        return final_docs
+    def _reduce_duplicates_incremental(
+            self,
+            documents: Generator[Any, None, None],
+            store,
+            get_indexed_data: Callable,
+            key_fn: Callable,
+            compare_fn: Callable,
+            remove_ids_fn: Callable,
+            run_keys: Optional[set] = None,
+    ) -> Generator[Any, None, None]:
+        """Duplicate reduction which compares incoming documents with the index on server side.
+
+        Instead of loading metadata of the whole collection, metadata is requested only for keys
+        of each incoming batch, and outdated entries of the batch are removed with a single delete.
 
-    def _reduce_non_code_duplicates(self, documents: Generator[Any, None, None], store) -> List[Any]:
+        Lookups of later batches run after earlier batches were written (possibly concurrently), so
+        decisions have to match a snapshot of the index taken before the run: every key is decided
+        once, and keys in `run_keys` (written by this run) are never looked up and treated as new."""
+        # decision per key (True - already indexed and up to date), documents may be split into several chunks
+        decisions = {}
+        run_keys = run_keys if run_keys is not None else set()
+        removed_count = 0
+        for batch in _batched(documents, self.max_docs_per_add):
+            new_keys = {key_fn(doc) for doc in batch} - decisions.keys() - {None}
+            lookup_keys = new_keys - run_keys
+            indexed_data = get_indexed_data(store, keys=lookup_keys) if lookup_keys else {}
+            docs_to_remove = set()
+            for key in new_keys:
+                if key in indexed_data and key in lookup_keys:
+                    decisions[key] = any(compare_fn(doc, indexed_data[key]) for doc in batch if key_fn(doc) == key)
+                    if not decisions[key]:
+                        docs_to_remove.update(remove_ids_fn(indexed_data, key))
+                else:
+                    decisions[key] = False
+            if docs_to_remove:
+                store.delete(ids=list(docs_to_remove))
+                removed_count += len(docs_to_remove)
+            for document in batch:
+                if not decisions.get(key_fn(document)):
+                    yield document
+        if removed_count:
+            self._log_data(
+                f"Removed {removed_count} documents from vectorstore that are already indexed with different updated_on.",
+                tool_name="index_documents"
+            )
+
+    def _reduce_non_code_duplicates(self, documents: Generator[Any, None, None], store,
+                                    run_keys: Optional[set] = None) -> Generator[Any, None, None]:
         return self._reduce_duplicates(
             documents,
             store,
@@ -304,10 +450,12 @@ class VectorStoreWrapper(BaseToolApiWrapper):
                     [chunk_db_id for dep_id in idx_data[key][IndexerKeywords.DEPENDENT_DOCS.value]
                      for chunk_db_id in idx_data[dep_id]['all_chunks']]
             ),
-            log_msg="Verification of documents to index started"
+            log_msg="Verification of documents to index started",
+            run_keys=run_keys,
         )
 
-    def _reduce_code_duplicates(self, documents: Generator[Any, None, None], store) -> List[Any]:
+    def _reduce_code_duplicates(self, documents: Generator[Any, None, None], store,
+                                run_keys: Optional[set] = None) -> Generator[Any, None, None]:
         return self._reduce_duplicates(
             documents,
             store,
@@ -319,89 +467,223 @@ class VectorStoreWrapper(BaseToolApiWrapper):
                     doc.metadata.get('commit_hash') in idx.get('commit_hashes')
             ),
             lambda idx_data, key: idx_data[key]['ids'],
-            log_msg="Verification of code documents to index started"
+            log_msg="Verification of code documents to index started",
+            run_keys=run_keys,
         )
 
-    def index_documents(self, documents: Generator[Document, None, None], progress_step: int = 20, clean_index: bool = True, is_code: bool = False):
+    def _with_dependent_docs(self, documents: Iterable[Document],
+                             run_keys: Optional[set] = None) -> Generator[Document, None, None]:
+        """ Yields each document followed by its dependent documents produced by process_document_func.
+
+        Documents are processed one by one, so dependent documents are never accumulated in memory.
+        Keys (id, filename) of dependent documents are added to run_keys if provided."""
+        for doc in documents:
+            # notify user about missed required metadata fields: id, updated_on
+            # it is not required to have them, but it is recommended to have them for proper re-indexing and duplicate detection
+            if 'id' not in doc.metadata or 'updated_on' not in doc.metadata:
+                logger.warning(f"Document is missing required metadata field 'id' or 'updated_on': {doc.metadata}")
+            yield doc
+            # if func is provided, apply it to documents
+            # used for processing of documents before indexing,
+            # e.g. to avoid time-consuming operations for documents that are already indexed
+            if self.process_document_func:
+                for dependent_doc in self.process_document_func([doc]):
+                    if run_keys is not None:
+                        run_keys.update(key for key in (dependent_doc.metadata.get('id'),
+                                                         dependent_doc.metadata.get('filename')) if key is not None)
+                    yield dependent_doc
+
+    def _add_batch(self, batch: List[Document]) -> Optional[Exception]:
+        """ Adds a batch of documents to the vectorstore, returns the error if embedding or writing failed """
+        from ..langchain.interfaces.llm_processor import add_documents
+
+        try:
+            add_documents(vectorstore=self.vectoradapter.vectorstore, documents=batch)
+            self.vectoradapter.persist()
+        except Exception as e:
+            return e
+        return None
+
+    def _add_batches_concurrently(self, batches: Iterable[List[Document]], workers: int) -> Optional[Exception]:
+        """ Producer/consumer indexing: batches are embedded by a pool of workers while a single writer
+        thread adds already embedded batches to the vectorstore in the original order.
+
+        The writer queue is bounded by `write_queue_size`, so producing (loading, chunking) and embedding
+        are paused when the vectorstore can not keep up. Rate limit errors of embedding provider
+        reduce the number of concurrent embedding calls (see AdaptiveLimiter).
+
+        Returns the first embedding or write error (None on success); errors raised while producing
+        batches are propagated."""
+        from ..langchain.interfaces.llm_processor import prepare_documents
+
+        vectorstore = self.vectoradapter.vectorstore
+        if not hasattr(vectorstore, 'add_embeddings'):
+            logger.warning(f"{type(vectorstore).__name__} does not support add_embeddings, "
+                           f"falling back to sequential indexing")
+            for batch in batches:
+                error = self._add_batch(batch)
+                if error:
+                    return error
+            return None
+
+        embeddings = self.vectoradapter.embeddings
+        limiter = AdaptiveLimiter(workers)
+        write_queue = queue.Queue(maxsize=max(1, self.write_queue_size))
+        errors = []
+
+        def embed(texts: List[str]):
+            delay = 1
+            for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+                limiter.acquire()
+                try:
+                    vectors = embeddings.embed_documents(texts)
+                except Exception as e:
+                    throttled = is_rate_limit_error(e)
+                    limiter.release(throttled=throttled)
+                    if not throttled or attempt == MAX_RATE_LIMIT_RETRIES:
+                        raise
+                    logger.warning(f"Embedding provider rate limit hit, concurrency reduced to {limiter.limit}. "
+                                   f"Retrying in {delay}s")
+                    time.sleep(delay)
+                    delay = min(delay * 2, 60)
+                else:
+                    limiter.release()
+                    return vectors
+
+        def writer():
+            while True:
+                item = write_queue.get()
+                if item is None:
+                    return
+                texts, metadatas, future = item
+                if errors:
+                    # keep draining the queue so producer is never blocked
+                    future.cancel()
+                    continue
+                try:
+                    vectorstore.add_embeddings(texts, future.result(), metadatas=metadatas)
+                    self.vectoradapter.persist()
+                except Exception as e:
+                    errors.append(e)
+
+        writer_thread = threading.Thread(target=writer, name="vectorstore-writer", daemon=True)
+        writer_thread.start()
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="embedding-worker") as executor:
+                for batch in batches:
+                    if errors:
+                        break
+                    texts, metadatas = prepare_documents(batch)
+                    # blocks while writer queue is full
+                    write_queue.put((texts, metadatas, executor.submit(embed, texts)))
+                write_queue.put(None)
+                writer_thread.join()
+        finally:
+            if writer_thread.is_alive():
+                errors.append(RuntimeError("Indexing was interrupted"))
+                write_queue.put(None)
+                writer_thread.join()
+        return errors[0] if errors else None
+
+    def index_documents(self, documents: Generator[Document, None, None], progress_step: int = 20,
+                        clean_index: bool = True, is_code: bool = False, total_docs: Optional[int] = None,
+                        embedding_workers: Optional[int] = None):
         """ Index documents in the vectorstore.
 
+        Documents are streamed through duplicates removal, processing and embedding,
+        and added to the vectorstore in batches of `max_docs_per_add`, so memory usage
+        does not depend on the number of documents.
+
         Args:
             documents (Any): Generator or list of documents to index.
-            document_processing_func (Optional[Callable]): Function to process documents after duplicates removal and before indexing.
             progress_step (int): Step for progress reporting, default is 20.
             clean_index (bool): If True, clean the index before re-indexing all documents.
+            is_code (bool): If True, documents are code files and duplicates are detected by commit hash.
+            total_docs (Optional[int]): Optional estimate of the number of documents used for percentage progress
+                reporting. If not provided (and documents have no length), progress is reported per batch.
+            embedding_workers (Optional[int]): Number of concurrent embedding workers, overrides `embedding_workers`
+                of the wrapper. Values greater than 1 enable overlapping of embedding and vectorstore writes.
+
+        Returns:
+            dict: {"status": "ok" | "error", "message": ...}. Embedding and vectorstore write errors are
+                returned as "error" status, errors raised by the documents generator (loading, parsing,
+                chunking) are propagated to the caller.
         """
 
-        from ..langchain.interfaces.llm_processor import add_documents
+        if total_docs is None and hasattr(documents, '__len__'):
+            total_docs = len(documents)
+        workers = embedding_workers or self.embedding_workers
 
+        # keys of dependent documents written by this run, they are not looked up by duplicates check
+        run_keys = set()
         # pre-process documents if needed (find duplicates, etc.)
         if clean_index:
             logger.info("Cleaning index before re-indexing all documents.")
             self._log_data("Cleaning index before re-indexing all documents. Previous index will be removed", tool_name="index_documents")
             try:
-                self.vectoradapter.delete_dataset(self.dataset)
+                deleted = self.vectoradapter.delete_dataset(self.dataset)
                 self.vectoradapter.persist()
                 self.vectoradapter.vacuum()
-                self._log_data("Previous index has been removed",
+                self._log_data("Previous index has been removed" +
+                               (f" ({deleted} documents)" if deleted is not None else ""),
                                tool_name="index_documents")
             except Exception as e:
                 logger.warning(f"Failed to clean index: {str(e)}. Continuing with re-indexing.")
-            if isinstance(documents, types.GeneratorType):
-                documents = list(documents)
         else:
             # remove duplicates based on metadata 'id' and 'updated_on' or 'commit_hash' fields
-            documents = self._reduce_code_duplicates(documents, self.vectoradapter.vectorstore) if is_code \
-                else self._reduce_non_code_duplicates(documents, self.vectoradapter.vectorstore)
-
-        if not documents or len(documents) == 0:
-            logger.info("No new documents to index after duplicate check.")
-            return {"status": "ok", "message": "No new documents to index."}
-
-        # if func is provided, apply it to documents
-        # used for processing of documents before indexing,
-        # e.g. to avoid time-consuming operations for documents that are already indexed
-        dependent_docs_generator = self.process_document_func(documents) if self.process_document_func else []
-
-        # notify user about missed required metadata fields: id, updated_on
-        # it is not required to have them, but it is recommended to have them for proper re-indexing and duplicate detection
-        for doc in documents:
-            if 'id' not in doc.metadata or 'updated_on' not in doc.metadata:
-                logger.warning(f"Document is missing required metadata field 'id' or 'updated_on': {doc.metadata}")
+            documents = self._reduce_code_duplicates(documents, self.vectoradapter.vectorstore, run_keys) if is_code \
+                else self._reduce_non_code_duplicates(documents, self.vectoradapter.vectorstore, run_keys)
 
-        logger.debug(f"Indexing documents: {documents}")
         logger.debug(self.vectoradapter)
 
-        documents = documents + list(dependent_docs_generator)
-        total_docs = len(documents)
-        documents_count = 0
-        _documents = []
-
         # set default progress step to 20 if out of 0...100 or None
         progress_step = 20 if progress_step not in range(0, 100) else progress_step
-        next_progress_point = progress_step
-        for document in documents:
-            documents_count += 1
-            # logger.debug(f"Indexing document: {document}")
-            try:
+        progress = {"count": 0, "next_point": progress_step}
+
+        def batches() -> Generator[List[Document], None, None]:
+            _documents = []
+            for document in self._with_dependent_docs(documents, run_keys):
+                progress["count"] += 1
                 _documents.append(document)
                 if len(_documents) >= self.max_docs_per_add:
-                    add_documents(vectorstore=self.vectoradapter.vectorstore, documents=_documents)
-                    self.vectoradapter.persist()
+                    yield _documents
                     _documents = []
+                    if not total_docs:
+                        msg = f"Indexing progress: processed {progress['count']} documents."
+                        logger.debug(msg)
+                        self._log_data(msg)
 
-                percent = math.floor((documents_count / total_docs) * 100)
-                if percent >= next_progress_point:
-                    msg = f"Indexing progress: {percent}%. Processed {documents_count} of {total_docs} documents."
-                    logger.debug(msg)
-                    self._log_data(msg)
-                    next_progress_point += progress_step
-            except Exception:
-                from traceback import format_exc
-                logger.error(f"Error: {format_exc()}")
-                return {"status": "error", "message": f"Error: {format_exc()}"}
-        if _documents:
-            add_documents(vectorstore=self.vectoradapter.vectorstore, documents=_documents)
-            self.vectoradapter.persist()
+                if total_docs:
+                    # total is an estimate (dependent docs are not counted), so cap the percentage
+                    percent = min(math.floor((progress["count"] / total_docs) * 100), 99)
+                    if percent >= progress["next_point"]:
+                        msg = f"Indexing progress: {percent}%. Processed {progress['count']} of ~{total_docs} documents."
+                        logger.debug(msg)
+                        self._log_data(msg)
+                        progress["next_point"] += progress_step
+            if _documents:
+                yield _documents
+
+        # only embedding and write errors are reported in the result, errors of loading
+        # and processing documents are raised as before streaming
+        error = None
+        if workers and workers > 1:
+            error = self._add_batches_concurrently(batches(), workers)
+        else:
+            for batch in batches():
+                error = self._add_batch(batch)
+                if error:
+                    break
+        if error:
+            from traceback import format_exception
+            trace = "".join(format_exception(type(error), error, error.__traceback__))
+            logger.error(f"Error: {trace}")
+            return {"status": "error", "message": f"Error: {trace}"}
+
+        documents_count = progress["count"]
+        if not documents_count:
+            logger.info("No new documents to index after duplicate check.")
+            return {"status": "ok", "message": "No new documents to index."}
         return {"status": "ok", "message": f"successfully indexed {documents_count} documents"}
 
     def search_documents(self, query:str, doctype: str = 'code', 
@@ -421,104 +703,71 @@ class VectorStoreWrapper(BaseToolApiWrapper):
 
         # Extended search implementation
         if extended_search:
+            # Query is embedded once and the vector is reused by all searches below
+            query_embedding = self.vectoradapter.embeddings.embed_query(query)
             # Track unique documents by source and chunk_id
             unique_docs = {}
             chunk_type_scores = {}  # Store scores by document identifier
+            vector_items = []
             # Create initial set of results from documents
-            if filter is None:
-                document_filter = {"chunk_type": {"$eq": "document"}}
-            else:
-                document_filter = {
-                    "$and": [
-                        filter,
-                        {"chunk_type": {"$eq": "document"}}
-                    ]
-                }
-                
+            document_filter = self._with_filter(filter, {"chunk_type": {"$eq": "document"}})
+
             try:
-                document_items = self.vectoradapter.vectorstore.similarity_search_with_score(
-                    query, filter=document_filter, k=search_top
-                )                
+                document_items = self.vectoradapter.search_by_vector(
+                    query_embedding, filter=document_filter, k=search_top
+                )
                 # Add document results to unique docs
-                vector_items = document_items
+                vector_items = list(document_items)
                 for doc, score in document_items:
-                    source = doc.metadata.get('source')
-                    chunk_id = doc.metadata.get('chunk_id')
-                    doc_id = f"{source}_{chunk_id}" if source and chunk_id else str(doc.metadata.get('id', id(doc)))
-                    
+                    doc_id = self._extended_doc_id(doc)
                     if doc_id not in unique_docs or score > chunk_type_scores.get(doc_id, 0):
                         unique_docs[doc_id] = doc
                         chunk_type_scores[doc_id] = score
             except Exception as e:
                 logger.warning(f"Error searching for document chunks: {str(e)}")
-            
-            # First search for specified chunk types (title, summary, propositions, keywords)
+
+            # Search for specified chunk types (title, summary, propositions, keywords) with a single query
             valid_chunk_types = ["title", "summary", "propositions", "keywords"]
             chunk_types_to_search = [ct for ct in extended_search if ct in valid_chunk_types]
-            
-            # Search for each chunk type separately
-            for chunk_type in chunk_types_to_search:
-                if filter is None:
-                    chunk_filter = {"chunk_type": {"$eq": chunk_type}}
-                else:
-                    chunk_filter = {
-                        "$and": [
-                            filter,
-                            {"chunk_type": {"$eq": chunk_type}}
-                        ]
-                    }
-                
+
+            # (source, chunk_id) of documents found by chunk type, document chunks are fetched for them in batch
+            missing_chunks = []
+            if chunk_types_to_search:
                 try:
-                    chunk_items = self.vectoradapter.vectorstore.similarity_search_with_score(
-                        query, filter=chunk_filter, k=search_top
+                    chunk_items_by_type = self.vectoradapter.search_by_vector_per_group(
+                        query_embedding, "chunk_type", chunk_types_to_search, search_top, filter=filter
                     )
-                    
-                    logger.debug(f"Chunk items for {chunk_type}: {chunk_items[0]}")
-                    
-                    for doc, score in chunk_items:
-                        # Create unique identifier for document
-                        source = doc.metadata.get('source')
-                        chunk_id = doc.metadata.get('chunk_id')
-                        doc_id = f"{source}_{chunk_id}" if source and chunk_id else str(doc.metadata.get('id', id(doc)))
-                        
-                        # Store document and its score
-                        if doc_id not in unique_docs:
-                            unique_docs[doc_id] = doc
-                            chunk_type_scores[doc_id] = score
-                            # Create a filter with proper operators 
-                            doc_filter_parts = [
-                                {"source": {"$eq": source}},
-                                {"chunk_id": {"$eq": chunk_id}},
-                                {"chunk_type": {"$eq": "document"}}
-                            ]
-                            
-                            if filter is not None:
-                                doc_filter = {
-                                    "$and": [filter] + doc_filter_parts
-                                }
-                            else:
-                                doc_filter = {
-                                    "$and": doc_filter_parts
-                                }
-                                
-                            try:
-                                fetch_items = self.vectoradapter.vectorstore.similarity_search_with_score(
-                                    query, filter=doc_filter, k=1
-                                )
-                                if fetch_items:
-                                    vector_items.append(fetch_items[0])
-
-                            except Exception as e:
-                                logger.warning(f"Error retrieving document chunk for {source}_{chunk_id}: {str(e)}")
+                    for chunk_type in chunk_types_to_search:
+                        for doc, score in chunk_items_by_type.get(chunk_type, []):
+                            doc_id = self._extended_doc_id(doc)
+                            # Store document and its score
+                            if doc_id not in unique_docs:
+                                unique_docs[doc_id] = doc
+                                chunk_type_scores[doc_id] = score
+                                missing_chunks.append((doc.metadata.get('source'), doc.metadata.get('chunk_id')))
                 except Exception as e:
-                    logger.warning(f"Error searching for chunk type {chunk_type}: {str(e)}")
-            
+                    logger.warning(f"Error searching for chunk types {chunk_types_to_search}: {str(e)}")
+
+            if missing_chunks:
+                try:
+                    vector_items.extend(self._fetch_document_chunks(query_embedding, missing_chunks, filter))
+                except Exception as e:
+                    logger.warning(f"Error retrieving document chunks for {missing_chunks}: {str(e)}")
+
         else:
-            # Default search behavior (unchanged)
             max_search_results = 30 if search_top * 3 > 30 else search_top * 3
-            vector_items = self.vectoradapter.vectorstore.similarity_search_with_score(
-                query, filter=filter, k=max_search_results
-            )
+            vector_items = None
+            if full_text_search and full_text_search.get('enabled') and full_text_search.get('hybrid') \
+                    and full_text_search.get('fields'):
+                # Vector kNN and full-text ranking are fused by the database in a single query
+                vector_items = self._hybrid_search(query, filter, full_text_search, max_search_results)
+                if vector_items is not None:
+                    full_text_search = None
+            if vector_items is None:
+                # Default search behavior
+                vector_items = self.vectoradapter.vectorstore.similarity_search_with_score(
+                    query, filter=filter, k=max_search_results
+                )
             
         # Initialize document map for tracking by ID
         doc_map = {
@@ -536,7 +785,9 @@ class VectorStoreWrapper(BaseToolApiWrapper):
                 vector_weight = 1.0  # Default vector weight
                 text_weight = full_text_search.get('weight', 0.3)
                 
-                # Query each specified field
+                # Weighted text scores are summed across fields, documents missing from vector results
+                # are fetched in one query after all fields are searched
+                text_only_scores = {}
                 for field_name in full_text_search.get('fields', []):
                     try:
                         text_results = self.pg_helper.full_text_search(field_name, query)
@@ -552,18 +803,22 @@ class VectorStoreWrapper(BaseToolApiWrapper):
                                 combined_score = (vector_score * vector_weight) + (text_score * text_weight)
                                 doc_map[doc_id] = (doc, combined_score)
                             else:
-                                # Document is new from text search, fetch and add if possible
-                                doc_data = self.pg_helper.get_documents_by_ids([doc_id]).get(doc_id)
-                                if doc_data:
-                                    from langchain_core.documents import Document
-                                    doc = Document(
-                                        page_content=doc_data.get('document', ''),
-                                        metadata=doc_data.get('cmetadata', {})
-                                    )
-                                    # Use weighted text score for new documents
-                                    doc_map[doc_id] = (doc, text_score * text_weight)
+                                # Use weighted text score for new documents
+                                text_only_scores[doc_id] = text_only_scores.get(doc_id, 0) + text_score * text_weight
                     except Exception as e:
                         logger.error(f"Full-text search error on field {field_name}: {str(e)}")
+                
+                if text_only_scores:
+                    from langchain_core.documents import Document
+                    docs_data = self.pg_helper.get_documents_by_ids(list(text_only_scores))
+                    for doc_id, text_score in text_only_scores.items():
+                        doc_data = docs_data.get(doc_id)
+                        if doc_data:
+                            doc = Document(
+                                page_content=doc_data.get('document', ''),
+                                metadata=doc_data.get('cmetadata', {})
+                            )
+                            doc_map[doc_id] = (doc, text_score)
             
         # Convert the document map back to a list
         combined_items = list(doc_map.values())
@@ -597,6 +852,38 @@ class VectorStoreWrapper(BaseToolApiWrapper):
                 })
             return response
 
+    @staticmethod
+    def _with_filter(filter: Optional[dict], condition: dict) -> dict:
+        """ Combine optional user filter with additional condition """
+        if filter is None:
+            return condition
+        return {"$and": [filter, condition]}
+
+    @staticmethod
+    def _extended_doc_id(doc: Document) -> str:
+        """ Unique identifier of document chunk used by extended search """
+        source = doc.metadata.get('source')
+        chunk_id = doc.metadata.get('chunk_id')
+        return f"{source}_{chunk_id}" if source and chunk_id else str(doc.metadata.get('id', id(doc)))
+
+    def _fetch_document_chunks(self, query_embedding: List[float], chunks: List[tuple], filter: Optional[dict]):
+        """ Fetch 'document' chunks (with scores) for (source, chunk_id) pairs using a single search """
+        pair_filters = [
+            {"$and": [{"source": {"$eq": source}}, {"chunk_id": {"$eq": chunk_id}}]}
+            for source, chunk_id in chunks
+        ]
+        pairs_filter = pair_filters[0] if len(pair_filters) == 1 else {"$or": pair_filters}
+        doc_filter = self._with_filter(filter, {"$and": [{"chunk_type": {"$eq": "document"}}, pairs_filter]})
+        #
+        # best scored document chunk per (source, chunk_id), as k=1 search per pair would return
+        wanted = set(chunks)
+        found = {}
+        for doc, score in self.vectoradapter.search_by_vector(query_embedding, filter=doc_filter, k=len(chunks) * 2):
+            key = (doc.metadata.get('source'), doc.metadata.get('chunk_id'))
+            if key in wanted and key not in found:
+                found[key] = (doc, score)
+        return list(found.values())
+
     def _apply_reranking(self, items, reranker):
         """Apply reranking rules to search results"""
         if not items:
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(*parts: Any) -> str:
+    """
+    Build a stable cache key from arbitrary (JSON-like) parts.
+
+    Values are serialized with sorted keys and hashed, so secrets (e.g. connection strings)
+    never end up in the key itself.
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class InstanceCache:
+    """
+    Thread-safe keyed cache with LRU and optional TTL eviction.
+
+    Intended for expensive, reusable objects (embedding models, vectorstores, compiled graphs, etc.).
+    Creation of a value is guarded by a per-key lock so concurrent callers of `get_or_create`
+    build the same object only once.
+    """
+
+    def __init__(self, maxsize: int = 16, ttl: Optional[float] = None,
+                 on_evict: Optional[Callable[[Hashable, Any], None]] = None, name: str = "cache"):
+        """
+        Args:
+            maxsize: Maximum number of entries kept; least recently used entries are evicted first.
+            ttl: Optional time-to-live in seconds for each entry.
+            on_evict: Optional callback invoked with (key, value) when an entry is evicted or invalidated.
+            name: Cache name used in logs.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self.name = name
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._key_locks: dict = {}
+        self._hits = 0
+        self._misses = 0
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl is not None and (time.monotonic() - created_at) > self.ttl
+
+    def _evict(self, key: Hashable, value: Any):
+        if self.on_evict:
+            try:
+                self.on_evict(key, value)
+            except Exception as e:
+                logger.warning(f"Failed to release evicted entry from {self.name}: {str(e)}")
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """ Get cached value or default if missing or expired """
+        expired = None
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self._misses += 1
+                return default
+            created_at, value = item
+            if self._expired(created_at):
+                expired = self._data.pop(key)[1]
+                self._misses += 1
+            else:
+                self._data.move_to_end(key)
+                self._hits += 1
+                return value
+        self._evict(key, expired)
+        return default
+
+    def set(self, key: Hashable, value: Any):
+        """ Put value into the cache evicting least recently used entries if needed """
+        evicted = []
+        with self._lock:
+            if key in self._data:
+                old_value = self._data.pop(key)[1]
+                if old_value is not value:
+                    evicted.append((key, old_value))
+            self._data[key] = (time.monotonic(), value)
+            while self.maxsize and len(self._data) > self.maxsize:
+                old_key, (_, old_value) = self._data.popitem(last=False)
+                evicted.append((old_key, old_value))
+        for old_key, old_value in evicted:
+            self._evict(old_key, old_value)
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """ Return cached value for the key or build it with factory (once per key, even under concurrency) """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            # another thread might have created the value while we were waiting
+            value = self.get(key, _MISSING)
+            if value is _MISSING:
+                logger.debug(f"Creating new entry in {self.name}")
+                value = factory()
+                self.set(key, value)
+        with self._lock:
+            self._key_locks.pop(key, None)
+        return value
+
+    def invalidate(self, key: Hashable):
+        """ Remove a single entry from the cache """
+        with self._lock:
+            item = self._data.pop(key, None)
+        if item is not None:
+            self._evict(key, item[1])
+
+    def keys(self) -> list:
+        """ Snapshot of currently cached keys (expired entries included until accessed) """
+        with self._lock:
+            return list(self._data)
+
+    def clear(self):
+        """ Remove all entries from the cache """
+        with self._lock:
+            items = list(self._data.items())
+            self._data.clear()
+        for key, item in items:
+            self._evict(key, item[1])
+
+    def stats(self) -> dict:
+        """ Cache usage statistics """
+        with self._lock:
+            return {
+                "name": self.name,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+_MISSING = object()
@@ -0,0 +1,61 @@
+import threading
+from contextlib import contextmanager
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """ Check if exception raised by provider SDK (openai, requests, httpx, etc.) means rate limiting """
+    status_code = getattr(error, 'status_code', None)
+    if status_code is None:
+        status_code = getattr(getattr(error, 'response', None), 'status_code', None)
+    if status_code == 429:
+        return True
+    if 'RateLimit' in type(error).__name__:
+        return True
+    message = str(error).lower()
+    return 'rate limit' in message or 'too many requests' in message
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limiter with additive-increase / multiplicative-decrease of the limit.
+
+    Callers report throttling (e.g. HTTP 429 from embedding provider) on release, which halves
+    the number of concurrent slots; after `increase_after` successful calls the limit grows back by one.
+    """
+
+    def __init__(self, max_concurrency: int, min_concurrency: int = 1, increase_after: int = 5):
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.increase_after = increase_after
+        self.limit = self.max_concurrency
+        self._active = 0
+        self._successes = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self._active >= self.limit:
+                self._cond.wait()
+            self._active += 1
+
+    def release(self, throttled: bool = False):
+        with self._cond:
+            self._active -= 1
+            if throttled:
+                self.limit = max(self.min_concurrency, self.limit // 2)
+                self._successes = 0
+            else:
+                self._successes += 1
+                if self._successes >= self.increase_after and self.limit < self.max_concurrency:
+                    self.limit += 1
+                    self._successes = 0
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self):
+        """ Acquire a slot for the duration of the block (reported as not throttled) """
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
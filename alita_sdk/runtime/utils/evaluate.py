@@ -1,12 +1,58 @@
+import json
 from traceback import format_exc
-from typing import List, Dict
+from typing import Any, List, Dict, Optional
 from abc import ABCMeta
-from jinja2 import Environment, TemplateSyntaxError, UndefinedError
+from jinja2 import Template, TemplateSyntaxError, UndefinedError
+from jinja2.sandbox import SandboxedEnvironment
 import logging
 from langgraph.graph import END
 
+from .cache import InstanceCache
+
 logger = logging.getLogger(__name__)
 
+
+def json_loads_filter(json_string: str, do_replace: bool = False):
+    if do_replace:
+        json_string = json_string.replace("'", "\"")
+    return json.loads(json_string)
+
+
+# Shared environment for graph templates (conditions, routers, state modifiers)
+environment = SandboxedEnvironment()
+environment.filters['json_loads'] = json_loads_filter
+
+# Compiled templates by source
+TEMPLATE_CACHE = InstanceCache(maxsize=512, name="templates")
+
+
+def compile_template(source: str) -> Template:
+    """ Compile template in the shared environment (cached by source) """
+    return TEMPLATE_CACHE.get_or_create(source, lambda: environment.from_string(source))
+
+
+def precompile_template(source: str) -> Optional[Template]:
+    """ Compile template at graph build time, invalid templates are reported when rendered """
+    try:
+        return compile_template(source)
+    except TemplateSyntaxError:
+        return None
+
+
+def summarize_state(state: Any) -> Any:
+    """ Short description of state values for logging: types and sizes instead of content """
+    if not isinstance(state, dict):
+        return type(state).__name__
+    summary = {}
+    for key, value in state.items():
+        if isinstance(value, (str, list, dict, tuple)):
+            summary[key] = f"{type(value).__name__}[{len(value)}]"
+        elif value is None or isinstance(value, (bool, int, float)):
+            summary[key] = value
+        else:
+            summary[key] = type(value).__name__
+    return summary
+
 class TransformationError(Exception):
     "Raised when transformation fails"
 
@@ -24,23 +70,17 @@ class MyABC(ABCMeta):
 
 
 class EvaluateTemplate(metaclass=MyABC):
-    def __init__(self, query: str, context: Dict):
+    def __init__(self, query: str, context: Dict, template: Optional[Template] = None):
         self.query = query
         self.context = context
+        self.template = template
 
     def extract(self):
-        environment = Environment()
-
-        def json_loads_filter(json_string: str,do_replace: bool = False):
-            import json
-            if do_replace:
-                json_string = json_string.replace("'", "\"")
-            return json.loads(json_string)
-
-        environment.filters['json_loads'] = json_loads_filter
         try:
-            template = environment.from_string(self.query)
-            logger.info(f"Condition context: {self.context}")
+            template = self.template or compile_template(self.query)
+            logger.info("Condition context: %s", summarize_state(self.context))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Condition context values: {self.context}")
             result = template.render(**self.context)
         except (TemplateSyntaxError, UndefinedError):
             logger.critical(format_exc())
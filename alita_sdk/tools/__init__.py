@@ -1,17 +1,27 @@
 import logging
+import threading
 from importlib import import_module
 from typing import Optional
 
 from langchain_core.tools import ToolException
 from langgraph.store.base import BaseStore
 
+from .toolkits_manifest import TOOLKITS_MANIFEST
+
 logger = logging.getLogger(__name__)
 
-# Available tools and toolkits - populated by safe imports
+# Available tools and toolkits - populated lazily by safe imports of manifest entries
 AVAILABLE_TOOLS = {}
 AVAILABLE_TOOLKITS = {}
 FAILED_IMPORTS = {}
 
+_MANIFEST = {entry[0]: entry for entry in TOOLKITS_MANIFEST}
+_LOADED = set()
+_ALL_LOADED = False
+_IMPORT_LOCK = threading.RLock()
+# Toolkit config schemas, built once per process
+_TOOLKIT_CONFIGS = None
+
 def _safe_import_tool(tool_name, module_path, get_tools_name=None, toolkit_class_name=None):
     """Safely import a tool module and register available functions/classes."""
     try:
@@ -33,61 +43,30 @@ def _safe_import_tool(tool_name, module_path, get_tools_name=None, toolkit_class
         FAILED_IMPORTS[tool_name] = str(e)
         logger.debug(f"Failed to import {tool_name}: {e}")
 
-# Safe imports for all tools
-_safe_import_tool('github', 'github', 'get_tools', 'AlitaGitHubToolkit')
-_safe_import_tool('openapi', 'openapi', 'get_tools')
-_safe_import_tool('jira', 'jira', 'get_tools', 'JiraToolkit')
-_safe_import_tool('confluence', 'confluence', 'get_tools', 'ConfluenceToolkit')
-_safe_import_tool('service_now', 'servicenow', 'get_tools', 'ServiceNowToolkit')
-_safe_import_tool('gitlab', 'gitlab', 'get_tools', 'AlitaGitlabToolkit')
-_safe_import_tool('gitlab_org', 'gitlab_org', 'get_tools', 'AlitaGitlabSpaceToolkit')
-_safe_import_tool('zephyr', 'zephyr', 'get_tools', 'ZephyrToolkit')
-_safe_import_tool('browser', 'browser', 'get_tools', 'BrowserToolkit')
-_safe_import_tool('report_portal', 'report_portal', 'get_tools', 'ReportPortalToolkit')
-_safe_import_tool('bitbucket', 'bitbucket', 'get_tools', 'AlitaBitbucketToolkit')
-_safe_import_tool('testrail', 'testrail', 'get_tools', 'TestrailToolkit')
-_safe_import_tool('testio', 'testio', 'get_tools', 'TestIOToolkit')
-_safe_import_tool('xray_cloud', 'xray', 'get_tools', 'XrayToolkit')
-_safe_import_tool('sharepoint', 'sharepoint', 'get_tools', 'SharepointToolkit')
-_safe_import_tool('qtest', 'qtest', 'get_tools', 'QtestToolkit')
-_safe_import_tool('zephyr_scale', 'zephyr_scale', 'get_tools', 'ZephyrScaleToolkit')
-_safe_import_tool('zephyr_enterprise', 'zephyr_enterprise', 'get_tools', 'ZephyrEnterpriseToolkit')
-_safe_import_tool('ado', 'ado', 'get_tools')
-_safe_import_tool('ado_repos', 'ado.repos', 'get_tools', 'AzureDevOpsReposToolkit')
-_safe_import_tool('ado_plans', 'ado.test_plan', None, 'AzureDevOpsPlansToolkit')
-_safe_import_tool('ado_boards', 'ado.work_item', None, 'AzureDevOpsWorkItemsToolkit')
-_safe_import_tool('ado_wiki', 'ado.wiki', None, 'AzureDevOpsWikiToolkit')
-_safe_import_tool('rally', 'rally', 'get_tools', 'RallyToolkit')
-_safe_import_tool('sql', 'sql', 'get_tools', 'SQLToolkit')
-_safe_import_tool('sonar', 'code.sonar', 'get_tools', 'SonarToolkit')
-_safe_import_tool('google_places', 'google_places', 'get_tools', 'GooglePlacesToolkit')
-_safe_import_tool('yagmail', 'yagmail', 'get_tools', 'AlitaYagmailToolkit')
-_safe_import_tool('aws', 'cloud.aws', None, 'AWSToolkit')
-_safe_import_tool('azure', 'cloud.azure', None, 'AzureToolkit')
-_safe_import_tool('gcp', 'cloud.gcp', None, 'GCPToolkit')
-_safe_import_tool('k8s', 'cloud.k8s', None, 'KubernetesToolkit')
-_safe_import_tool('custom_open_api', 'custom_open_api', None, 'OpenApiToolkit')
-_safe_import_tool('elastic', 'elastic', None, 'ElasticToolkit')
-_safe_import_tool('keycloak', 'keycloak', None, 'KeycloakToolkit')
-_safe_import_tool('localgit', 'localgit', None, 'AlitaLocalGitToolkit')
-_safe_import_tool('pandas', 'pandas', 'get_tools', 'PandasToolkit')
-_safe_import_tool('azure_search', 'azure_ai.search', 'get_tools', 'AzureSearchToolkit')
-_safe_import_tool('figma', 'figma', 'get_tools', 'FigmaToolkit')
-_safe_import_tool('salesforce', 'salesforce', 'get_tools', 'SalesforceToolkit')
-_safe_import_tool('carrier', 'carrier', 'get_tools', 'AlitaCarrierToolkit')
-_safe_import_tool('ocr', 'ocr', 'get_tools', 'OCRToolkit')
-_safe_import_tool('pptx', 'pptx', 'get_tools', 'PPTXToolkit')
-_safe_import_tool('postman', 'postman', 'get_tools', 'PostmanToolkit')
-_safe_import_tool('memory', 'memory', 'get_tools', 'MemoryToolkit')
-_safe_import_tool('zephyr_squad', 'zephyr_squad', 'get_tools', 'ZephyrSquadToolkit')
-_safe_import_tool('slack', 'slack', 'get_tools', 'SlackToolkit')
-_safe_import_tool('bigquery', 'google.bigquery', 'get_tools', 'BigQueryToolkit')
-_safe_import_tool('delta_lake', 'aws.delta_lake', 'get_tools', 'DeltaLakeToolkit')
-
-# Log import summary
-available_count = len(AVAILABLE_TOOLS)
-total_attempted = len(AVAILABLE_TOOLS) + len(FAILED_IMPORTS)
-logger.info(f"Tool imports completed: {available_count}/{total_attempted} successful")
+def _load_tool(tool_name):
+    """Import toolkit from the manifest on first use. Returns registered entry or None."""
+    if tool_name not in _LOADED and tool_name in _MANIFEST:
+        with _IMPORT_LOCK:
+            if tool_name not in _LOADED:
+                _safe_import_tool(*_MANIFEST[tool_name])
+                _LOADED.add(tool_name)
+    return AVAILABLE_TOOLS.get(tool_name)
+
+def _load_all_tools():
+    """Import all toolkits from the manifest (needed for toolkit listing and diagnostics)."""
+    global _ALL_LOADED
+    if _ALL_LOADED:
+        return
+    with _IMPORT_LOCK:
+        if _ALL_LOADED:
+            return
+        for tool_name in _MANIFEST:
+            _load_tool(tool_name)
+        _ALL_LOADED = True
+        # Log import summary
+        available_count = len(AVAILABLE_TOOLS)
+        total_attempted = len(AVAILABLE_TOOLS) + len(FAILED_IMPORTS)
+        logger.info(f"Tool imports completed: {available_count}/{total_attempted} successful")
 
 def get_tools(tools_list, alita, llm, store: Optional[BaseStore] = None, *args, **kwargs):
     tools = []
@@ -104,10 +83,10 @@ def get_tools(tools_list, alita, llm, store: Optional[BaseStore] = None, *args,
 
         # Handle special cases for ADO tools
         if tool_type in ['ado_boards', 'ado_wiki', 'ado_plans']:
-            tools.extend(AVAILABLE_TOOLS['ado']['get_tools'](tool_type, tool))
+            tools.extend(_load_tool('ado')['get_tools'](tool_type, tool))
 
         # Check if tool is available and has get_tools function
-        elif tool_type in AVAILABLE_TOOLS and 'get_tools' in AVAILABLE_TOOLS[tool_type]:
+        elif 'get_tools' in (_load_tool(tool_type) or {}):
             try:
                 get_tools_func = AVAILABLE_TOOLS[tool_type]['get_tools']
                 tools.extend(get_tools_func(tool))
@@ -117,7 +96,7 @@ def get_tools(tools_list, alita, llm, store: Optional[BaseStore] = None, *args,
                 raise ToolException(f"Error getting tools for {tool_type}: {e}")
 
         # Handle ADO repos special case (it might be requested as azure_devops_repos)
-        elif tool_type in ['ado_repos', 'azure_devops_repos'] and 'ado_repos' in AVAILABLE_TOOLS:
+        elif tool_type in ['ado_repos', 'azure_devops_repos'] and _load_tool('ado_repos'):
             try:
                 get_tools_func = AVAILABLE_TOOLS['ado_repos']['get_tools']
                 tools.extend(get_tools_func(tool))
@@ -150,6 +129,10 @@ def get_tools(tools_list, alita, llm, store: Optional[BaseStore] = None, *args,
 
 def get_toolkits():
     """Return toolkit configurations for all successfully imported toolkits."""
+    global _TOOLKIT_CONFIGS
+    if _TOOLKIT_CONFIGS is not None:
+        return list(_TOOLKIT_CONFIGS)
+    _load_all_tools()
     toolkit_configs = []
 
     for toolkit_name, toolkit_class in AVAILABLE_TOOLKITS.items():
@@ -162,22 +145,27 @@ def get_toolkits():
             logger.error(f"Error getting config schema for {toolkit_name}: {e}")
 
     logger.info(f"Successfully loaded {len(toolkit_configs)} toolkit configurations")
-    return toolkit_configs
+    _TOOLKIT_CONFIGS = toolkit_configs
+    return list(toolkit_configs)
 
 def get_available_tools():
     """Return list of available tool types."""
+    _load_all_tools()
     return list(AVAILABLE_TOOLS.keys())
 
 def get_failed_imports():
     """Return dictionary of failed imports and their error messages."""
+    _load_all_tools()
     return FAILED_IMPORTS.copy()
 
 def get_available_toolkits():
     """Return list of available toolkit class names."""
+    _load_all_tools()
     return list(AVAILABLE_TOOLKITS.keys())
 
 def diagnose_imports():
     """Print diagnostic information about tool imports."""
+    _load_all_tools()
     available_count = len(AVAILABLE_TOOLS)
     failed_count = len(FAILED_IMPORTS)
     total_count = available_count + failed_count
@@ -339,6 +339,11 @@ class ReposApiWrapper(BaseCodeToolApiWrapper):
         else:
             return None
 
+    def _local_checkout_source(self, branch: str):
+        """Get clone URL and credentials for a local checkout of the repository."""
+        repository = self._client.get_repository(self.repository_id, project=self.project)
+        return repository.remote_url, "", self.token.get_secret_value() if self.token else None
+
     def _get_files(
             self,
             path: str = "",
@@ -17,10 +17,6 @@ import xml.etree.ElementTree as ET
 
 from ..work_item import AzureDevOpsApiWrapper
 from ...elitea_base import BaseVectorStoreToolApiWrapper, extend_with_vector_tools
-try:
-    from alita_sdk.runtime.langchain.interfaces.llm_processor import get_embeddings
-except ImportError:
-    from alita_sdk.langchain.interfaces.llm_processor import get_embeddings
 
 logger = logging.getLogger(__name__)
 
@@ -386,7 +382,7 @@ class TestPlanApiWrapper(BaseVectorStoreToolApiWrapper):
     ):
         """Load ADO TestCases into the vector store."""
         docs = self._base_loader(plan_id, suite_ids)
-        embedding = get_embeddings(self.embedding_model, self.embedding_model_params)
+        embedding = self._get_embeddings()
         vs = self._init_vector_store(collection_suffix, embeddings=embedding)
         return vs.index_documents(docs, progress_step=progress_step, clean_index=clean_index)
 
@@ -16,10 +16,6 @@ from msrest.authentication import BasicAuthentication
 from pydantic import create_model, PrivateAttr, SecretStr
 from pydantic import model_validator
 from pydantic.fields import Field
-try:
-    from alita_sdk.runtime.langchain.interfaces.llm_processor import get_embeddings
-except ImportError:
-    from alita_sdk.langchain.interfaces.llm_processor import get_embeddings
 
 from ...elitea_base import BaseToolApiWrapper
 
@@ -251,7 +247,7 @@ class AzureDevOpsApiWrapper(BaseVectorStoreToolApiWrapper):
     ):
         """Load ADO Wiki pages into the vector store."""
         docs = self._base_loader(wiki_identifier)
-        embedding = get_embeddings(self.embedding_model, self.embedding_model_params)
+        embedding = self._get_embeddings()
         vs = self._init_vector_store(collection_suffix, embeddings=embedding)
         return vs.index_documents(docs, progress_step=progress_step, clean_index=clean_index)
 
@@ -251,6 +251,20 @@ class BitbucketAPIWrapper(BaseCodeToolApiWrapper):
     #     except Exception as e:
     #         raise ToolException(f"Can't extract file commit hash (`{file_path}`) due to error:\n{str(e)}")
 
+    def _local_checkout_source(self, branch: str):
+        """
+        Get clone URL and credentials for a local checkout of the bitbucket repo
+        Parameters:
+            branch(str): branch name
+        Returns:
+            tuple: (clone url, username, password)
+        """
+        if self.cloud:
+            url = f"https://bitbucket.org/{self.project}/{self.repository}.git"
+        else:
+            url = f"{self.url.rstrip('/')}/scm/{self.project}/{self.repository}.git"
+        return url, self.username, self.password.get_secret_value() if self.password else None
+
     def _read_file(self, file_path: str, branch: str) -> str:
         """
         Reads a file from the gitlab repo
@@ -1,10 +1,16 @@
-import os
+import multiprocessing
+import threading
+import time
 
-from typing import Generator
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import lru_cache
+from itertools import chain, islice
+from typing import Generator, Optional
 from langchain.schema import Document
 from langchain.text_splitter import RecursiveCharacterTextSplitter, TokenTextSplitter
 
-from .constants import (Language, get_langchain_language, get_file_extension, 
+from .constants import (Language, get_langchain_language, get_file_extension,
                         get_programming_language, image_extensions, default_skip)
 from .treesitter.treesitter import Treesitter, TreesitterMethodNode
 
@@ -12,85 +18,204 @@ from logging import getLogger
 
 logger = getLogger(__name__)
 
-def parse_code_files_for_db(file_content_generator: Generator[str, None, None], *args, **kwargs) -> Generator[Document, None, None]:
+# Files parsed in the calling process before a process pool is started
+POOL_THRESHOLD = 32
+
+
+class CodeParseMetrics:
+    """ Per-language parse statistics: files, chunks and parse time (seconds) """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.languages: dict = {}
+
+    def add(self, language: str, seconds: float, chunks: int):
+        with self._lock:
+            stats = self.languages.setdefault(language, {"files": 0, "chunks": 0, "seconds": 0.0})
+            stats["files"] += 1
+            stats["chunks"] += chunks
+            stats["seconds"] += seconds
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {language: dict(stats) for language, stats in self.languages.items()}
+
+    def log(self):
+        for language, stats in sorted(self.summary().items()):
+            logger.info(f"Parsed {stats['files']} {language} files into {stats['chunks']} chunks "
+                        f"in {stats['seconds']:.2f}s")
+
+
+# Parsers and splitters are created once per (worker) process; tree-sitter parsers
+# are not thread-safe, so they are kept per thread
+_local = threading.local()
+
+
+def _get_treesitter(programming_language: Language) -> Treesitter:
+    parsers = _local.__dict__.setdefault("parsers", {})
+    if programming_language not in parsers:
+        parsers[programming_language] = Treesitter.create_treesitter(programming_language)
+    return parsers[programming_language]
+
+
+@lru_cache(maxsize=None)
+def _get_code_splitter(programming_language: Language) -> Optional[RecursiveCharacterTextSplitter]:
+    langchain_language = get_langchain_language(programming_language)
+    if not langchain_language:
+        return None
+    return RecursiveCharacterTextSplitter.from_language(
+        language=langchain_language,
+        chunk_size=1024,
+        chunk_overlap=128,
+    )
+
+
+@lru_cache(maxsize=None)
+def _get_token_splitter() -> TokenTextSplitter:
+    return TokenTextSplitter(encoding_name="gpt2", chunk_size=256, chunk_overlap=30)
+
+
+def _parse_file(data: dict):
+    """
+    Parse a single file into (page_content, metadata) chunks.
+
+    Returns:
+        (language, parse seconds, chunks), language is None for skipped files
+    """
+    file_name: str = data.get("file_name")
+    file_content: str = data.get("file_content")
+
+    file_extension = get_file_extension(file_name)
+    programming_language = get_programming_language(file_extension)
+    if len(file_content.strip()) == 0 or file_name in default_skip:
+        logger.debug(f"Skipping file: {file_name}")
+        return None, 0.0, []
+    if file_extension in image_extensions:
+        logger.debug(f"Skipping image file: {file_name} as it is image")
+        return None, 0.0, []
+    started = time.perf_counter()
+    commit_hash = data.get("commit_hash")
+
+    def _metadata(method_name):
+        metadata = {
+            "filename": file_name,
+            "method_name": method_name,
+            "language": programming_language.value,
+        }
+        if commit_hash is not None:
+            metadata["commit_hash"] = commit_hash
+        return metadata
+
+    chunks = []
+    if programming_language == Language.UNKNOWN:
+        for document in _get_token_splitter().split_text(file_content):
+            chunks.append((document, _metadata(None)))
+    else:
+        try:
+            code_splitter = _get_code_splitter(programming_language)
+            treesitterNodes: list[TreesitterMethodNode] = _get_treesitter(programming_language).parse(
+                file_content.encode()
+            )
+            for node in treesitterNodes:
+                method_source_code = node.method_source_code
+
+                if node.doc_comment and programming_language != Language.PYTHON:
+                    method_source_code = node.doc_comment + "\n" + method_source_code
+
+                splitted_documents = [method_source_code]
+                if code_splitter:
+                    splitted_documents = code_splitter.split_text(method_source_code)
+
+                for splitted_document in splitted_documents:
+                    chunks.append((splitted_document, _metadata(node.name)))
+        except Exception as e:
+            from traceback import format_exc
+            logger.error(f"Error: {format_exc()}")
+            raise e
+    return programming_language.value, time.perf_counter() - started, chunks
+
+
+def _parse_in_pool(files, max_workers: int, ordered: bool, max_pending: int):
+    """
+    Parse files in a process pool keeping at most max_pending files in flight.
+
+    Results are yielded in input order if ordered, otherwise as soon as they are ready.
+    """
+    # spawn: forking a process with running threads (HTTP/DB pools) is unsafe
+    pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+    pending = deque() if ordered else set()
+
+    def _completed():
+        if ordered:
+            return [pending.popleft()]
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        pending.difference_update(done)
+        return done
+
+    try:
+        for data in files:
+            future = pool.submit(_parse_file, data)
+            if ordered:
+                pending.append(future)
+            else:
+                pending.add(future)
+            while len(pending) >= max_pending:
+                for future in _completed():
+                    yield future.result()
+        while pending:
+            for future in _completed():
+                yield future.result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def parse_code_files_for_db(file_content_generator: Generator[str, None, None], config: Optional[dict] = None,
+                            *args, max_workers: Optional[int] = None, ordered: Optional[bool] = None,
+                            max_pending: Optional[int] = None, metrics: Optional[CodeParseMetrics] = None,
+                            **kwargs) -> Generator[Document, None, None]:
     """
     Parses code files from a generator and returns a generator of Document objects for database storage.
 
+    Files are parsed in the calling process. With max_workers above 1, inputs of at least POOL_THRESHOLD
+    files are parsed in a pool of max_workers processes.
+
     Args:
         file_content_generator (Generator[str, None, None]): Generator that yields file contents.
+        config (dict, optional): Chunker configuration (CodeChunkerConfig), max_workers and ordered
+            are taken from it unless passed as arguments.
+        max_workers (int, optional): Number of parsing processes (defaults to 1, no process pool).
+        ordered (bool, optional): Yield documents in input file order (otherwise in completion order),
+            defaults to True.
+        max_pending (int, optional): Files read ahead and parsed concurrently (defaults to 4 per worker).
+        metrics (CodeParseMetrics, optional): Collects per-language parse statistics.
 
     Returns:
         Generator[Document, None, None]: Generator of Document objects containing parsed code information.
     """
-    code_splitter = None
-    for data in file_content_generator:
-        file_name: str = data.get("file_name")
-        file_content: str = data.get("file_content")
-        file_bytes = file_content.encode()
-
-        file_extension = get_file_extension(file_name)
-        programming_language = get_programming_language(file_extension)
-        if len(file_content.strip()) == 0 or file_name in default_skip:
-            logger.debug(f"Skipping file: {file_name}")
-            continue
-        if file_extension in image_extensions:
-            logger.debug(f"Skipping image file: {file_name} as it is image")
-            continue
-        if programming_language == Language.UNKNOWN:
-            documents = TokenTextSplitter(encoding_name="gpt2", chunk_size=256, chunk_overlap=30).split_text(file_content)
-            for document in documents:
-                metadata = {
-                    "filename": file_name,
-                    "method_name": node.name,
-                    "language": programming_language.value,
-                }
-                commit_hash = data.get("commit_hash")
-                if commit_hash is not None:
-                    metadata["commit_hash"] = commit_hash
-                document = Document(
-                    page_content=document,
+    config = config or {}
+    if max_workers is None:
+        max_workers = config.get("max_workers") or 1
+    if ordered is None:
+        ordered = config.get("ordered", True)
+    if metrics is None:
+        metrics = CodeParseMetrics()
+    files = iter(file_content_generator)
+    head = list(islice(files, POOL_THRESHOLD))
+    if max_workers <= 1 or len(head) < POOL_THRESHOLD:
+        results = (_parse_file(data) for data in chain(head, files))
+    else:
+        logger.info(f"Parsing code files in {max_workers} processes")
+        results = _parse_in_pool(chain(head, files), max_workers, ordered, max_pending or max_workers * 4)
+    try:
+        for language, seconds, chunks in results:
+            if language is None:
+                continue
+            metrics.add(language, seconds, len(chunks))
+            for page_content, metadata in chunks:
+                yield Document(
+                    page_content=page_content,
                     metadata=metadata,
                 )
-                yield document
-        else:
-            try:
-                langchain_language = get_langchain_language(programming_language)
-
-                if langchain_language:
-                    code_splitter = RecursiveCharacterTextSplitter.from_language(
-                        language=langchain_language,
-                        chunk_size=1024,
-                        chunk_overlap=128,
-                    )
-                treesitter_parser = Treesitter.create_treesitter(programming_language)
-                treesitterNodes: list[TreesitterMethodNode] = treesitter_parser.parse(
-                    file_bytes
-                )
-                for node in treesitterNodes:
-                    method_source_code = node.method_source_code
-
-                    if node.doc_comment and programming_language != Language.PYTHON:
-                        method_source_code = node.doc_comment + "\n" + method_source_code
-
-                    splitted_documents = [method_source_code]
-                    if code_splitter:
-                        splitted_documents = code_splitter.split_text(method_source_code)
-
-                    for splitted_document in splitted_documents:
-                        metadata = {
-                            "filename": file_name,
-                            "method_name": node.name,
-                            "language": programming_language.value,
-                        }
-                        commit_hash = data.get("commit_hash")
-                        if commit_hash is not None:
-                            metadata["commit_hash"] = commit_hash
-                        document = Document(
-                            page_content=splitted_document,
-                            metadata=metadata,
-                        )
-                        yield document
-            except Exception as e:
-                from traceback import format_exc
-                logger.error(f"Error: {format_exc()}")
-                raise e
\ No newline at end of file
+    finally:
+        results.close()
+        metrics.log()
@@ -10,6 +10,7 @@ class TreesitterPython(Treesitter):
         super().__init__(
             Language.PYTHON, "function_definition", "identifier", "expression_statement"
         )
+        self._doc_str_query = None
 
     def parse(self, file_bytes: bytes) -> list[TreesitterMethodNode]:
         """
@@ -77,12 +78,13 @@ class TreesitterPython(Treesitter):
         Returns:
             str or None: The documentation comment string if found, otherwise None.
         """
-        query_code = """
-            (function_definition
-                body: (block . (expression_statement (string)) @function_doc_str))
-        """
-        doc_str_query = self.language.query(query_code)
-        doc_strs = doc_str_query.captures(node)
+        if self._doc_str_query is None:
+            # compiled once per parser instance
+            self._doc_str_query = self.language.query("""
+                (function_definition
+                    body: (block . (expression_statement (string)) @function_doc_str))
+            """)
+        doc_strs = self._doc_str_query.captures(node)
 
         if doc_strs:
             return doc_strs[0][0].text.decode()
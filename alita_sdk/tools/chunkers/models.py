@@ -7,6 +7,7 @@ class StatisticalChunkerConfig(BaseModel):
     embedding: Optional[Any] = Field(default=None, description="Embedding model instance")
     max_doc_size: int = Field(default=300, description="Maximum tokens per document split")
     batch_size: int = Field(default=64, description="Batch size for processing documents")
+    embedding_batch_size: int = Field(default=2000, description="Number of splits (across documents) embedded together")
     window_size: int = Field(default=5, description="Window size for similarity calculation")
     dynamic_threshold: bool = Field(default=True, description="Whether to use dynamic threshold")
     min_split_tokens: int = Field(default=100, description="Minimum tokens per split")
@@ -52,3 +53,6 @@ class CodeChunkerConfig(BaseModel):
     chunk_overlap: int = Field(default=128, description="Character overlap between chunks")
     token_chunk_size: int = Field(default=256, description="Token chunk size for unknown language files")
     token_overlap: int = Field(default=30, description="Token overlap for unknown language files")
+    max_workers: Optional[int] = Field(default=None,
+                                       description="Number of parsing processes (files are parsed in the calling process by default)")
+    ordered: bool = Field(default=True, description="Whether to keep input file order of parsed documents")
@@ -2,9 +2,7 @@ from typing import Generator
 from langchain.schema import Document
 from langchain_core.documents import Document
 from langchain_text_splitters import MarkdownHeaderTextSplitter
-from langchain.text_splitter import TokenTextSplitter
-from ..utils import tiktoken_length
-from copy import deepcopy as copy
+from ..utils import encode_batch, split_by_tokens
 
 
 def markdown_chunker(file_content_generator: Generator[Document, None, None], config: dict, *args, **kwargs) -> Generator[Document, None, None]:
@@ -24,30 +22,21 @@ def markdown_chunker(file_content_generator: Generator[Document, None, None], co
             return_each_line=return_each_line
         )
         md_header_splits = markdown_splitter.split_text(doc_content)
-        for chunk in md_header_splits:
-            if tiktoken_length(chunk.page_content) > max_tokens:
-                for subchunk in TokenTextSplitter(encoding_name="cl100k_base", 
-                                                  chunk_size=max_tokens, 
-                                                  chunk_overlap=tokens_overlapping
-                                                  ).split_text(chunk.page_content):
-                    chunk_id += 1
-                    headers_meta = list(chunk.metadata.values())
-                    docmeta = copy(doc_metadata)
-                    docmeta.update({"headers": "; ".join(headers_meta)})
-                    docmeta['chunk_id'] = chunk_id
-                    docmeta['chunk_type'] = "document"
-                    yield Document(
-                        page_content=subchunk,
-                        metadata=docmeta
-                    )
+        # all sections are tokenized in one batch, oversized ones are sliced from the same tokens
+        for chunk, tokens in zip(md_header_splits, encode_batch([chunk.page_content for chunk in md_header_splits])):
+            if len(tokens) > max_tokens:
+                subchunks = [piece for piece, _ in split_by_tokens(chunk.page_content, max_tokens,
+                                                                  tokens_overlapping, tokens=tokens)]
             else:
+                subchunks = [chunk.page_content]
+            headers_meta = "; ".join(chunk.metadata.values())
+            for subchunk in subchunks:
                 chunk_id += 1
-                headers_meta = list(chunk.metadata.values())
-                docmeta = copy(doc_metadata)
-                docmeta.update({"headers": "; ".join(headers_meta)})
+                docmeta = dict(doc_metadata)
+                docmeta["headers"] = headers_meta
                 docmeta['chunk_id'] = chunk_id
                 docmeta['chunk_type'] = "document"
                 yield Document(
-                    page_content=chunk.page_content,
+                    page_content=subchunk,
                     metadata=docmeta
-                )
\ No newline at end of file
+                )
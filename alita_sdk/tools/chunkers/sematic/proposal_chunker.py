@@ -3,11 +3,10 @@ from typing import Generator
 from logging import getLogger
 from langchain.schema import Document
 from langchain_core.prompts import ChatPromptTemplate
-from langchain.text_splitter import TokenTextSplitter
 
 from typing import Optional, List
 from langchain_core.pydantic_v1 import BaseModel
-from ..utils import tiktoken_length
+from ..utils import split_by_tokens
 
 logger = getLogger(__name__)
 
@@ -82,38 +81,27 @@ def proposal_chunker(file_content_generator: Generator[Document, None, None], co
         chunk_id = 0
         doc_metadata = doc.metadata
         doc_content = doc.page_content
-        if tiktoken_length(doc_content) > max_tokens_doc:
-            splits = TokenTextSplitter(encoding_name='cl100k_base', 
-                                       chunk_size=max_tokens_doc, chunk_overlap=0
-                                       ).split_text(doc_content)
-        else:
-            splits = [doc_content]
+        splits = [piece for piece, _ in split_by_tokens(doc_content, max_tokens_doc)] or [doc_content]
         chunker = AgenticChunker(llm=llm)
         for split in splits:    
             for chunk in chunker.add_propositions(split):
                 chunk_id += 1
-                docmeta = doc_metadata.copy()
-                docmeta['chunk_id'] = chunk_id
-                docmeta['chunk_type'] = "title"
+                # every yielded document gets its own shallow copy of metadata
+                docmeta = dict(doc_metadata, chunk_id=chunk_id)
                 yield Document(
-                    metadata=docmeta,
+                    metadata=dict(docmeta, chunk_type="title"),
                     page_content=chunk['title'],
                 )
-                docmeta['chunk_type'] = "summary"
                 yield Document(
-                    metadata=docmeta,
+                    metadata=dict(docmeta, chunk_type="summary"),
                     page_content=chunk['summary'],
                 )
-                docmeta['chunk_type'] = "propositions"
                 yield Document(
-                    metadata=docmeta,
+                    metadata=dict(docmeta, chunk_type="propositions"),
                     page_content="\n".join(chunk['propositions']),
                 )
-                docmeta['chunk_type'] = "document"
-                docmeta.update({"chunk_title": chunk['title']})
-                docmeta.update({"chunk_summary": chunk['summary']})
                 yield Document(
-                    metadata=docmeta,
+                    metadata=dict(docmeta, chunk_type="document",
+                                  chunk_title=chunk['title'], chunk_summary=chunk['summary']),
                     page_content=split,
                 )
-    
\ No newline at end of file
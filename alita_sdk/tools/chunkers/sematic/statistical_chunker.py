@@ -1,15 +1,13 @@
 
 import numpy as np
-from typing import Generator, Optional, List
+from typing import Generator, List, Set, Tuple
 from logging import getLogger
 from langchain.schema import Document
-from langchain.text_splitter import TokenTextSplitter
-from tqdm.auto import tqdm
 
 logger = getLogger(__name__)
 
 from .base import Chunk
-from ..utils import tiktoken_length
+from ..utils import split_by_tokens
 
 
 def _encode_documents(embeddings: 'BaseModel', docs: List[str]) -> np.ndarray: # type: ignore
@@ -33,43 +31,46 @@ def _encode_documents(embeddings: 'BaseModel', docs: List[str]) -> np.ndarray: #
             logger.error(f"Error encoding documents {batch_docs}: {e}")
             raise
     logger.info(f"Encoded {len(_embeddings)} embeddings.")
-    return np.array(_embeddings)
-
-def _calculate_similarity_scores(encoded_docs: np.ndarray, window_size: int) -> List[float]:
-        raw_similarities = []
-        for idx in range(1, len(encoded_docs)):
-            window_start = max(0, idx - window_size)
-            cumulative_context = np.mean(encoded_docs[window_start:idx], axis=0)
-            curr_sim_score = np.dot(cumulative_context, encoded_docs[idx]) / (
-                np.linalg.norm(cumulative_context) * np.linalg.norm(encoded_docs[idx])
-                + 1e-10
-            )
-            raw_similarities.append(curr_sim_score)
-        return raw_similarities
-
-def _find_split_indices(
-        similarities: List[float], calculated_threshold: float
-    ) -> List[int]:
-        split_indices = []
-        for idx, score in enumerate(similarities):
-            logger.debug(f"Similarity score at index {idx}: {score}")
-            if score < calculated_threshold:
-                logger.debug(
-                    f"Adding to split_indices due to score < threshold: "
-                    f"{score} < {calculated_threshold}"
-                )
-                # Chunk after the document at idx
-                split_indices.append(idx + 1)
-        return split_indices
-    
-def _find_optimal_threshold(docs: List[str], similarity_scores: List[float], 
-                            min_split_tokens:int = 100, 
+    return np.array(_embeddings, dtype=np.float64)
+
+def _calculate_similarity_scores(encoded_docs: np.ndarray, window_size: int) -> np.ndarray:
+    """
+    Cosine similarity of each document (starting from the second one) to the mean
+    of up to window_size preceding documents, computed with cumulative sums.
+    """
+    count = len(encoded_docs)
+    if count < 2:
+        return np.empty(0)
+    cumulative = np.vstack([np.zeros((1, encoded_docs.shape[1])), np.cumsum(encoded_docs, axis=0)])
+    ends = np.arange(1, count)
+    starts = np.maximum(0, ends - window_size)
+    context = (cumulative[ends] - cumulative[starts]) / (ends - starts)[:, None]
+    current = encoded_docs[1:]
+    return np.einsum("ij,ij->i", context, current) / (
+        np.linalg.norm(context, axis=1) * np.linalg.norm(current, axis=1) + 1e-10
+    )
+
+def _find_split_indices(similarities: np.ndarray, calculated_threshold: float) -> Set[int]:
+    # Chunk after the document at idx when its successor is not similar enough
+    return set((np.flatnonzero(similarities < calculated_threshold) + 1).tolist())
+
+def _find_optimal_threshold(token_counts: np.ndarray, similarity_scores: np.ndarray,
+                            min_split_tokens:int = 100,
                             max_split_tokens:int = 300,
                             split_tokens_tolerance: int = 10,
                             threshold_adjustment: float = 0.01
                             ) -> float:
-    token_counts = [tiktoken_length(doc) for doc in docs]
-    cumulative_token_counts = np.cumsum([0] + token_counts)
+    """
+    Binary search of the threshold giving median chunk size within token limits.
+
+    Similarities are sorted once, so split points for a threshold are the first
+    searchsorted() positions of the sort order instead of a full rescan.
+    """
+    if len(similarity_scores) == 0:
+        return 0.0
+    cumulative_token_counts = np.concatenate(([0], np.cumsum(token_counts)))
+    order = np.argsort(similarity_scores, kind="stable")
+    sorted_scores = similarity_scores[order]
 
     # Analyze the distribution of similarity scores to set initial bounds
     median_score = np.median(similarity_scores)
@@ -84,19 +85,13 @@ def _find_optimal_threshold(docs: List[str], similarity_scores: List[float],
     calculated_threshold = 0.0
     while low <= high:
         calculated_threshold = (low + high) / 2
-        split_indices = _find_split_indices(similarity_scores, calculated_threshold)
+        splits_count = np.searchsorted(sorted_scores, calculated_threshold, side="left")
+        split_indices = np.sort(order[:splits_count]) + 1
         logger.debug(f"Iteration {iteration}: Trying threshold: {calculated_threshold}")
 
         # Calculate the token counts for each split using the cumulative sums
-        split_token_counts = [
-            cumulative_token_counts[end] - cumulative_token_counts[start]
-            for start, end in zip(
-                [0] + split_indices, split_indices + [len(token_counts)]
-            )
-        ]
-        
-        # Calculate the median token count for the chunks
-        median_tokens = np.median(split_token_counts)
+        bounds = np.concatenate(([0], split_indices, [len(token_counts)]))
+        median_tokens = np.median(np.diff(cumulative_token_counts[bounds]))
         logger.debug(
             f"Iteration {iteration}: Median tokens per split: {median_tokens}"
         )
@@ -123,22 +118,9 @@ def _find_optimal_threshold(docs: List[str], similarity_scores: List[float],
 
     return calculated_threshold
 
-def _find_split_indices(similarities: List[float], calculated_threshold: float) -> List[int]:
-    split_indices = []
-    for idx, score in enumerate(similarities):
-        logger.debug(f"Similarity score at index {idx}: {score}")
-        if score < calculated_threshold:
-            logger.debug(
-                f"Adding to split_indices due to score < threshold: "
-                f"{score} < {calculated_threshold}"
-            )
-            # Chunk after the document at idx
-            split_indices.append(idx + 1)
-    return split_indices
 
-
-def _split_documents(docs: List[str], split_indices: List[int], similarities: List[float],
-                     max_split_tokens: int = 300, min_split_tokens: int = 100, 
+def _split_documents(docs: List[str], token_counts: List[int], split_indices: Set[int], similarities: np.ndarray,
+                     max_split_tokens: int = 300, min_split_tokens: int = 100,
                      ) -> List[Chunk]:
     """
     This method iterates through each document, appending it to the current split
@@ -148,19 +130,11 @@ def _split_documents(docs: List[str], split_indices: List[int], similarities: Li
     or when a split point is reached and the minimum token requirement is met,
     the current split is finalized and added to the List of chunks.
     """
-    token_counts = [tiktoken_length(doc) for doc in docs]
     chunks, current_split = [], []
     current_tokens_count = 0
 
-    # Statistics
-    chunks_by_threshold = 0
-    chunks_by_max_chunk_size = 0
-    chunks_by_last_split = 0
-
     for doc_idx, doc in enumerate(docs):
         doc_token_count = token_counts[doc_idx]
-        logger.debug(f"Accumulative token count: {current_tokens_count} tokens")
-        logger.debug(f"Document token count: {doc_token_count} tokens")
         # Check if current index is a split point based on similarity
         if doc_idx + 1 in split_indices:
             if (
@@ -174,11 +148,11 @@ def _split_documents(docs: List[str], split_indices: List[int], similarities: Li
                 current_tokens_count += doc_token_count
 
                 triggered_score = (
-                    similarities[doc_idx] if doc_idx < len(similarities) else None
+                    float(similarities[doc_idx]) if doc_idx < len(similarities) else None
                 )
                 chunks.append(
                     Chunk(
-                        splits=current_split.copy(),
+                        splits=current_split,
                         is_triggered=True,
                         triggered_score=triggered_score,
                         token_count=current_tokens_count,
@@ -189,7 +163,6 @@ def _split_documents(docs: List[str], split_indices: List[int], similarities: Li
                     f"threshold {triggered_score}."
                 )
                 current_split, current_tokens_count = [], 0
-                chunks_by_threshold += 1
                 continue  # Move to the next document after splitting
 
         # Check if adding the current document exceeds the max token limit
@@ -197,15 +170,14 @@ def _split_documents(docs: List[str], split_indices: List[int], similarities: Li
             if current_tokens_count >= min_split_tokens:
                 chunks.append(
                     Chunk(
-                        splits=current_split.copy(),
+                        splits=current_split,
                         is_triggered=False,
                         triggered_score=None,
                         token_count=current_tokens_count,
                     )
                 )
-                chunks_by_max_chunk_size += 1
                 logger.debug(
-                    f"Chink finalized with {current_tokens_count} tokens due to "
+                    f"Chunk finalized with {current_tokens_count} tokens due to "
                     f"exceeding token limit of {max_split_tokens}."
                 )
                 current_split, current_tokens_count = [], 0
@@ -217,23 +189,16 @@ def _split_documents(docs: List[str], split_indices: List[int], similarities: Li
     if current_split:
         chunks.append(
             Chunk(
-                splits=current_split.copy(),
+                splits=current_split,
                 is_triggered=False,
                 triggered_score=None,
                 token_count=current_tokens_count,
             )
         )
-        chunks_by_last_split += 1
-        logger.debug(
-            f"Final split added with {current_tokens_count} "
-            "tokens due to remaining documents."
-        )
 
     # Validation to ensure no tokens are lost during the split
     original_token_count = sum(token_counts)
-    split_token_count = sum(
-        [tiktoken_length(doc) for split in chunks for doc in split.splits]
-    )
+    split_token_count = sum(chunk.token_count for chunk in chunks)
     if original_token_count != split_token_count:
         logger.error(
             f"Token count mismatch: {original_token_count} != {split_token_count}"
@@ -243,14 +208,16 @@ def _split_documents(docs: List[str], split_indices: List[int], similarities: Li
         )
 
     return chunks
-        
 
-def statistical_chunker(file_content_generator: Generator[Document, None, None], config: dict, *args, **kwargs) -> Generator[str, None, None]:
-    logger.info(config)
-    embedding = config.get('embedding')
-    if embedding is None:
-        raise ImportError("Could not import the required module 'alita_sdk.langchain.interfaces.llm_processor'.")
-    max_tokens_doc: int = config.get("max_doc_size", 300)
+
+def _chunk_splits(splits: List[str], token_counts: np.ndarray, encoded_splits: np.ndarray,
+                  config: dict) -> Generator[Chunk, None, None]:
+    """
+    Chunk splits of a single document in batches of batch_size splits.
+
+    The last chunk of every batch is carried over to the next one (reusing its embeddings),
+    so chunks never end at an arbitrary batch boundary.
+    """
     batch_size: int = config.get("batch_size", 64)
     window_size: int = config.get("window_size", 5)
     dynamic_threshold: bool = config.get("dynamic_threshold", True)
@@ -259,61 +226,84 @@ def statistical_chunker(file_content_generator: Generator[Document, None, None],
     split_tokens_tolerance: int = config.get("split_tokens_tolerance", 10)
     threshold_adjustment: float = config.get("threshold_adjustment", 0.01)
     score_threshold: float = config.get("score_threshold", 0.5)
-    docs_no = 0
-    for doc in file_content_generator:
-        docs_no+=1
-        logger.info(f"Processing document {docs_no}.")
-        try:
-            doc_metadata = doc.metadata
-            doc_content = doc.page_content
-            last_chunk: Optional[Chunk] = None
-            splits = TokenTextSplitter(encoding_name='cl100k_base', 
-                                    chunk_size=max_tokens_doc, chunk_overlap=0
-                                    ).split_text(doc_content)
-            logger.info(f"Splitting {len(splits)} documents.")
-            chunk_id = 0
-            for i in tqdm(range(0, len(splits), batch_size)):
-                batch_splits = splits[i : i + batch_size]
-                if last_chunk is not None:
-                    batch_splits = last_chunk.splits + batch_splits
-                
-                encoded_splits = _encode_documents(embedding, batch_splits)
-                
-                similarities = _calculate_similarity_scores(encoded_splits, window_size)
-
-                if dynamic_threshold:
-                    calculated_threshold = _find_optimal_threshold(
-                        batch_splits, similarities, min_split_tokens, 
-                        max_split_tokens, split_tokens_tolerance, 
-                        threshold_adjustment
-                    )
-                else:
-                    calculated_threshold = score_threshold
-                
-                split_indices = _find_split_indices(
-                    similarities=similarities, 
-                    calculated_threshold=calculated_threshold
-                )
 
-                doc_chunks = _split_documents(
-                    docs=batch_splits,
-                    split_indices=split_indices,
-                    similarities=similarities,
-                )
-                for chunk in doc_chunks:
-                    chunk_id += 1
-                    metadata = doc_metadata.copy()
-                    metadata['chunk_id'] = chunk_id
-                    metadata['chunk_token_count'] = chunk.token_count
-                    metadata['chunk_type'] = "document"
-                    last_chunk = chunk
-                    logger.info(f"Chunk {chunk_id} created with {chunk.token_count} tokens.")
-                    logger.info(f"Chunk metadata: {metadata}")
-                    yield Document(
-                        page_content=chunk.content,
-                        metadata=metadata
-                    )
-        except Exception as e:
-            from traceback import format_exc
-            logger.error(f"Error: {format_exc()}")
-            raise e
+    start = 0
+    for i in range(0, len(splits), batch_size):
+        end = min(i + batch_size, len(splits))
+        batch_token_counts = token_counts[start:end]
+        similarities = _calculate_similarity_scores(encoded_splits[start:end], window_size)
+
+        if dynamic_threshold:
+            calculated_threshold = _find_optimal_threshold(
+                batch_token_counts, similarities, min_split_tokens,
+                max_split_tokens, split_tokens_tolerance,
+                threshold_adjustment
+            )
+        else:
+            calculated_threshold = score_threshold
+
+        doc_chunks = _split_documents(
+            docs=splits[start:end],
+            token_counts=batch_token_counts.tolist(),
+            split_indices=_find_split_indices(similarities, calculated_threshold),
+            similarities=similarities,
+            max_split_tokens=max_split_tokens,
+            min_split_tokens=min_split_tokens,
+        )
+        if end < len(splits):
+            last_chunk = doc_chunks.pop()
+            start = end - len(last_chunk.splits)
+        yield from doc_chunks
+
+
+def _chunk_documents(pending: List[Tuple[Document, List[str], np.ndarray]], embedding,
+                     config: dict) -> Generator[Document, None, None]:
+    """ Embed splits of several documents in one pass and chunk each document """
+    all_splits = [split for _, splits, _ in pending for split in splits]
+    if not all_splits:
+        return
+    encoded = _encode_documents(embedding, all_splits)
+    offset = 0
+    for doc, splits, token_counts in pending:
+        encoded_splits = encoded[offset:offset + len(splits)]
+        offset += len(splits)
+        for chunk_id, chunk in enumerate(_chunk_splits(splits, token_counts, encoded_splits, config), start=1):
+            metadata = doc.metadata.copy()
+            metadata['chunk_id'] = chunk_id
+            metadata['chunk_token_count'] = chunk.token_count
+            metadata['chunk_type'] = "document"
+            logger.debug(f"Chunk {chunk_id} created with {chunk.token_count} tokens.")
+            yield Document(
+                page_content=chunk.content,
+                metadata=metadata
+            )
+
+
+def statistical_chunker(file_content_generator: Generator[Document, None, None], config: dict, *args, **kwargs) -> Generator[str, None, None]:
+    logger.info(config)
+    embedding = config.get('embedding')
+    if embedding is None:
+        raise ImportError("Could not import the required module 'alita_sdk.langchain.interfaces.llm_processor'.")
+    max_tokens_doc: int = config.get("max_doc_size", 300)
+    # splits of several small documents are embedded together
+    embedding_batch_size: int = config.get("embedding_batch_size", 2000)
+    docs_no = 0
+    pending, pending_splits = [], 0
+    try:
+        for doc in file_content_generator:
+            docs_no += 1
+            logger.info(f"Processing document {docs_no}.")
+            # splits and their token counts come from a single encoding pass
+            pieces = split_by_tokens(doc.page_content, max_tokens_doc)
+            splits = [piece for piece, _ in pieces]
+            token_counts = np.array([count for _, count in pieces], dtype=np.int64)
+            pending.append((doc, splits, token_counts))
+            pending_splits += len(splits)
+            if pending_splits >= embedding_batch_size:
+                yield from _chunk_documents(pending, embedding, config)
+                pending, pending_splits = [], 0
+        yield from _chunk_documents(pending, embedding, config)
+    except Exception as e:
+        from traceback import format_exc
+        logger.error(f"Error: {format_exc()}")
+        raise e
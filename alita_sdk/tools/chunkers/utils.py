@@ -1,7 +1,62 @@
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
 import tiktoken
 
+DEFAULT_ENCODING = "cl100k_base"
+
+
+@lru_cache(maxsize=None)
+def get_encoder(encoding_name: str = DEFAULT_ENCODING) -> tiktoken.Encoding:
+    """Tokenizer shared by all chunkers, created once per encoding."""
+    return tiktoken.get_encoding(encoding_name)
+
+
+def encode(text: str, encoding_name: str = DEFAULT_ENCODING) -> List[int]:
+    return get_encoder(encoding_name).encode(text, disallowed_special=())
+
+
+def encode_batch(texts: List[str], encoding_name: str = DEFAULT_ENCODING) -> List[List[int]]:
+    """Encode several texts at once (tiktoken encodes batches in parallel threads)."""
+    return get_encoder(encoding_name).encode_batch(texts, disallowed_special=())
+
 
 def tiktoken_length(text: str) -> int:
-    tokenizer = tiktoken.get_encoding("cl100k_base")
-    tokens = tokenizer.encode(text, disallowed_special=())
-    return len(tokens)
+    return len(encode(text))
+
+
+def tiktoken_lengths(texts: List[str]) -> List[int]:
+    return [len(tokens) for tokens in encode_batch(texts)]
+
+
+def split_by_tokens(text: str, chunk_size: int, chunk_overlap: int = 0, tokens: Optional[List[int]] = None,
+                    encoding_name: str = DEFAULT_ENCODING) -> List[Tuple[str, int]]:
+    """
+    Split text into pieces of at most chunk_size tokens and count them in one pass.
+
+    Slicing follows langchain TokenTextSplitter, but text is encoded only once (or not at all
+    if tokens are provided) and token counts come from the slices. Text that fits is returned as is.
+
+    Returns:
+        List of (piece, token count)
+
+    Raises:
+        ValueError: if chunk_overlap is not smaller than chunk_size
+    """
+    if chunk_overlap >= chunk_size:
+        raise ValueError(f"Got a larger chunk overlap ({chunk_overlap}) than chunk size ({chunk_size}), "
+                         f"should be smaller.")
+    if tokens is None:
+        tokens = encode(text, encoding_name)
+    if len(tokens) <= chunk_size:
+        return [(text, len(tokens))] if tokens else []
+    encoder = get_encoder(encoding_name)
+    result = []
+    start = 0
+    while start < len(tokens):
+        piece = tokens[start:start + chunk_size]
+        result.append((encoder.decode(piece), len(piece)))
+        if start + chunk_size >= len(tokens):
+            break
+        start += chunk_size - chunk_overlap
+    return result
@@ -8,7 +8,8 @@ from langchain_core.documents import Document
 from langchain_core.tools import ToolException
 from pydantic import BaseModel, create_model, Field, SecretStr
 
-from alita_sdk.runtime.langchain.interfaces.llm_processor import get_embeddings
+from alita_sdk.runtime.langchain.interfaces.llm_processor import get_cached_embeddings, get_cached_vectorstore
+from alita_sdk.runtime.utils.cache import make_cache_key
 from .chunkers import markdown_chunker
 from .utils import TOOLKIT_SPLITTER
 
@@ -38,6 +39,12 @@ BaseCodeIndexParams = create_model(
     branch=(Optional[str], Field(description="Branch to index files from. Defaults to active branch if None.", default=None)),
     whitelist=(Optional[List[str]], Field(description="File extensions or paths to include. Defaults to all files if None.", default=None)),
     blacklist=(Optional[List[str]], Field(description="File extensions or paths to exclude. Defaults to no exclusions if None.", default=None)),
+    local_checkout=(Optional[bool], Field(description="Read files from a shallow local clone instead of the API. "
+                                                      "Re-indexing fetches and indexes only files changed since the last run.",
+                                          default=False)),
+    parser_workers=(Optional[int], Field(description="Number of processes parsing code files (for large repositories). "
+                                                     "Files are parsed in one process if None.",
+                                         default=None, ge=1)),
 )
 
 BaseSearchParams = create_model(
@@ -211,6 +218,10 @@ class BaseVectorStoreToolApiWrapper(BaseToolApiWrapper):
     embedding_model: Optional[str] = "HuggingFaceEmbeddings"
     embedding_model_params: Optional[Dict[str, Any]] = {"model_name": "sentence-transformers/all-MiniLM-L6-v2"}
     vectorstore_type: Optional[str] = "PGVector"
+    # number of concurrent embedding workers used by index_data (1 - sequential embedding and writes)
+    embedding_workers: Optional[int] = 1
+    # path of persistent (SQLite) cache of embeddings keyed by text hash; unchanged chunks are not re-embedded
+    embedding_cache_path: Optional[str] = None
 
     def _index_tool_params(self, **kwargs) -> dict[str, tuple[type, Field]]:
         """
@@ -222,8 +233,13 @@ class BaseVectorStoreToolApiWrapper(BaseToolApiWrapper):
     def _get_dependencies_chunker(self, document: Optional[Document] = None):
         return markdown_chunker
 
+    def _get_embeddings(self):
+        """ Returns embeddings instance shared across tool calls (see get_cached_embeddings)."""
+        return get_cached_embeddings(self.embedding_model, self.embedding_model_params,
+                                     cache_path=self.embedding_cache_path)
+
     def _get_dependencies_chunker_config(self, document: Optional[Document] = None):
-        embedding = get_embeddings(self.embedding_model, self.embedding_model_params)
+        embedding = self._get_embeddings()
         #
         return {'embedding': embedding, 'llm': self.llm}
 
@@ -268,7 +284,7 @@ class BaseVectorStoreToolApiWrapper(BaseToolApiWrapper):
             # Resolve chunking configuration
             base_chunking_config = kwargs.get("chunking_config", {})
             config_model = models.get(chunking_tool)
-            embedding = get_embeddings(self.embedding_model, self.embedding_model_params)
+            embedding = self._get_embeddings()
             # Set required fields that should come from the instance (and Fallback for chunkers without models)
             base_chunking_config['embedding'] = embedding
             base_chunking_config['llm'] = self.llm
@@ -287,7 +303,7 @@ class BaseVectorStoreToolApiWrapper(BaseToolApiWrapper):
         collection_suffix = kwargs.get("collection_suffix")
         progress_step = kwargs.get("progress_step")
         clean_index = kwargs.get("clean_index")
-        embedding = get_embeddings(self.embedding_model, self.embedding_model_params)
+        embedding = self._get_embeddings()
         vs = self._init_vector_store(collection_suffix, embeddings=embedding)
         #
         return vs.index_documents(docs, progress_step=progress_step, clean_index=clean_index)
@@ -354,6 +370,17 @@ class BaseVectorStoreToolApiWrapper(BaseToolApiWrapper):
                 "persist_directory": "./indexer_db"
             }
 
+        # embeddings and vectorstore (engine, connection pool) are reused across calls
+        # with the same model and connection/collection instead of being created per query
+        if embeddings is None:
+            embeddings = self._get_embeddings()
+        vectorstore = get_cached_vectorstore(
+            self.vectorstore_type,
+            vectorstore_params,
+            embedding_func=embeddings,
+            embedding_key=(self.embedding_model, self.embedding_model_params, self.embedding_cache_path),
+        )
+
         return VectorStoreWrapper(
             llm=self.llm,
             vectorstore_type=self.vectorstore_type,
@@ -361,7 +388,9 @@ class BaseVectorStoreToolApiWrapper(BaseToolApiWrapper):
             embedding_model_params=self.embedding_model_params,
             vectorstore_params=vectorstore_params,
             embeddings=embeddings,
+            vectorstore=vectorstore,
             process_document_func=self._process_documents,
+            embedding_workers=self.embedding_workers or 1,
         )
 
     def search_index(self,
@@ -479,6 +508,17 @@ class BaseCodeToolApiWrapper(BaseVectorStoreToolApiWrapper):
     def _file_commit_hash(self, file_path: str, branch: str):
         pass
 
+    def _iter_file_contents(self, files: List[str], branch: str):
+        """
+        Yield {"file_name", "file_content", "commit_hash"} for the given files.
+
+        Reads files one by one; subclasses may override it with bulk or concurrent retrieval.
+        """
+        for file in files:
+            yield {"file_name": file,
+                   "file_content": self._read_file(file, branch=branch),
+                   "commit_hash": self._file_commit_hash(file, branch=branch)}
+
     def __handle_get_files(self, path: str, branch: str):
         """
         Handles the retrieval of files from a specific path and branch.
@@ -501,10 +541,57 @@ class BaseCodeToolApiWrapper(BaseVectorStoreToolApiWrapper):
             raise ValueError("Expected a list of strings")
         return _files
 
+    def _local_checkout_source(self, branch: str):
+        """
+        Returns (clone url, username, password) used for local checkout of the repository.
+
+        Subclasses supporting local checkout mode should override it.
+        """
+        raise ToolException(f"Local checkout is not supported by {type(self).__name__}")
+
+    def _local_checkout(self, branch: Optional[str] = None):
+        """ Shallow local checkout of the branch (active branch if None), fetched up to date """
+        from .localgit.checkout import LocalCheckout
+
+        branch = branch or getattr(self, "active_branch", None) or getattr(self, "_active_branch", None)
+        url, username, password = self._local_checkout_source(branch)
+        checkout = LocalCheckout(url, branch, username=username, password=password)
+        checkout.sync()
+        return checkout
+
+    def _checkout_file_contents(self, checkout, whitelist: Optional[List[str]] = None,
+                                blacklist: Optional[List[str]] = None, only: Optional[set] = None):
+        """
+        Yield {"file_name", "file_content", "commit_hash"} for files of the local checkout.
+
+        commit_hash is the blob SHA, so unchanged files are skipped by duplicates check on re-indexing.
+        Only files from `only` are read if it is provided.
+        """
+        for file_path, sha in checkout.ls_tree().items():
+            if only is not None and file_path not in only:
+                continue
+            if not self._is_selected(file_path, whitelist, blacklist):
+                continue
+            content = checkout.read_blob(sha)
+            if content is None:
+                logger.debug(f"Skipping binary file: {file_path}")
+                continue
+            yield {"file_name": file_path, "file_content": content, "commit_hash": sha}
+
+    @staticmethod
+    def _is_selected(file_path: str, whitelist: Optional[List[str]], blacklist: Optional[List[str]]) -> bool:
+        if whitelist and not any(fnmatch.fnmatch(file_path, pattern) for pattern in whitelist):
+            return False
+        if blacklist and any(fnmatch.fnmatch(file_path, pattern) for pattern in blacklist):
+            return False
+        return True
+
     def loader(self,
                branch: Optional[str] = None,
                whitelist: Optional[List[str]] = None,
-               blacklist: Optional[List[str]] = None) -> str:
+               blacklist: Optional[List[str]] = None,
+               local_checkout: bool = False,
+               parser_workers: Optional[int] = None) -> str:
         """
         Generates file content from a branch, respecting whitelist and blacklist patterns.
 
@@ -512,6 +599,8 @@ class BaseCodeToolApiWrapper(BaseVectorStoreToolApiWrapper):
         - branch (Optional[str]): Branch for listing files. Defaults to the current branch if None.
         - whitelist (Optional[List[str]]): File extensions or paths to include. Defaults to all files if None.
         - blacklist (Optional[List[str]]): File extensions or paths to exclude. Defaults to no exclusions if None.
+        - local_checkout (bool): Read files from a shallow local clone instead of the API.
+        - parser_workers (Optional[int]): Number of processes parsing code files. Defaults to parsing in one process.
 
         Returns:
         - generator: Yields content from files matching the whitelist but not the blacklist.
@@ -526,46 +615,82 @@ class BaseCodeToolApiWrapper(BaseVectorStoreToolApiWrapper):
         """
         from .chunkers.code.codeparser import parse_code_files_for_db
 
+        if local_checkout:
+            checkout = self._local_checkout(branch)
+            return parse_code_files_for_db(self._checkout_file_contents(checkout, whitelist, blacklist),
+                                           max_workers=parser_workers)
+
         _files = self.__handle_get_files("", branch or self.active_branch)
 
         logger.info(f"Files in branch: {_files}")
 
-        def is_whitelisted(file_path: str) -> bool:
-            if whitelist:
-                return any(fnmatch.fnmatch(file_path, pattern) for pattern in whitelist)
-            return True
-
-        def is_blacklisted(file_path: str) -> bool:
-            if blacklist:
-                return any(fnmatch.fnmatch(file_path, pattern) for pattern in blacklist)
-            return False
-
-        def file_content_generator():
-            for file in _files:
-                if is_whitelisted(file) and not is_blacklisted(file):
-                    yield {"file_name": file,
-                           "file_content": self._read_file(file, branch=branch or self.active_branch),
-                           "commit_hash": self._file_commit_hash(file, branch=branch or self.active_branch)}
-
-        return parse_code_files_for_db(file_content_generator())
+        selected_files = [file for file in _files if self._is_selected(file, whitelist, blacklist)]
+        return parse_code_files_for_db(self._iter_file_contents(selected_files, branch or self.active_branch),
+                                       max_workers=parser_workers)
     
     def index_data(self,
                    branch: Optional[str] = None,
                    whitelist: Optional[List[str]] = None,
                    blacklist: Optional[List[str]] = None,
                    collection_suffix: str = "",
+                   local_checkout: bool = False,
+                   parser_workers: Optional[int] = None,
                    **kwargs) -> str:
         """Index repository files in the vector store using code parsing."""
-        
-        
-        
-        documents = self.loader(
-            branch=branch,
-            whitelist=whitelist,
-            blacklist=blacklist
-        )
         vectorstore = self._init_vector_store(collection_suffix)
-        return vectorstore.index_documents(documents, clean_index=False, is_code=True)
+        if not local_checkout:
+            documents = self.loader(
+                branch=branch,
+                whitelist=whitelist,
+                blacklist=blacklist,
+                parser_workers=parser_workers
+            )
+            return vectorstore.index_documents(documents, clean_index=False, is_code=True)
+
+        from .chunkers.code.codeparser import parse_code_files_for_db
+
+        checkout = self._local_checkout(branch)
+        files = checkout.ls_tree()
+        # the indexed commit is stored with the collection, per repository branch and file selection,
+        # so it is shared by all indexer instances
+        marker = f"indexed_commit:{make_cache_key(checkout.repo_url, checkout.branch, whitelist, blacklist)}"
+        changed = checkout.changed_files(vectorstore.vectoradapter.get_collection_metadata().get(marker))
+        if changed is not None:
+            logger.info(f"Indexing {len(changed)} files changed since the last indexed commit")
+        self._remove_deleted_files(vectorstore, files, whitelist, blacklist, changed)
+        documents = parse_code_files_for_db(self._checkout_file_contents(checkout, whitelist, blacklist, only=changed),
+                                            max_workers=parser_workers)
+        result = vectorstore.index_documents(documents, clean_index=False, is_code=True)
+        if not (isinstance(result, dict) and result.get("status") == "error"):
+            vectorstore.vectoradapter.update_collection_metadata({marker: checkout.head})
+        return result
+
+    def _remove_deleted_files(self, vectorstore, files: Dict[str, str], whitelist: Optional[List[str]] = None,
+                              blacklist: Optional[List[str]] = None, changed: Optional[set] = None) -> int:
+        """
+        Remove documents of selected files which are not in the checkout anymore.
+
+        Only `changed` paths are looked up if provided, otherwise all indexed documents are checked.
+        Returns the number of removed documents.
+        """
+        if changed is not None:
+            deleted = sorted(path for path in changed if path not in files)
+            if not deleted:
+                return 0
+            where = {"filename": {"$in": deleted}}
+        else:
+            where = None
+        ids = []
+        for batch in vectorstore.vectoradapter.iter_data(where, ["ids", "metadatas"]):
+            for db_id, metadata in zip(batch["ids"], batch["metadatas"]):
+                file_path = (metadata or {}).get("filename")
+                if file_path and file_path not in files and self._is_selected(file_path, whitelist, blacklist):
+                    ids.append(db_id)
+        if ids:
+            logger.info(f"Removing {len(ids)} documents of deleted files")
+            vectorstore.vectoradapter.vectorstore.delete(ids=ids)
+            vectorstore.vectoradapter.persist()
+        return len(ids)
 
     def _get_vector_search_tools(self):
         """
@@ -183,6 +183,20 @@ class AlitaGitHubAPIWrapper(BaseCodeToolApiWrapper):
         # Use the GitHub client's method to read file
         return self.github_client_instance._read_file(file_path, branch)
 
+    def _iter_file_contents(self, files: List[str], branch: str):
+        """Read files using blob SHAs from the git tree, fetching contents concurrently."""
+        if not self.github_client_instance:
+            raise ValueError("GitHub client not initialized")
+
+        return self.github_client_instance._iter_file_contents(files, branch or self.active_branch)
+
+    def _local_checkout_source(self, branch: str):
+        """Get clone URL and credentials for a local checkout of the GitHub repository."""
+        if not self.github_client_instance:
+            raise ValueError("GitHub client not initialized")
+
+        return self.github_client_instance._local_checkout_source()
+
     def run(self, name: str, *args: Any, **kwargs: Any):
         for tool in self.get_available_tools():
             if tool["name"] == name:
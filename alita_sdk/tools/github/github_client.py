@@ -1,11 +1,17 @@
 from __future__ import annotations
+import base64
+import logging
 import re
 import fnmatch
+import posixpath
+import time
 import tiktoken
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, Field, PrivateAttr, model_validator
 
 from github import Auth, Github, GithubIntegration, Repository
 from github.Consts import DEFAULT_BASE_URL
@@ -71,6 +77,10 @@ from langchain_community.tools.github.prompt import (
     CREATE_PULL_REQUEST_PROMPT
 )
 
+from ...runtime.utils.concurrency import AdaptiveLimiter, is_rate_limit_error
+
+logger = logging.getLogger(__name__)
+
 
 class GitHubClient(BaseModel):
     """Client for interacting with the GitHub REST API."""
@@ -96,6 +106,9 @@ class GitHubClient(BaseModel):
     # Alita instance
     alita: Optional[Any] = Field(default=None, exclude=True)
 
+    # (repo_name, ref, {path: blob sha}) of the last file listing, reused when listed files are read
+    _listed_file_shas: Optional[Tuple[Optional[str], str, Dict[str, str]]] = PrivateAttr(default=None)
+
     @model_validator(mode='before')
     def initialize_github_client(cls, values):
         """
@@ -189,24 +202,148 @@ class GitHubClient(BaseModel):
         from github import GithubException
 
         try:
-            repo = self.github_api.get_repo(repo_name) if repo_name else self.github_repo_instance
-            contents = repo.get_contents(directory_path, ref=ref)
+            shas = self._get_file_shas(directory_path, ref, repo_name)
         except GithubException as e:
             return f"Error: status code {e.status}, {e.message}"
+        self._listed_file_shas = (repo_name, ref, shas)
+        return list(shas)
 
-        files = []
+    def _get_file_shas(self, directory_path: str, ref: str, repo_name: Optional[str] = None) -> Dict[str, str]:
+        """
+        Get blob SHA of every file in a directory recursively.
+
+        Uses a single recursive git trees API call; falls back to walking directories
+        with the contents API if GitHub truncates the tree (very large repositories).
+
+        Returns:
+            Dict of file path to blob SHA
+        """
+        from github import GithubException
+
+        repo = self.github_api.get_repo(repo_name) if repo_name else self.github_repo_instance
+        prefix = directory_path.strip("/")
+        tree = repo.get_git_tree(ref, recursive=True)
+        if not tree.raw_data.get("truncated"):
+            return {
+                element.path: element.sha
+                for element in tree.tree
+                if element.type == "blob" and (not prefix or element.path.startswith(prefix + "/"))
+            }
+        logger.warning(f"Git tree of {repo.full_name}@{ref} is truncated, listing directories one by one")
+        files = {}
+        contents = deque(repo.get_contents(directory_path, ref=ref))
         while contents:
-            file_content = contents.pop(0)
+            file_content = contents.popleft()
             if file_content.type == "dir":
                 try:
-                    directory_contents = repo.get_contents(file_content.path, ref=ref)
-                    contents.extend(directory_contents)
+                    contents.extend(repo.get_contents(file_content.path, ref=ref))
                 except GithubException:
                     pass
             else:
-                files.append(file_content)
+                files[file_content.path] = file_content.sha
+        return files
+
+    def _listed_shas(self, files: List[str], ref: str, repo_name: Optional[str] = None) -> Dict[str, str]:
+        """ Blob SHAs of files from the last listing of the ref, or from a listing of their common directory """
+        listed, self._listed_file_shas = self._listed_file_shas, None
+        if listed is not None and listed[:2] == (repo_name, ref) and all(file in listed[2] for file in files):
+            return listed[2]
+        directory = posixpath.commonpath([posixpath.dirname(file) for file in files]) if files else ""
+        return self._get_file_shas(directory, ref, repo_name)
+
+    @staticmethod
+    def _rate_limit_exhausted(error: Exception) -> bool:
+        """ Check if the primary rate limit is used up (waiting a few seconds does not help) """
+        headers = {key.lower(): value for key, value in (getattr(error, "headers", None) or {}).items()}
+        return headers.get("x-ratelimit-remaining") == "0" and "retry-after" not in headers
+
+    def _read_blob(self, repo: Repository.Repository, sha: str, limiter: AdaptiveLimiter, retries: int = 3) -> str:
+        """
+        Read file content by blob SHA, backing off when GitHub throttles concurrent requests
 
-        return [file.path for file in files]
+        Errors of the exhausted primary rate limit are raised without retries.
+        """
+        for attempt in range(retries + 1):
+            limiter.acquire()
+            try:
+                blob = repo.get_git_blob(sha)
+            except Exception as e:
+                # GitHub answers 403 both for rate limits and for missing permissions
+                headers = {key.lower(): value for key, value in (getattr(e, "headers", None) or {}).items()}
+                exhausted = self._rate_limit_exhausted(e)
+                throttled = exhausted or is_rate_limit_error(e) or "retry-after" in headers
+                limiter.release(throttled=throttled)
+                if exhausted or not throttled or attempt == retries:
+                    raise
+                time.sleep(float(headers.get("retry-after") or 2 ** attempt))
+                continue
+            limiter.release()
+            return base64.b64decode(blob.content).decode("utf-8")
+
+    def _local_checkout_source(self, repo_name: Optional[str] = None) -> Tuple[str, Optional[str], Optional[str]]:
+        """
+        Returns (clone url, username, password) for a local checkout of the repository.
+
+        Raises:
+            ToolException: If the client uses GitHub App authentication
+        """
+        repo = self.github_api.get_repo(repo_name) if repo_name else self.github_repo_instance
+        auth_config = self.auth_config
+        if auth_config and auth_config.github_access_token:
+            return repo.clone_url, "x-access-token", auth_config.github_access_token.get_secret_value()
+        if auth_config and auth_config.github_username and auth_config.github_password:
+            return repo.clone_url, auth_config.github_username, auth_config.github_password.get_secret_value()
+        if auth_config and auth_config.github_app_id:
+            raise ToolException("Local checkout is not supported with GitHub App authentication")
+        return repo.clone_url, None, None
+
+    def _iter_file_contents(self, files: List[str], branch: str, repo_name: Optional[str] = None,
+                            max_workers: int = 8) -> Iterator[Dict[str, str]]:
+        """
+        Yield {"file_name", "file_content", "commit_hash"} for the given files in order.
+
+        File SHAs come from the listing that produced the files (or one git trees call of their
+        common directory) and serve as change keys; blobs are fetched concurrently with at most
+        2 * max_workers files read ahead. Files which blobs can not be read are skipped,
+        an exhausted rate limit stops the iteration with ToolException.
+        """
+        repo = self.github_api.get_repo(repo_name) if repo_name else self.github_repo_instance
+        shas = self._listed_shas(files, branch, repo_name)
+        limiter = AdaptiveLimiter(max_workers)
+
+        def _read(file_path: str) -> Dict[str, str]:
+            sha = shas.get(file_path)
+            if sha is None:
+                return {"file_name": file_path,
+                        "file_content": self._read_file(file_path, branch, repo_name),
+                        "commit_hash": self._file_commit_hash(file_path, branch, repo_name)}
+            try:
+                content = self._read_blob(repo, sha, limiter)
+            except Exception as e:
+                if self._rate_limit_exhausted(e):
+                    reset = (getattr(e, "headers", None) or {}).get("X-RateLimit-Reset")
+                    raise ToolException(f"GitHub API rate limit is exhausted (reset at {reset}): {e}") from e
+                # skipped files have no change key, so they are read again by the next indexing
+                logger.warning(f"Skipping file `{file_path}` on branch `{branch}`: {e}")
+                return None
+            return {"file_name": file_path, "file_content": content, "commit_hash": sha}
+
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            try:
+                for file_path in files:
+                    pending.append(executor.submit(_read, file_path))
+                    if len(pending) >= 2 * max_workers:
+                        item = pending.popleft().result()
+                        if item is not None:
+                            yield item
+                while pending:
+                    item = pending.popleft().result()
+                    if item is not None:
+                        yield item
+            finally:
+                for future in pending:
+                    future.cancel()
 
     def get_files_from_directory(self, directory_path: str, repo_name: Optional[str] = None) -> str:
         """
@@ -1447,7 +1584,8 @@ class GitHubClient(BaseModel):
                branch: Optional[str] = None,
                whitelist: Optional[List[str]] = None,
                blacklist: Optional[List[str]] = None,
-               repo_name: Optional[str] = None) -> str:
+               repo_name: Optional[str] = None,
+               parser_workers: Optional[int] = None) -> str:
         """
         Generates file content from a branch, respecting whitelist and blacklist patterns.
 
@@ -1456,6 +1594,7 @@ class GitHubClient(BaseModel):
             whitelist (Optional[List[str]]): File extensions or paths to include. Defaults to all files if None.
             blacklist (Optional[List[str]]): File extensions or paths to exclude. Defaults to no exclusions if None.
             repo_name (Optional[str]): Name of the repository in format 'owner/repo'
+            parser_workers (Optional[int]): Number of processes parsing code files. Defaults to parsing in one process.
 
         Returns:
             str: Parsed file content as JSON
@@ -1480,15 +1619,14 @@ class GitHubClient(BaseModel):
                 return any(fnmatch.fnmatch(file_path, pattern) for pattern in blacklist)
             return False
 
-        def file_content_generator():
-            for file in _files:
-                if is_whitelisted(file) and not is_blacklisted(file):
-                    yield {"file_name": file,
-                           "file_content": self._read_file(file, branch=branch or self.active_branch, repo_name=repo_name)}
+        selected_files = [file for file in _files if is_whitelisted(file) and not is_blacklisted(file)]
 
         try:
             from ..chunkers.code.codeparser import parse_code_files_for_db
-            return parse_code_files_for_db(file_content_generator())
+            return parse_code_files_for_db(
+                self._iter_file_contents(selected_files, branch or self.active_branch, repo_name),
+                max_workers=parser_workers
+            )
         except ImportError as e:
             return f"Error processing code files: {str(e)}"
 
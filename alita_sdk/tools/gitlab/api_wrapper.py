@@ -177,6 +177,9 @@ class GitLabAPIWrapper(BaseCodeToolApiWrapper):
         except Exception as e:
             return f"Unable to get commit hash for {file_path} due to error:\n{e}"
 
+    def _local_checkout_source(self, branch: str):
+        return self._repo_instance.http_url_to_repo, "oauth2", self.private_token.get_secret_value()
+
     def _read_file(self, file_path: str, branch: str):
         return self.read_file(file_path, branch)
 
@@ -0,0 +1,122 @@
+""" Shallow local checkouts of remote repositories reused across indexing runs """
+
+import base64
+import logging
+import os
+import tempfile
+from typing import Dict, Optional, Set
+
+from filelock import FileLock
+from git import GitCommandError, Repo
+
+from ...runtime.utils.cache import make_cache_key
+
+logger = logging.getLogger(__name__)
+
+# Checkouts are kept between runs so re-indexing only fetches new objects
+CHECKOUT_DIR = os.path.join(tempfile.gettempdir(), "alita-checkouts")
+
+# git mode of symbolic links: never followed when reading files
+SYMLINK_MODE = "120000"
+
+
+class LocalCheckout:
+    """
+    Shallow (depth 1) bare clone of a single branch in a local cache directory.
+
+    The clone is shared by all runs (threads and processes) for the repository branch: git commands
+    writing to it (fetch) hold a file lock, files are read by blob SHA from the object database
+    of the commit fetched by this instance, so a concurrent fetch does not change what is read.
+
+    Credentials are passed to git through environment configuration (http.extraHeader),
+    so they are neither stored in .git/config nor visible in process arguments.
+    """
+
+    def __init__(self, repo_url: str, branch: str, username: Optional[str] = None,
+                 password: Optional[str] = None, cache_dir: Optional[str] = None):
+        self.repo_url = repo_url
+        self.branch = branch
+        self.path = os.path.join(cache_dir or CHECKOUT_DIR, make_cache_key(repo_url, branch)[:16] + ".git")
+        self.head: Optional[str] = None
+        self._lock = FileLock(self.path + ".lock")
+        self._env = {"GIT_TERMINAL_PROMPT": "0"}
+        if password:
+            token = base64.b64encode(f"{username or ''}:{password}".encode("utf-8")).decode("ascii")
+            self._env.update({
+                "GIT_CONFIG_COUNT": "1",
+                "GIT_CONFIG_KEY_0": "http.extraHeader",
+                "GIT_CONFIG_VALUE_0": f"Authorization: Basic {token}",
+            })
+        self._repo: Optional[Repo] = None
+
+    @property
+    def repo(self) -> Repo:
+        if self._repo is None:
+            with self._lock:
+                if os.path.isfile(os.path.join(self.path, "HEAD")):
+                    repo = Repo(self.path)
+                else:
+                    os.makedirs(self.path, exist_ok=True)
+                    repo = Repo.init(self.path, bare=True)
+                    repo.create_remote("origin", self.repo_url)
+            repo.git.update_environment(**self._env)
+            self._repo = repo
+        return self._repo
+
+    def sync(self) -> str:
+        """ Fetch the latest commit of the branch (only missing objects), returns its SHA """
+        with self._lock:
+            logger.info(f"Fetching {self.branch} into local checkout {self.path}")
+            self.repo.git.fetch("--depth", "1", "--no-tags", "origin", self.branch)
+            self.head = self.repo.git.rev_parse("FETCH_HEAD^{commit}")
+        return self.head
+
+    def _commit(self) -> str:
+        if self.head is None:
+            raise ValueError("Local checkout is not synced")
+        return self.head
+
+    def ls_tree(self) -> Dict[str, str]:
+        """ Path to blob SHA of every regular file of the synced commit """
+        files = {}
+        for entry in self.repo.git.ls_tree("-r", "-z", self._commit()).split("\0"):
+            if not entry:
+                continue
+            meta, path = entry.split("\t", 1)
+            mode, object_type, sha = meta.split()
+            if object_type == "blob" and mode != SYMLINK_MODE:
+                files[path] = sha
+        return files
+
+    def changed_files(self, since: Optional[str]) -> Optional[Set[str]]:
+        """
+        Paths changed (including deleted) between commit `since` and the synced commit.
+
+        A commit missing from the clone (e.g. in a fresh one) is fetched by SHA,
+        None is returned if it is not available on the remote either.
+        """
+        if not since:
+            return None
+        try:
+            self.repo.git.cat_file("-e", f"{since}^{{commit}}")
+        except GitCommandError:
+            try:
+                with self._lock:
+                    self.repo.git.fetch("--depth", "1", "--no-tags", "origin", since)
+            except GitCommandError as e:
+                logger.info(f"Commit {since} is not available for diff, all files are listed: {e}")
+                return None
+        output = self.repo.git.diff("--name-only", "-z", "--no-renames", since, self._commit())
+        return {path for path in output.split("\0") if path}
+
+    def read_blob(self, sha: str) -> Optional[str]:
+        """
+        File content by blob SHA (see ls_tree), None for binary (non UTF-8) files.
+
+        Blobs are read through a persistent `git cat-file --batch` process, which is not thread-safe.
+        """
+        _, _, _, data = self.repo.git.get_object_data(sha)
+        try:
+            return data.decode("utf-8")
+        except UnicodeDecodeError:
+            return None
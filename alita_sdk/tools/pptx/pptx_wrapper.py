@@ -2,9 +2,9 @@ from typing import Dict, Any, List, Optional
 from copy import copy
 import os
 import tempfile
-import chardet
 from pydantic import create_model, BaseModel, Field
 from ..elitea_base import BaseToolApiWrapper
+from ..utils.content_parser import decode_text
 from logging import getLogger
 import traceback
 from langchain_core.messages import HumanMessage
@@ -46,9 +46,9 @@ class PPTXWrapper(BaseToolApiWrapper):
             return ""
         if isinstance(data, dict) and data['error']:
             return f"{data['error']}. {data['content'] if data['content'] else ''}"
-        detected = chardet.detect(data)
-        if detected['encoding'] is not None:
-            return data.decode(detected['encoding'])
+        text_content = decode_text(data)
+        if text_content is not None:
+            return text_content
         else:
             return "Could not detect encoding"
 
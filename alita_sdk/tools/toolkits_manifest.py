@@ -0,0 +1,54 @@
+""" Static manifest of toolkits: toolkit modules are imported only when they are used """
+
+# (tool type, module path under alita_sdk.tools, get_tools function name, toolkit class name)
+TOOLKITS_MANIFEST = [
+    ('github', 'github', 'get_tools', 'AlitaGitHubToolkit'),
+    ('openapi', 'openapi', 'get_tools'),
+    ('jira', 'jira', 'get_tools', 'JiraToolkit'),
+    ('confluence', 'confluence', 'get_tools', 'ConfluenceToolkit'),
+    ('service_now', 'servicenow', 'get_tools', 'ServiceNowToolkit'),
+    ('gitlab', 'gitlab', 'get_tools', 'AlitaGitlabToolkit'),
+    ('gitlab_org', 'gitlab_org', 'get_tools', 'AlitaGitlabSpaceToolkit'),
+    ('zephyr', 'zephyr', 'get_tools', 'ZephyrToolkit'),
+    ('browser', 'browser', 'get_tools', 'BrowserToolkit'),
+    ('report_portal', 'report_portal', 'get_tools', 'ReportPortalToolkit'),
+    ('bitbucket', 'bitbucket', 'get_tools', 'AlitaBitbucketToolkit'),
+    ('testrail', 'testrail', 'get_tools', 'TestrailToolkit'),
+    ('testio', 'testio', 'get_tools', 'TestIOToolkit'),
+    ('xray_cloud', 'xray', 'get_tools', 'XrayToolkit'),
+    ('sharepoint', 'sharepoint', 'get_tools', 'SharepointToolkit'),
+    ('qtest', 'qtest', 'get_tools', 'QtestToolkit'),
+    ('zephyr_scale', 'zephyr_scale', 'get_tools', 'ZephyrScaleToolkit'),
+    ('zephyr_enterprise', 'zephyr_enterprise', 'get_tools', 'ZephyrEnterpriseToolkit'),
+    ('ado', 'ado', 'get_tools'),
+    ('ado_repos', 'ado.repos', 'get_tools', 'AzureDevOpsReposToolkit'),
+    ('ado_plans', 'ado.test_plan', None, 'AzureDevOpsPlansToolkit'),
+    ('ado_boards', 'ado.work_item', None, 'AzureDevOpsWorkItemsToolkit'),
+    ('ado_wiki', 'ado.wiki', None, 'AzureDevOpsWikiToolkit'),
+    ('rally', 'rally', 'get_tools', 'RallyToolkit'),
+    ('sql', 'sql', 'get_tools', 'SQLToolkit'),
+    ('sonar', 'code.sonar', 'get_tools', 'SonarToolkit'),
+    ('google_places', 'google_places', 'get_tools', 'GooglePlacesToolkit'),
+    ('yagmail', 'yagmail', 'get_tools', 'AlitaYagmailToolkit'),
+    ('aws', 'cloud.aws', None, 'AWSToolkit'),
+    ('azure', 'cloud.azure', None, 'AzureToolkit'),
+    ('gcp', 'cloud.gcp', None, 'GCPToolkit'),
+    ('k8s', 'cloud.k8s', None, 'KubernetesToolkit'),
+    ('custom_open_api', 'custom_open_api', None, 'OpenApiToolkit'),
+    ('elastic', 'elastic', None, 'ElasticToolkit'),
+    ('keycloak', 'keycloak', None, 'KeycloakToolkit'),
+    ('localgit', 'localgit', None, 'AlitaLocalGitToolkit'),
+    ('pandas', 'pandas', 'get_tools', 'PandasToolkit'),
+    ('azure_search', 'azure_ai.search', 'get_tools', 'AzureSearchToolkit'),
+    ('figma', 'figma', 'get_tools', 'FigmaToolkit'),
+    ('salesforce', 'salesforce', 'get_tools', 'SalesforceToolkit'),
+    ('carrier', 'carrier', 'get_tools', 'AlitaCarrierToolkit'),
+    ('ocr', 'ocr', 'get_tools', 'OCRToolkit'),
+    ('pptx', 'pptx', 'get_tools', 'PPTXToolkit'),
+    ('postman', 'postman', 'get_tools', 'PostmanToolkit'),
+    ('memory', 'memory', 'get_tools', 'MemoryToolkit'),
+    ('zephyr_squad', 'zephyr_squad', 'get_tools', 'ZephyrSquadToolkit'),
+    ('slack', 'slack', 'get_tools', 'SlackToolkit'),
+    ('bigquery', 'google.bigquery', 'get_tools', 'BigQueryToolkit'),
+    ('delta_lake', 'aws.delta_lake', 'get_tools', 'DeltaLakeToolkit'),
+]
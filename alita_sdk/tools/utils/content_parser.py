@@ -1,22 +1,26 @@
+import codecs
 import re
 
-from docx import Document
 from io import BytesIO
-import pandas as pd
-from PIL import Image
-from pptx import Presentation
-from pptx.enum.shapes import MSO_SHAPE_TYPE
 import io
-import pymupdf
+from typing import Generator, NamedTuple, Optional
+from langchain_core.documents import Document
 from langchain_core.tools import ToolException
-from transformers import BlipProcessor, BlipForConditionalGeneration
-from langchain_core.messages import HumanMessage
 from logging import getLogger
 
-from ...runtime.langchain.tools.utils import bytes_to_base64
+from .image_captions import caption_images, image_hash, image_message
+from ...runtime.utils.cache import InstanceCache
+
+# Parser backends (pandas, pymupdf, python-docx, python-pptx, transformers) are imported
+# by the functions that use them, so importing this module does not load them
 
 logger = getLogger(__name__)
 
+BLIP_MODEL_NAME = "Salesforce/blip-image-captioning-base"
+
+# Image captioning (processor, model) by model name, loaded once per process
+CAPTIONING_MODELS = InstanceCache(maxsize=2, name="captioning models")
+
 image_processing_prompt='''
 You are an AI model designed for analyzing images. Your task is to accurately describe the content of the given image. Depending on the type of image, follow these specific instructions:
 
@@ -57,8 +61,46 @@ Highlight any visible details that could help in understanding the image.
 Be as precise and thorough as possible in your responses. If something is unclear or illegible, state that explicitly.
 '''
 
+# Pages parsed ahead when streaming PDF/PPTX page by page, so images on them are captioned concurrently
+CAPTION_PAGE_WINDOW = 8
+
 IMAGE_EXTENSIONS = ['jpg', 'jpeg', 'png', 'gif', 'bmp', 'tiff', 'webp', 'svg']
 
+# Number of leading bytes used to detect text encoding
+ENCODING_SAMPLE_SIZE = 64 * 1024
+
+# UTF-16/32 text contains NUL bytes
+_UNICODE_BOMS = (codecs.BOM_UTF32_LE, codecs.BOM_UTF32_BE, codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)
+
+
+def detect_encoding(data: bytes, sample_size: int = ENCODING_SAMPLE_SIZE):
+    """Detect text encoding on a bounded sample of data; returns None for binary content."""
+    import chardet
+
+    return chardet.detect(data[:sample_size])['encoding']
+
+
+def decode_text(data: bytes, sample_size: int = ENCODING_SAMPLE_SIZE) -> Optional[str]:
+    """Decode data with the encoding detected on a sample; returns None for binary content.
+
+    NUL bytes in the sample (without UTF-16/32 byte order mark) mark binary content. The sample may miss
+    non-ASCII bytes after it, so an ASCII sample falls back to utf-8 and latin-1; detection never runs
+    on the whole payload.
+    """
+    sample = data[:sample_size]
+    if b"\x00" in sample and not sample.startswith(_UNICODE_BOMS):
+        return None
+    encoding = detect_encoding(sample, sample_size)
+    if encoding is None:
+        return None
+    candidates = [encoding, 'utf-8'] + (['latin-1'] if encoding == 'ascii' else [])
+    for candidate in candidates:
+        try:
+            return data.decode(candidate)
+        except UnicodeDecodeError:
+            continue
+    return None
+
 
 def parse_file_content(file_name=None, file_content=None, is_capture_image: bool = False, page_number: int = None,
                        sheet_name: str = None, llm=None, file_path: str = None, excel_by_sheets: bool = False):
@@ -103,6 +145,95 @@ def parse_file_content(file_name=None, file_content=None, is_capture_image: bool
         return ToolException(
             "Not supported type of files entered. Supported types are TXT, DOCX, PDF, PPTX, XLSX and XLS only.")
 
+def iter_file_content(file_name=None, file_content=None, is_capture_image: bool = False, llm=None,
+                      file_path: str = None) -> Generator[Document, None, None]:
+    """Parse the content of a file page by page.
+
+    PDF pages, PPTX slides and Excel sheets are parsed and yielded one at a time, so large documents
+    can be chunked and embedded incrementally. Other supported types are yielded as a single document.
+
+    Args:
+        file_name (str): The name of the file to parse.
+        file_content (bytes): The content of the file as bytes.
+        is_capture_image (bool): Whether to capture images from the file.
+        llm: The language model to use for image processing.
+        file_path (str, optional): The path to the file if it needs to be read from disk.
+    Yields:
+        Document: parsed page with `source` and `page` (page/slide number or sheet name) in metadata.
+        Nothing is yielded for files of unsupported types.
+    Raises:
+        ToolException: If the file could not be read.
+    """
+    if (file_path and (file_name or file_content)) or (not file_path and (not file_name or file_content is None)):
+        raise ToolException("Either (file_name and file_content) or file_path must be provided, but not both.")
+
+    if file_path:
+        file_content = file_to_bytes(file_path)
+        if file_content is None:
+            raise ToolException(f"File not found or could not be read: {file_path}")
+        file_name = file_path.split('/')[-1]
+    if file_name.endswith('.pdf'):
+        pages = iter_pdf_pages(file_content, is_capture_image, llm)
+    elif file_name.endswith('.pptx'):
+        pages = iter_pptx_slides(file_content, is_capture_image, llm)
+    elif file_name.endswith('.xlsx') or file_name.endswith('.xls'):
+        pages = iter_excel_sheets(file_content)
+    else:
+        content = parse_file_content(file_name=file_name, file_content=file_content,
+                                     is_capture_image=is_capture_image, llm=llm)
+        if isinstance(content, ToolException):
+            logger.warning(f"Skipping {file_name}: {content}")
+            return
+        pages = [(1, content)]
+    for page, text_content in pages:
+        yield Document(page_content=text_content, metadata={'source': file_name, 'page': page})
+
+def iter_pdf_pages(file_content, is_capture_image: bool = False, llm=None):
+    """Yield (page number, text) for each PDF page; images repeated across pages are described once."""
+    import pymupdf
+
+    with pymupdf.open(stream=file_content, filetype="pdf") as report:
+        yield from _iter_page_windows(
+            enumerate(report, start=1),
+            lambda index, page, images: _pdf_page_parts(report, page, index, is_capture_image, images), llm)
+
+def iter_pptx_slides(file_content, is_capture_image: bool = False, llm=None):
+    """Yield (slide number, text) for each PPTX slide."""
+    from pptx import Presentation
+
+    prs = Presentation(io.BytesIO(file_content))
+    yield from _iter_page_windows(
+        enumerate(prs.slides, start=1),
+        lambda index, slide, images: _pptx_slide_parts(slide, index, is_capture_image, images), llm,
+        on_error="\n[Picture: unknown]\n")
+
+def _iter_page_windows(pages, page_parts, llm, on_error=None):
+    """Yield (number, text) of pages rendered in windows, images of a window are captioned together."""
+    window = CAPTION_PAGE_WINDOW
+    numbers, parts, images = [], [], {}
+    for index, page in pages:
+        numbers.append(index)
+        parts.append(page_parts(index, page, images))
+        if len(parts) >= window:
+            yield from zip(numbers, _render_pages(parts, images, llm, on_error))
+            numbers, parts, images = [], [], {}
+    if parts:
+        yield from zip(numbers, _render_pages(parts, images, llm, on_error))
+
+def iter_excel_sheets(file_content):
+    """Yield (sheet name, text) for each Excel sheet, reading one sheet at a time."""
+    import pandas as pd
+
+    try:
+        excel_file = pd.ExcelFile(io.BytesIO(file_content))
+    except Exception as e:
+        raise ToolException(f"Error reading Excel file: {e}")
+    with excel_file:
+        for sheet_name in excel_file.sheet_names:
+            df = excel_file.parse(sheet_name)
+            df.fillna('', inplace=True)
+            yield sheet_name, f"====== Sheet name: {sheet_name} ======\n{df.to_string(index=False)}"
+
 def parse_txt(file_content):
     try:
         return file_content.decode('utf-8')
@@ -111,6 +242,8 @@ def parse_txt(file_content):
 
 def parse_excel(file_content, sheet_name = None, return_by_sheets: bool = False):
     try:
+        import pandas as pd
+
         excel_file = io.BytesIO(file_content)
         if sheet_name:
             return parse_sheet(excel_file, sheet_name)
@@ -133,46 +266,54 @@ def parse_excel(file_content, sheet_name = None, return_by_sheets: bool = False)
         return ToolException(f"Error reading Excel file: {e}")
 
 def parse_sheet(excel_file, sheet_name):
+    import pandas as pd
+
     df = pd.read_excel(excel_file, sheet_name=sheet_name)
     df.fillna('', inplace=True)
     return df.to_string()
 
 def parse_pdf(file_content, page_number, is_capture_image, llm):
+    import pymupdf
+
+    images = {}
     with pymupdf.open(stream=file_content, filetype="pdf") as report:
-        text_content = ''
         if page_number is not None:
-            page = report.load_page(page_number - 1)
-            text_content += read_pdf_page(report, page, page_number, is_capture_image, llm)
+            pages = [_pdf_page_parts(report, report.load_page(page_number - 1), page_number, is_capture_image, images)]
         else:
-            for index, page in enumerate(report, start=1):
-                text_content += read_pdf_page(report, page, index, is_capture_image, llm)
-        return text_content
+            pages = [_pdf_page_parts(report, page, index, is_capture_image, images)
+                     for index, page in enumerate(report, start=1)]
+    return ''.join(_render_pages(pages, images, llm))
 
 def parse_pptx(file_content, page_number, is_capture_image, llm=None):
+    from pptx import Presentation
+
     prs = Presentation(io.BytesIO(file_content))
-    text_content = ''
+    images = {}
     if page_number is not None:
-        text_content += read_pptx_slide(prs.slides[page_number - 1], page_number, is_capture_image, llm)
+        pages = [_pptx_slide_parts(prs.slides[page_number - 1], page_number, is_capture_image, images)]
     else:
-        for index, slide in enumerate(prs.slides, start=1):
-            text_content += read_pptx_slide(slide, index, is_capture_image, llm)
-    return text_content
+        pages = [_pptx_slide_parts(slide, index, is_capture_image, images)
+                 for index, slide in enumerate(prs.slides, start=1)]
+    return ''.join(_render_pages(pages, images, llm, on_error="\n[Picture: unknown]\n"))
 
 def read_pdf_page(report, page, index, is_capture_images, llm=None):
-    text_content = f'Page: {index}\n'
-    text_content += page.get_text()
+    images = {}
+    return _render_pages([_pdf_page_parts(report, page, index, is_capture_images, images)], images, llm)[0]
+
+def _pdf_page_parts(report, page, index, is_capture_images, images):
+    """Page text followed by references to its images (image content is collected into images by hash)."""
+    parts = [f'Page: {index}\n', page.get_text()]
     if is_capture_images:
-        images = page.get_images(full=True)
-        for i, img in enumerate(images):
+        for img in page.get_images(full=True):
             xref = img[0]
-            base_image = report.extract_image(xref)
-            img_bytes = base_image["image"]
-            text_content += __perform_llm_prediction_for_image(llm, img_bytes)
-    return text_content
+            parts.append(_add_image(images, report.extract_image(xref)["image"]))
+    return parts
 
 def read_docx_from_bytes(file_content):
     """Read and return content from a .docx file using a byte stream."""
     try:
+        from docx import Document
+
         doc = Document(BytesIO(file_content))
         text = []
         for paragraph in doc.paragraphs:
@@ -183,21 +324,75 @@ def read_docx_from_bytes(file_content):
         return ""
 
 def read_pptx_slide(slide, index, is_capture_image, llm):
-    text_content = f'Slide: {index}\n'
+    images = {}
+    return _render_pages([_pptx_slide_parts(slide, index, is_capture_image, images)], images, llm,
+                         on_error="\n[Picture: unknown]\n")[0]
+
+def _pptx_slide_parts(slide, index, is_capture_image, images):
+    from pptx.enum.shapes import MSO_SHAPE_TYPE
+
+    parts = [f'Slide: {index}\n']
     for shape in slide.shapes:
         if hasattr(shape, "text"):
-            text_content += shape.text + "\n"
+            parts.append(shape.text + "\n")
         elif is_capture_image and shape.shape_type == MSO_SHAPE_TYPE.PICTURE:
             try:
-                caption = __perform_llm_prediction_for_image(llm, shape.image.blob)
-            except:
-                caption = "\n[Picture: unknown]\n"
-            text_content += caption
-    return text_content
+                parts.append(_add_image(images, shape.image.blob))
+            except Exception:
+                parts.append("\n[Picture: unknown]\n")
+    return parts
+
+class _ImageRef(NamedTuple):
+    key: str
+
+def _add_image(images, image: bytes) -> _ImageRef:
+    key = image_hash(image)
+    images.setdefault(key, image)
+    return _ImageRef(key)
+
+def _render_pages(pages, images, llm, on_error=None) -> list:
+    """
+    Caption unique images once (concurrently, with cache) and splice captions back in page order.
+
+    If on_error is None the first failed image (in page order) raises, otherwise it is replaced by on_error.
+    """
+    captions = {}
+    if images:
+        try:
+            captions = caption_images(llm, images, image_processing_prompt)
+        except Exception as e:
+            if on_error is None:
+                raise
+            logger.warning(f"Unable to describe images: {e}")
+            captions = dict.fromkeys(images, e)
+    result = []
+    for parts in pages:
+        text_content = ''
+        for part in parts:
+            if isinstance(part, _ImageRef):
+                part = captions[part.key]
+                if isinstance(part, Exception):
+                    if on_error is None:
+                        raise part
+                    part = on_error
+            text_content += part
+        result.append(text_content)
+    return result
+
+def get_captioning_model(model_name: str = BLIP_MODEL_NAME):
+    """Return (processor, model) for image captioning, loaded once per process."""
+
+    def _load():
+        from transformers import BlipProcessor, BlipForConditionalGeneration
+
+        logger.info(f"Loading image captioning model {model_name}")
+        return (BlipProcessor.from_pretrained(model_name),
+                BlipForConditionalGeneration.from_pretrained(model_name))
+
+    return CAPTIONING_MODELS.get_or_create(model_name, _load)
 
 def describe_image(image):
-    processor = BlipProcessor.from_pretrained("Salesforce/blip-image-captioning-base")
-    model = BlipForConditionalGeneration.from_pretrained("Salesforce/blip-image-captioning-base")
+    processor, model = get_captioning_model()
     inputs = processor(image, return_tensors="pt")
     out = model.generate(**inputs)
     return "\n[Picture: " + processor.decode(out[0], skip_special_tokens=True) + "]\n"
@@ -205,17 +400,7 @@ def describe_image(image):
 def __perform_llm_prediction_for_image(llm, image: bytes, image_format='png', prompt=image_processing_prompt) -> str:
     if not llm:
         raise ToolException("LLM is not provided for image processing.")
-    base64_string = bytes_to_base64(image)
-    result = llm.invoke([
-        HumanMessage(
-            content=[
-                {"type": "text", "text": prompt},
-                {
-                    "type": "image_url",
-                    "image_url": {"url": f"data:image/{image_format};base64,{base64_string}"},
-                },
-            ])
-    ])
+    result = llm.invoke([image_message(image, image_format, prompt)])
     return f"\n[Image description: {result.content}]\n"
 
 # TODO: review usage of this function alongside with functions above
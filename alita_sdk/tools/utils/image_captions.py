@@ -0,0 +1,159 @@
+""" Deduplicated, concurrent image captioning with in-memory and persistent caches """
+
+import hashlib
+import os
+import sqlite3
+import threading
+from logging import getLogger
+from typing import Dict, List, Optional, Union
+
+from langchain_core.messages import HumanMessage
+from langchain_core.tools import ToolException
+
+from ...runtime.langchain.tools.utils import bytes_to_base64
+from ...runtime.utils.cache import InstanceCache
+
+logger = getLogger(__name__)
+
+# Number of images described at the same time
+CAPTION_MAX_CONCURRENCY = 8
+
+# SQLite file with captions shared between processes (disabled if not set)
+CAPTION_CACHE_PATH_ENV = "ALITA_IMAGE_CAPTION_CACHE_PATH"
+
+# (namespace, image hash) -> caption
+CAPTIONS = InstanceCache(maxsize=2048, name="image captions")
+
+
+def image_hash(image: bytes) -> str:
+    """ sha256 of image content used to dedupe and cache captions """
+    return hashlib.sha256(image).hexdigest()
+
+
+def image_message(image: bytes, image_format: str, prompt: str) -> HumanMessage:
+    """ Multimodal message asking LLM to describe the image """
+    return HumanMessage(
+        content=[
+            {"type": "text", "text": prompt},
+            {
+                "type": "image_url",
+                "image_url": {"url": f"data:image/{image_format};base64,{bytes_to_base64(image)}"},
+            },
+        ])
+
+
+class CaptionCacheStore:
+    """ SQLite-backed persistent store of captions keyed by (namespace, image hash) """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS captions ("
+                "namespace TEXT NOT NULL, "
+                "image_hash TEXT NOT NULL, "
+                "caption TEXT NOT NULL, "
+                "PRIMARY KEY (namespace, image_hash))"
+            )
+            self._conn.commit()
+
+    def get_many(self, namespace: str, hashes: List[str]) -> Dict[str, str]:
+        result = {}
+        with self._lock:
+            for idx in range(0, len(hashes), 500):
+                batch = hashes[idx:idx + 500]
+                placeholders = ", ".join("?" for _ in batch)
+                rows = self._conn.execute(
+                    f"SELECT image_hash, caption FROM captions "
+                    f"WHERE namespace = ? AND image_hash IN ({placeholders})",
+                    [namespace, *batch],
+                ).fetchall()
+                result.update(dict(rows))
+        return result
+
+    def put_many(self, namespace: str, captions: Dict[str, str]):
+        if not captions:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO captions (namespace, image_hash, caption) VALUES (?, ?, ?)",
+                [(namespace, key, caption) for key, caption in captions.items()],
+            )
+            self._conn.commit()
+
+
+_STORES = InstanceCache(maxsize=0, name="caption cache stores")
+
+
+def _get_store() -> Optional[CaptionCacheStore]:
+    path = os.environ.get(CAPTION_CACHE_PATH_ENV)
+    if not path:
+        return None
+    try:
+        return _STORES.get_or_create(path, lambda: CaptionCacheStore(path))
+    except Exception as e:
+        logger.warning(f"Image caption cache is not available: {e}")
+        return None
+
+
+def _namespace(llm, prompt: str) -> str:
+    """ Captions depend on the model and the prompt """
+    model = getattr(llm, "model_name", None) or getattr(llm, "model", None) or type(llm).__name__
+    return f"{model}:{hashlib.sha256(prompt.encode('utf-8')).hexdigest()}"
+
+
+def caption_images(llm, images: Dict[str, bytes], prompt: str, image_format: str = "png",
+                   max_concurrency: int = CAPTION_MAX_CONCURRENCY) -> Dict[str, Union[str, Exception]]:
+    """
+    Describe unique images with LLM
+
+    Args:
+        llm: multimodal LLM
+        images: image content by image hash (see image_hash)
+        prompt: instructions for the LLM
+        image_format: format used in data URL
+        max_concurrency: number of concurrent LLM calls
+
+    Returns:
+        caption (or exception raised for that image) by image hash
+    """
+    if not llm:
+        raise ToolException("LLM is not provided for image processing.")
+    namespace = _namespace(llm, prompt)
+    results = {}
+    for key in images:
+        caption = CAPTIONS.get((namespace, key))
+        if caption is not None:
+            results[key] = caption
+    #
+    store = _get_store()
+    missing = [key for key in images if key not in results]
+    if store is not None and missing:
+        for key, caption in store.get_many(namespace, missing).items():
+            CAPTIONS.set((namespace, key), caption)
+            results[key] = caption
+        missing = [key for key in missing if key not in results]
+    #
+    if missing:
+        logger.info(f"Describing {len(missing)} unique images ({len(images) - len(missing)} cached)")
+        outputs = llm.batch(
+            [[image_message(images[key], image_format, prompt)] for key in missing],
+            config={"max_concurrency": max_concurrency},
+            return_exceptions=True,
+        )
+        new_captions = {}
+        for key, output in zip(missing, outputs):
+            if isinstance(output, Exception):
+                results[key] = output
+                continue
+            caption = f"\n[Image description: {output.content}]\n"
+            CAPTIONS.set((namespace, key), caption)
+            new_captions[key] = caption
+            results[key] = caption
+        if store is not None:
+            store.put_many(namespace, new_captions)
+    return results
@@ -10,10 +10,6 @@ from pydantic.fields import Field
 
 from ..elitea_base import BaseVectorStoreToolApiWrapper, BaseIndexParams, extend_with_vector_tools
 from langchain_core.documents import Document
-try:
-    from alita_sdk.runtime.langchain.interfaces.llm_processor import get_embeddings
-except ImportError:
-    from alita_sdk.langchain.interfaces.llm_processor import get_embeddings
 
 logger = logging.getLogger(__name__)
 
@@ -1237,7 +1233,7 @@ class ZephyrScaleApiWrapper(BaseVectorStoreToolApiWrapper):
             jql = 'folder = "Authentication" AND label in ("Smoke", "Critical") AND text ~ "login"'
         """
         docs = self._base_loader(project_key, jql)
-        embedding = get_embeddings(self.embedding_model, self.embedding_model_params)
+        embedding = self._get_embeddings()
         vs = self._init_vector_store(collection_suffix, embeddings=embedding)
         return vs.index_documents(docs, progress_step=progress_step, clean_index=clean_index)
 
@@ -0,0 +1,81 @@
+import threading
+import time
+
+from alita_sdk.runtime.utils.cache import InstanceCache, make_cache_key
+
+
+def test_make_cache_key_is_stable():
+    assert make_cache_key("m", {"a": 1, "b": 2}) == make_cache_key("m", {"b": 2, "a": 1})
+    assert make_cache_key("m", {"a": 1}) != make_cache_key("m", {"a": 2})
+
+
+def test_get_or_create_reuses_value():
+    cache = InstanceCache(maxsize=2)
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return object()
+
+    first = cache.get_or_create("k", factory)
+    assert cache.get_or_create("k", factory) is first
+    assert len(calls) == 1
+    assert cache.stats()["hits"] >= 1
+
+
+def test_lru_eviction_calls_on_evict():
+    evicted = []
+    cache = InstanceCache(maxsize=2, on_evict=lambda k, v: evicted.append(k))
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert evicted == ["b"]
+    assert "a" in cache and "c" in cache and "b" not in cache
+
+
+def test_ttl_expiration():
+    cache = InstanceCache(maxsize=2, ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_invalidate_and_clear():
+    evicted = []
+    cache = InstanceCache(on_evict=lambda k, v: evicted.append(k))
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.invalidate("a")
+    assert evicted == ["a"]
+    cache.clear()
+    assert len(cache) == 0
+    assert sorted(evicted) == ["a", "b"]
+
+
+def test_concurrent_get_or_create_builds_once():
+    cache = InstanceCache()
+    calls = []
+
+    def factory():
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_create("k", factory)))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+
+
+def test_keys_snapshot():
+    cache = InstanceCache()
+    cache.set(("secret", "a"), 1)
+    cache.set(("integration", 1), 2)
+    assert cache.keys() == [("secret", "a"), ("integration", 1)]
@@ -0,0 +1,42 @@
+from langchain_core.embeddings import Embeddings
+
+from alita_sdk.runtime.llms.cached_embeddings import CachedEmbeddings, EmbeddingCacheStore
+
+
+class CountingEmbeddings(Embeddings):
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        return [float(len(text)), 1.0]
+
+
+def test_unchanged_texts_are_not_re_embedded(tmp_path):
+    store = EmbeddingCacheStore(str(tmp_path / "cache.db"))
+    base = CountingEmbeddings()
+    embeddings = CachedEmbeddings(base, store, namespace="model")
+
+    first = embeddings.embed_documents(["a", "bb", "a"])
+    assert first == [[1.0, 1.0], [2.0, 1.0], [1.0, 1.0]]
+    assert base.calls == [["a", "bb"]]
+
+    second = embeddings.embed_documents(["bb", "ccc"])
+    assert second == [[2.0, 1.0], [3.0, 1.0]]
+    assert base.calls[-1] == ["ccc"]
+
+
+def test_cache_is_persistent_and_namespaced(tmp_path):
+    path = str(tmp_path / "cache.db")
+    CachedEmbeddings(CountingEmbeddings(), EmbeddingCacheStore(path), namespace="model").embed_documents(["a"])
+
+    base = CountingEmbeddings()
+    CachedEmbeddings(base, EmbeddingCacheStore(path), namespace="model").embed_documents(["a"])
+    assert base.calls == []
+
+    other = CountingEmbeddings()
+    CachedEmbeddings(other, EmbeddingCacheStore(path), namespace="other-model").embed_documents(["a"])
+    assert other.calls == [["a"]]
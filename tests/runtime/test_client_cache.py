@@ -0,0 +1,46 @@
+from unittest.mock import Mock
+
+import pytest
+
+pytest.importorskip("langchain_openai")
+pytest.importorskip("langgraph")
+
+from alita_sdk.runtime.clients.client import AlitaClient
+
+
+def _response(payload, ok=True):
+    response = Mock(ok=ok)
+    response.json.return_value = payload
+    return response
+
+
+@pytest.fixture
+def client():
+    client = AlitaClient("https://example.com/", 1, "token")
+    client.session = Mock()
+    return client
+
+
+def test_metadata_lookups_are_cached(client):
+    client.session.get.return_value = _response({"value": "s3cr3t"})
+    assert client.unsecret("key") == "s3cr3t"
+    assert client.unsecret("key") == "s3cr3t"
+    assert client.session.get.call_count == 1
+    client.invalidate_cache("secret")
+    client.unsecret("key")
+    assert client.session.get.call_count == 2
+
+
+def test_failed_lookups_are_not_cached(client):
+    client.session.get.return_value = _response({"error": "not found"}, ok=False)
+    assert client.fetch_available_configurations() == []
+    client.session.get.return_value = _response([{"id": 1}])
+    assert client.fetch_available_configurations() == [{"id": 1}]
+
+
+def test_cached_values_are_copies(client):
+    client.session.patch.return_value = _response({"variables": [{"name": "a", "value": 1}]})
+    client.configurations = [{"id": 1}]
+    client.get_app_version_details(1, 2)["variables"].clear()
+    assert client.get_app_version_details(1, 2)["variables"] == [{"name": "a", "value": 1}]
+    assert client.session.patch.call_count == 1
@@ -0,0 +1,93 @@
+import pytest
+
+pytest.importorskip("langchain")
+pytest.importorskip("tree_sitter_languages")
+
+from alita_sdk.tools.chunkers.code import codeparser
+from alita_sdk.tools.chunkers.code.codeparser import CodeParseMetrics, parse_code_files_for_db
+
+PYTHON_FILE = '''
+def first():
+    """ First function """
+    return 1
+
+
+class Second:
+    def method(self):
+        return 2
+'''
+
+
+def _files(count):
+    for idx in range(count):
+        yield {"file_name": f"module_{idx}.py", "file_content": PYTHON_FILE, "commit_hash": str(idx)}
+    yield {"file_name": "notes.unknown", "file_content": "plain text " * 10}
+    yield {"file_name": "empty.py", "file_content": "  "}
+
+
+def test_parse_in_process_with_metrics():
+    metrics = CodeParseMetrics()
+    docs = list(parse_code_files_for_db(_files(2), max_workers=1, metrics=metrics))
+    assert [doc.metadata["method_name"] for doc in docs] == ["first", "method", "first", "method", None]
+    assert metrics.summary()["python"]["files"] == 2
+    assert metrics.summary()["unknown"]["chunks"] == 1
+
+
+def test_pool_keeps_input_order():
+    sequential = list(parse_code_files_for_db(_files(40), max_workers=1))
+    parallel = list(parse_code_files_for_db(_files(40), max_workers=2, max_pending=4))
+    assert [(doc.page_content, doc.metadata) for doc in parallel] == \
+        [(doc.page_content, doc.metadata) for doc in sequential]
+
+
+def _python_files(count):
+    for idx in range(count):
+        yield {"file_name": f"module_{idx}.py", "file_content": PYTHON_FILE}
+
+
+@pytest.fixture
+def pool_calls(monkeypatch):
+    calls = []
+
+    def parse_in_pool(files, max_workers, ordered, max_pending):
+        calls.append((max_workers, ordered))
+        return (codeparser._parse_file(data) for data in files)
+
+    monkeypatch.setattr(codeparser, "_parse_in_pool", parse_in_pool)
+    return calls
+
+
+def test_pool_is_opt_in(pool_calls):
+    docs = list(parse_code_files_for_db(_python_files(40)))
+    assert len(docs) == 80
+    assert pool_calls == []
+
+
+def test_pool_settings_come_from_chunker_config(pool_calls):
+    config = {"max_workers": 3, "ordered": False}
+    # indexer node passes the config positionally, index_data with chunking_tool as a keyword
+    list(parse_code_files_for_db(_python_files(40), config))
+    list(parse_code_files_for_db(file_content_generator=_python_files(40), config=config))
+    list(parse_code_files_for_db(_python_files(40), config, max_workers=2))
+    assert pool_calls == [(3, False), (3, False), (2, False)]
+
+
+def test_code_toolkits_pass_parser_workers(pool_calls, monkeypatch):
+    from alita_sdk.tools.elitea_base import BaseCodeToolApiWrapper
+
+    class CodeWrapper(BaseCodeToolApiWrapper):
+        active_branch: str = "main"
+
+        def _get_files(self, path, branch):
+            return [f"module_{idx}.py" for idx in range(40)]
+
+        def _iter_file_contents(self, files, branch):
+            return _python_files(len(files))
+
+    store = type("Store", (), {"index_documents": lambda self, documents, **kwargs: len(list(documents))})()
+    monkeypatch.setattr(CodeWrapper, "_init_vector_store", lambda self, collection_suffix="": store)
+    wrapper = CodeWrapper()
+
+    assert len(list(wrapper.loader())) == 80
+    assert wrapper.index_data(parser_workers=4) == 80
+    assert pool_calls == [(4, True)]
@@ -0,0 +1,32 @@
+from types import SimpleNamespace
+
+from alita_sdk.runtime.utils.concurrency import AdaptiveLimiter, is_rate_limit_error
+
+
+class RateLimitError(Exception):
+    pass
+
+
+def test_is_rate_limit_error():
+    assert is_rate_limit_error(RateLimitError("slow down"))
+    assert is_rate_limit_error(Exception("429 Too Many Requests"))
+    error = Exception("failed")
+    error.response = SimpleNamespace(status_code=429)
+    assert is_rate_limit_error(error)
+    assert not is_rate_limit_error(ValueError("bad input"))
+
+
+def test_adaptive_limiter_decreases_and_recovers():
+    limiter = AdaptiveLimiter(max_concurrency=4, increase_after=2)
+    limiter.acquire()
+    limiter.release(throttled=True)
+    assert limiter.limit == 2
+    limiter.acquire()
+    limiter.release(throttled=True)
+    limiter.acquire()
+    limiter.release(throttled=True)
+    assert limiter.limit == 1
+    for _ in range(2):
+        with limiter.slot():
+            pass
+    assert limiter.limit == 2
@@ -0,0 +1,59 @@
+import random
+from unittest.mock import Mock
+
+import pytest
+
+pytest.importorskip("langchain_core")
+pytest.importorskip("chardet")
+
+from alita_sdk.runtime.clients.artifact import Artifact
+from alita_sdk.tools.utils import content_parser
+from alita_sdk.tools.utils.content_parser import decode_text, detect_encoding, iter_file_content
+
+
+def test_detect_encoding_uses_sample():
+    data = b"plain text\n" * 100000
+    assert detect_encoding(data, sample_size=1024) == "ascii"
+
+
+@pytest.mark.parametrize("tail", ["café".encode(), "café".encode("latin-1")])
+def test_decode_text_beyond_ascii_sample(tail):
+    data = b"a" * 70000 + tail
+    assert detect_encoding(data) == "ascii"
+    assert decode_text(data) == "a" * 70000 + "café"
+
+
+def test_decode_text_of_binary_content():
+    assert decode_text(random.Random(0).randbytes(4096)) is None
+
+
+def test_iter_file_content_yields_single_document_for_text():
+    docs = list(iter_file_content(file_name="notes.txt", file_content=b"hello"))
+    assert [(doc.page_content, doc.metadata) for doc in docs] == [("hello", {"source": "notes.txt", "page": 1})]
+
+
+def test_decode_text_detects_encoding_on_sample_only(monkeypatch):
+    detected = []
+    monkeypatch.setattr(content_parser, "detect_encoding", lambda data, sample_size: detected.append(len(data)) or "windows-1254")
+    # PDF-like payload which does not decode with the sample encoding
+    data = b"%PDF-1.4\n" + b"\xff\x81" * 100000
+
+    assert decode_text(data, sample_size=1024) is None
+    assert detected == [1024]
+
+
+def test_decode_text_treats_nul_bytes_as_binary(monkeypatch):
+    monkeypatch.setattr(content_parser, "detect_encoding", Mock(side_effect=AssertionError("no detection expected")))
+    assert decode_text(b"PK\x03\x04\x00\x00" + b"a" * 100) is None
+
+
+def test_decode_text_of_utf16_with_bom():
+    assert decode_text("text".encode("utf-16")) == "text"
+
+
+def test_unsupported_artifact_is_skipped():
+    client = Mock()
+    client.download_artifact.return_value = random.Random(0).randbytes(4096)
+    artifact = Artifact(client, "bucket")
+
+    assert list(artifact.iter_pages("bundle.zip")) == []
@@ -0,0 +1,91 @@
+import operator
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from alita_sdk.runtime.langchain.tools.dedup import similar_pairs
+
+
+def _brute_force(embeddings, score_func, cutoff_op, cutoff):
+    result = set()
+    for i in range(len(embeddings)):
+        for j in range(i + 1, len(embeddings)):
+            a, b = embeddings[i].astype(float), embeddings[j].astype(float)
+            cos = a @ b / (np.linalg.norm(a) * np.linalg.norm(b))
+            score = {
+                "cos_sim": cos,
+                "dot_score": a @ b,
+                "cdist": np.linalg.norm(a - b),
+                "l2": np.linalg.norm(a - b) ** 2,
+                "cosine": 1 - cos,
+                "ip": 1 - a @ b,
+            }[score_func]
+            if cutoff_op(score, cutoff):
+                result.add((i, j))
+    return result
+
+
+@pytest.mark.parametrize("score_func,cutoff_op,cutoff", [
+    ("cos_sim", operator.ge, 0.5),
+    ("dot_score", operator.ge, 6.0),
+    ("cdist", operator.le, 3.5),
+    ("l2", operator.le, 12.0),
+    ("cosine", operator.le, 0.5),
+    ("ip", operator.le, -6.0),
+])
+def test_tiled_scores_match_brute_force(score_func, cutoff_op, cutoff):
+    embeddings = np.random.default_rng(1).standard_normal((150, 8)).astype(np.float32)
+    pairs = {(i, j) for i, j, _ in similar_pairs(embeddings, score_func, cutoff_op, cutoff, tile_size=32)}
+    assert pairs == _brute_force(embeddings, score_func, cutoff_op, cutoff)
+
+
+def test_approximate_mode_finds_near_duplicates():
+    embeddings = np.random.default_rng(2).standard_normal((500, 32)).astype(np.float32)
+    embeddings[10] = embeddings[400] + 0.001
+    pairs = {(i, j) for i, j, _ in similar_pairs(embeddings, "cos_sim", operator.ge, 0.99, approximate=True)}
+    assert (10, 400) in pairs
+
+
+def test_unknown_score_function():
+    with pytest.raises(ValueError):
+        list(similar_pairs([[1.0], [2.0]], "unknown", operator.ge, 0.5))
+
+
+def test_deduplicate_keeps_embeddings_as_float32_matrix(monkeypatch):
+    pytest.importorskip("langchain_core")
+    pytest.importorskip("openpyxl")
+    from alita_sdk.runtime.langchain import indexer
+    from alita_sdk.runtime.langchain.interfaces import llm_processor
+    from alita_sdk.runtime.langchain.tools import dedup, vector
+
+    embeddings = Mock()
+    embeddings.embed_documents.side_effect = lambda texts: [[1.0, 0.0] for _ in texts]
+
+    class FakeAdapter:
+        def __init__(self, vectorstore, embeddings):
+            self.embeddings = embeddings
+
+        def iter_data(self, where, include):
+            yield {"documents": ["a", "b"], "metadatas": [{}, {}], "embeddings": [np.array([1.0, 0.0]), None]}
+            yield {"documents": ["c"], "metadatas": [{}], "embeddings": [[0.0, 1.0]]}
+
+    scored = []
+
+    def recording_pairs(matrix, *args, **kwargs):
+        scored.append(matrix)
+        return similar_pairs(matrix, *args, **kwargs)
+
+    monkeypatch.setattr(llm_processor, "get_embeddings", lambda *args: embeddings)
+    monkeypatch.setattr(llm_processor, "get_vectorstore", lambda *args, **kwargs: None)
+    monkeypatch.setattr(vector, "VectorAdapter", FakeAdapter)
+    monkeypatch.setattr(dedup, "similar_pairs", recording_pairs)
+
+    pairs, _ = indexer.deduplicate("model", {}, "Chroma", {}, "lib", 0.9)
+
+    (matrix,) = scored
+    assert isinstance(matrix, np.ndarray)
+    assert (matrix.dtype, matrix.shape) == (np.float32, (3, 2))
+    # "b" is embedded as [1, 0], same as "a"
+    assert [(pair["score"], pair["Document Content #1"], pair["Document Content #2"]) for pair in pairs] == [
+        (1.0, "~~a~~", "**b**")]
@@ -0,0 +1,28 @@
+import pytest
+
+from alita_sdk.runtime.utils.evaluate import (
+    EvaluateTemplate, compile_template, precompile_template, summarize_state
+)
+
+
+def test_templates_are_compiled_once():
+    assert compile_template("{{ a }}") is compile_template("{{ a }}")
+    assert precompile_template("{% if %}") is None
+
+
+def test_evaluate_with_precompiled_template():
+    template = compile_template("{{ (data | json_loads(True))['next'] }}")
+    result = EvaluateTemplate("", {"data": "{'next': 'step_2'}"}, template=template).evaluate()
+    assert result == "step_2"
+
+
+def test_invalid_template_raises():
+    with pytest.raises(Exception, match="Invalid jinja template"):
+        EvaluateTemplate("{% if %}", {}).evaluate()
+
+
+def test_summarize_state():
+    state = {"messages": [1, 2, 3], "text": "abcd", "count": 2, "other": object()}
+    assert summarize_state(state) == {
+        "messages": "list[3]", "text": "str[4]", "count": 2, "other": "object"
+    }
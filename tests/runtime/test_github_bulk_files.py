@@ -0,0 +1,124 @@
+import base64
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+pytest.importorskip("github")
+pytest.importorskip("langchain_community")
+
+from github import GithubException
+from langchain_core.tools import ToolException
+
+from alita_sdk.tools.github import github_client
+from alita_sdk.tools.github.github_client import GitHubClient
+from alita_sdk.runtime.utils.concurrency import AdaptiveLimiter
+
+
+def _repo():
+    repo = Mock(full_name="org/repo")
+    repo.get_git_tree.return_value = SimpleNamespace(
+        raw_data={"truncated": False},
+        tree=[
+            SimpleNamespace(path="src", type="tree", sha="t1"),
+            SimpleNamespace(path="src/app.py", type="blob", sha="b1"),
+            SimpleNamespace(path="README.md", type="blob", sha="b2"),
+        ],
+    )
+    repo.get_git_blob.side_effect = lambda sha: SimpleNamespace(
+        content=base64.b64encode(f"content of {sha}".encode()).decode()
+    )
+    return repo
+
+
+@pytest.fixture
+def client():
+    client = GitHubClient.model_construct()
+    client.github_repo_instance = _repo()
+    return client
+
+
+def test_files_are_listed_from_one_tree_call(client):
+    assert client._get_files("", "main") == ["src/app.py", "README.md"]
+    assert client._get_files("src", "main") == ["src/app.py"]
+    client.github_repo_instance.get_contents.assert_not_called()
+
+
+def test_contents_are_read_by_blob_sha_in_order(client):
+    files = list(client._iter_file_contents(["README.md", "src/app.py"], "main", max_workers=2))
+    assert files == [
+        {"file_name": "README.md", "file_content": "content of b2", "commit_hash": "b2"},
+        {"file_name": "src/app.py", "file_content": "content of b1", "commit_hash": "b1"},
+    ]
+    client.github_repo_instance.get_contents.assert_not_called()
+
+
+def test_listed_shas_are_reused_for_contents(client):
+    files = client._get_files("", "main")
+    assert [item["commit_hash"] for item in client._iter_file_contents(files, "main")] == ["b1", "b2"]
+    client.github_repo_instance.get_git_tree.assert_called_once()
+
+
+def test_truncated_tree_fallback_walks_requested_directory(client):
+    repo = client.github_repo_instance
+    repo.get_git_tree.return_value.raw_data["truncated"] = True
+    repo.get_contents.return_value = [SimpleNamespace(path="src/app.py", type="file", sha="b1")]
+
+    files = list(client._iter_file_contents(["src/app.py"], "main"))
+
+    assert files == [{"file_name": "src/app.py", "file_content": "content of b1", "commit_hash": "b1"}]
+    repo.get_contents.assert_called_once_with("src", ref="main")
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(github_client.time, "sleep", sleeps.append)
+    return sleeps
+
+
+def test_read_blob_retries_rate_limited_requests(client, no_sleep):
+    repo = client.github_repo_instance
+    blob = repo.get_git_blob.side_effect
+    repo.get_git_blob.side_effect = [
+        GithubException(403, {"message": "You have exceeded a secondary rate limit"}, {"Retry-After": "3"}),
+        GithubException(429, {"message": "Too many requests"}, {}),
+        blob("b1"),
+    ]
+    assert client._read_blob(repo, "b1", AdaptiveLimiter(2)) == "content of b1"
+    assert no_sleep == [3.0, 2.0]
+
+
+def test_exhausted_rate_limit_stops_reading(client, no_sleep):
+    repo = client.github_repo_instance
+    repo.get_git_blob.side_effect = GithubException(
+        403, {"message": "API rate limit exceeded"}, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "1700000000"})
+    with pytest.raises(ToolException, match="rate limit is exhausted"):
+        list(client._iter_file_contents(["src/app.py"], "main"))
+    assert repo.get_git_blob.call_count == 1
+    assert no_sleep == []
+
+
+def test_unreadable_files_are_skipped(client, no_sleep):
+    repo = client.github_repo_instance
+    blob = repo.get_git_blob.side_effect
+
+    def get_git_blob(sha):
+        if sha == "b1":
+            raise GithubException(404, {"message": "Not Found"}, {})
+        return blob(sha)
+
+    repo.get_git_blob.side_effect = get_git_blob
+
+    files = list(client._iter_file_contents(["src/app.py", "README.md"], "main"))
+
+    assert files == [{"file_name": "README.md", "file_content": "content of b2", "commit_hash": "b2"}]
+
+
+def test_read_blob_does_not_retry_forbidden(client, no_sleep):
+    repo = client.github_repo_instance
+    repo.get_git_blob.side_effect = GithubException(403, {"message": "Resource not accessible by integration"}, {})
+    with pytest.raises(GithubException):
+        client._read_blob(repo, "b1", AdaptiveLimiter(2))
+    assert repo.get_git_blob.call_count == 1
+    assert no_sleep == []
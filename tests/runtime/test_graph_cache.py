@@ -0,0 +1,177 @@
+import pytest
+
+pytest.importorskip("langchain_core")
+pytest.importorskip("langgraph")
+
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.tools import StructuredTool
+from langgraph.checkpoint.memory import MemorySaver
+
+from alita_sdk.runtime.langchain import langraph_agent
+from alita_sdk.runtime.langchain.langraph_agent import (
+    DecisionEdge, GRAPH_CACHE, SUBGRAPH_REGISTRY, create_graph,
+)
+
+SCHEMA = """
+state:
+  messages:
+    type: list
+  input:
+    type: str
+  result:
+    type: str
+  route:
+    type: str
+entry_point: greet
+nodes:
+  - id: greet
+    type: function
+    tool: greet
+    input: [input]
+    input_mapping:
+      name:
+        type: variable
+        value: input
+    output: [result]
+    decision:
+      nodes: [first, second]
+      description: choose the next step
+      decisional_inputs: [result]
+  - id: first
+    type: state_modifier
+    template: first
+    output: [route]
+    transition: END
+  - id: second
+    type: state_modifier
+    template: second
+    output: [route]
+    transition: END
+"""
+
+PARENT_SCHEMA = """
+state:
+  messages:
+    type: list
+  input:
+    type: str
+  result:
+    type: str
+entry_point: child
+nodes:
+  - id: child
+    type: subgraph
+    tool: child
+"""
+
+CHILD_SCHEMA = """
+state:
+  messages:
+    type: list
+  input:
+    type: str
+  result:
+    type: str
+entry_point: greet
+nodes:
+  - id: greet
+    type: function
+    tool: greet
+    input: [input]
+    input_mapping:
+      name:
+        type: variable
+        value: input
+    output: [result]
+    transition: END
+"""
+
+
+def _greet_tool(greeting):
+    def greet(name: str) -> str:
+        """ Greets by name """
+        return f"{greeting} {name}"
+    return StructuredTool.from_function(greet)
+
+
+def _client(step):
+    return FakeListChatModel(responses=[step])
+
+
+def _run(graph, text="world"):
+    return graph.invoke({"input": text}, config={"configurable": {}})
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    GRAPH_CACHE.clear()
+    yield
+    GRAPH_CACHE.clear()
+    SUBGRAPH_REGISTRY.pop("child", None)
+
+
+@pytest.fixture
+def compilations(monkeypatch):
+    calls = []
+    prepare = langraph_agent.prepare_output_schema
+
+    def counting_prepare(*args, **kwargs):
+        calls.append(args)
+        return prepare(*args, **kwargs)
+
+    monkeypatch.setattr(langraph_agent, "prepare_output_schema", counting_prepare)
+    return calls
+
+
+def test_cache_hit_binds_request_tools_client_and_memory(compilations):
+    first_memory, second_memory = MemorySaver(), MemorySaver()
+    first = create_graph(_client("first"), SCHEMA, [_greet_tool("hello")], memory=first_memory)
+    second = create_graph(_client("second"), SCHEMA, [_greet_tool("hi")], memory=second_memory)
+
+    assert len(compilations) == 1
+    assert (first.checkpointer, second.checkpointer) == (first_memory, second_memory)
+    first_result, second_result = _run(first), _run(second)
+    assert (first_result["result"], first_result["route"]) == ("hello world", "first")
+    assert (second_result["result"], second_result["route"]) == ("hi world", "second")
+    # graph of the first request is not changed by binding
+    assert _run(create_graph(_client("first"), SCHEMA, [_greet_tool("hey")], memory=MemorySaver()))["route"] == "first"
+
+
+def test_template_holds_no_request_objects():
+    client, tool = _client("first"), _greet_tool("hello")
+    create_graph(client, SCHEMA, [tool], memory=MemorySaver())
+    (key,) = GRAPH_CACHE.keys()
+    template = GRAPH_CACHE.get(key)
+
+    assert template.graph.checkpointer is None
+    assert template.graph.store is None
+    assert template.graph.nodes["greet"].bound.tool is not tool
+    assert template.graph.builder.nodes["greet"].runnable.tool is not tool
+    edges = [branch.path for branches in template.graph.builder.branches.values() for branch in branches.values()
+             if isinstance(branch.path, DecisionEdge)]
+    assert edges and all(edge.client is None for edge in edges)
+
+
+def test_decision_edges_are_rebound_per_request():
+    tool = _greet_tool("hello")
+    routes = [_run(create_graph(_client(step), SCHEMA, [tool], memory=MemorySaver()))["route"]
+              for step in ("second", "first", "second")]
+    assert routes == ["second", "first", "second"]
+
+
+def test_subgraph_tools_come_from_current_registry(compilations):
+    SUBGRAPH_REGISTRY["child"] = {"yaml": CHILD_SCHEMA, "tools": [_greet_tool("hello")], "flattened": False}
+    first = create_graph(_client("first"), PARENT_SCHEMA, [], memory=MemorySaver())
+    # the subgraph toolkit registers new tool instances for every request
+    SUBGRAPH_REGISTRY["child"] = {"yaml": CHILD_SCHEMA, "tools": [_greet_tool("hi")], "flattened": False}
+    second = create_graph(_client("first"), PARENT_SCHEMA, [], memory=MemorySaver())
+
+    assert len(compilations) == 1
+    assert _run(first)["result"] == "hello world"
+    assert _run(second)["result"] == "hi world"
+
+
+def test_last_tool_wins_for_duplicated_names():
+    first = StructuredTool.from_function(lambda: "first", name="dup", description="first")
+    last = StructuredTool.from_function(lambda: "last", name="dup", description="last")
+    assert langraph_agent._tools_by_name([first, last]) == {"dup": last}
@@ -0,0 +1,144 @@
+import base64
+import io
+
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from alita_sdk.tools.utils import content_parser, image_captions
+from alita_sdk.tools.utils.image_captions import caption_images, image_hash
+
+
+class CountingLLM(FakeListChatModel):
+    calls: int = 0
+
+    def _call(self, *args, **kwargs):
+        self.calls += 1
+        return super()._call(*args, **kwargs)
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    image_captions.CAPTIONS.clear()
+    yield
+    image_captions.CAPTIONS.clear()
+
+
+def test_captions_are_cached_by_image_hash():
+    llm = CountingLLM(responses=["first", "second"])
+    images = {image_hash(b"a"): b"a", image_hash(b"b"): b"b"}
+    captions = caption_images(llm, images, "describe")
+    assert sorted(captions.values()) == [
+        "\n[Image description: first]\n", "\n[Image description: second]\n"
+    ]
+    assert caption_images(llm, images, "describe") == captions
+    assert llm.calls == 2
+
+
+def test_persistent_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv(image_captions.CAPTION_CACHE_PATH_ENV, str(tmp_path / "captions.db"))
+    images = {image_hash(b"a"): b"a"}
+    caption_images(CountingLLM(responses=["cached"]), images, "describe")
+    image_captions.CAPTIONS.clear()
+    llm = CountingLLM(responses=["new"])
+    assert caption_images(llm, images, "describe") == {image_hash(b"a"): "\n[Image description: cached]\n"}
+    assert llm.calls == 0
+
+
+class ImageNamingLLM(BaseChatModel):
+    """ Describes an image by its name, records described image names """
+    names: dict
+    described: list = []
+    batches: list = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "image-naming"
+
+    def batch(self, inputs, *args, **kwargs):
+        self.batches.append(len(inputs))
+        return super().batch(inputs, *args, **kwargs)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        url = messages[-1].content[1]["image_url"]["url"]
+        name = self.names[image_hash(base64.b64decode(url.split(",", 1)[1]))]
+        self.described.append(name)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=name))])
+
+
+def _png(color):
+    pymupdf = pytest.importorskip("pymupdf")
+    pixmap = pymupdf.Pixmap(pymupdf.csRGB, pymupdf.IRect(0, 0, 4, 4), False)
+    pixmap.set_rect(pixmap.irect, color)
+    return pixmap.tobytes("png")
+
+
+@pytest.fixture
+def images():
+    return {"red": _png((255, 0, 0)), "blue": _png((0, 0, 255))}
+
+
+def _pdf(images, pages):
+    import pymupdf
+
+    with pymupdf.open() as doc:
+        for text, name in pages:
+            page = doc.new_page()
+            page.insert_text((72, 72), text)
+            page.insert_image(pymupdf.Rect(100, 100, 140, 140), stream=images[name])
+        return doc.tobytes()
+
+
+def _pptx(images, pages):
+    pptx = pytest.importorskip("pptx")
+    prs = pptx.Presentation()
+    for text, name in pages:
+        slide = prs.slides.add_slide(prs.slide_layouts[6])
+        slide.shapes.add_textbox(0, 0, 1000000, 500000).text = text
+        slide.shapes.add_picture(io.BytesIO(images[name]), 0, 1000000)
+    output = io.BytesIO()
+    prs.save(output)
+    return output.getvalue()
+
+
+def _image_llm(images):
+    return ImageNamingLLM(names={image_hash(image): name for name, image in images.items()})
+
+
+@pytest.mark.parametrize("build, parse", [
+    (_pdf, lambda content, llm: content_parser.parse_pdf(content, None, True, llm)),
+    (_pptx, lambda content, llm: content_parser.parse_pptx(content, None, True, llm)),
+])
+def test_repeated_image_is_described_once_in_page_order(images, build, parse):
+    content = build(images, [("first", "red"), ("second", "blue"), ("third", "red")])
+    llm = _image_llm(images)
+
+    text = parse(content, llm)
+
+    assert sorted(llm.described) == ["blue", "red"]
+    assert llm.batches == [2]
+    positions = [text.index(part) for part in ("first", "red]", "second", "blue]", "third")]
+    assert positions == sorted(positions)
+    assert text.count("[Image description: red]") == 2
+
+
+@pytest.mark.parametrize("file_name, build", [("doc.pdf", _pdf), ("doc.pptx", _pptx)])
+def test_streamed_pages_are_captioned_in_windows(images, file_name, build, monkeypatch):
+    monkeypatch.setattr(content_parser, "CAPTION_PAGE_WINDOW", 2)
+    content = build(images, [("first", "red"), ("second", "blue"), ("third", "red")])
+    llm = _image_llm(images)
+
+    docs = list(content_parser.iter_file_content(file_name=file_name, file_content=content,
+                                                 is_capture_image=True, llm=llm))
+
+    assert [doc.metadata["page"] for doc in docs] == [1, 2, 3]
+    assert [doc.page_content.count("[Image description: ") for doc in docs] == [1, 1, 1]
+    assert "red]" in docs[2].page_content
+    # both images of the first window are described together, the third page reuses the cached caption
+    assert llm.batches == [2]
+    assert sorted(llm.described) == ["blue", "red"]
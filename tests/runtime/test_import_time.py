@@ -0,0 +1,58 @@
+import json
+import logging
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("langchain_core")
+pytest.importorskip("langgraph")
+
+from alita_sdk.tools.toolkits_manifest import TOOLKITS_MANIFEST  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+# generous bound for slow CI hosts, importing all toolkits takes much longer
+MAX_IMPORT_SECONDS = 10
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"elapsed": elapsed, "modules": sorted(sys.modules)}}))
+"""
+
+
+def _import_in_subprocess(module="alita_sdk.tools"):
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module)], check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_toolkits_are_not_imported_eagerly():
+    result = _import_in_subprocess()
+    toolkit_modules = {f"alita_sdk.tools.{module_path}" for _, module_path, *_ in TOOLKITS_MANIFEST}
+    assert not toolkit_modules & set(result["modules"])
+    for heavy in ("boto3", "google.cloud.bigquery", "pandas", "playwright"):
+        assert heavy not in result["modules"]
+
+
+def test_clients_do_not_import_parser_backends():
+    result = _import_in_subprocess("alita_sdk.runtime.clients")
+    # transformers is left out: langchain_core loads it for token counting whenever it is installed
+    for heavy in ("torch", "pymupdf", "fitz", "pptx", "docx", "pandas"):
+        assert heavy not in result["modules"]
+
+
+@pytest.mark.parametrize("module", ["alita_sdk.tools", "alita_sdk.runtime.clients"])
+def test_import_time_benchmark(module):
+    result = _import_in_subprocess(module)
+    logger.info(f"{module} import: {result['elapsed']:.3f}s")
+    assert result["elapsed"] < MAX_IMPORT_SECONDS, f"{module} import took {result['elapsed']:.3f}s"
+
+
+def test_manifest_entries_are_unique():
+    names = [entry[0] for entry in TOOLKITS_MANIFEST]
+    assert len(names) == len(set(names))
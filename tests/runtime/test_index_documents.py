@@ -0,0 +1,141 @@
+import time
+from unittest.mock import Mock
+
+import pytest
+
+pytest.importorskip("langchain_core")
+pytest.importorskip("pydantic")
+
+from langchain_core.documents import Document
+
+from alita_sdk.runtime.tools.vectorstore import VectorStoreWrapper
+
+
+def _wrapper(vectorstore, workers=1, process_document_func=None):
+    adapter = Mock()
+    adapter.vectorstore = vectorstore
+    adapter.supports_key_lookup = False
+    adapter.embeddings.embed_documents.side_effect = lambda texts: [[1.0, 0.0] for _ in texts]
+    return VectorStoreWrapper.model_construct(
+        vectoradapter=adapter, dataset="test", max_docs_per_add=2, embedding_workers=workers,
+        write_queue_size=4, process_document_func=process_document_func,
+    )
+
+
+def _documents(count):
+    for i in range(count):
+        yield Document(page_content=f"doc {i}", metadata={"id": str(i), "updated_on": 0})
+
+
+def _indexed(rows):
+    """ get_data_by_keys over rows of (db id, metadata) """
+    def get_data_by_keys(field, keys):
+        matched = [(db_id, meta) for db_id, meta in rows if meta.get(field) in set(keys)]
+        return {"ids": [db_id for db_id, _ in matched], "metadatas": [meta for _, meta in matched]}
+    return get_data_by_keys
+
+
+def _failing_documents():
+    yield from _documents(3)
+    raise ValueError("parser failed")
+
+
+def test_index_documents_adds_batches():
+    vectorstore = Mock(spec=["add_texts"])
+    result = _wrapper(vectorstore).index_documents(_documents(5))
+    assert result["status"] == "ok"
+    assert vectorstore.add_texts.call_count == 3
+
+
+def test_concurrent_indexing_writes_every_document_once_in_order():
+    vectorstore = Mock(spec=["add_texts", "add_embeddings"])
+    written = []
+    vectorstore.add_embeddings.side_effect = lambda texts, embeddings, metadatas: written.extend(
+        zip(texts, embeddings, [meta["id"] for meta in metadatas]))
+    wrapper = _wrapper(vectorstore, workers=3)
+
+    def embed_documents(texts):
+        # earlier batches finish last, so embeddings complete out of order
+        time.sleep(0.05 / (1 + int(texts[0].split()[1])))
+        return [[float(text.split()[1]), 1.0] for text in texts]
+
+    wrapper.vectoradapter.embeddings.embed_documents.side_effect = embed_documents
+
+    result = wrapper.index_documents(_documents(9))
+
+    assert result["status"] == "ok"
+    assert written == [(f"doc {i}", [float(i), 1.0], str(i)) for i in range(9)]
+    assert vectorstore.add_embeddings.call_count == 5
+    vectorstore.add_texts.assert_not_called()
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_index_documents_returns_write_errors(workers):
+    vectorstore = Mock(spec=["add_texts", "add_embeddings"])
+    vectorstore.add_texts.side_effect = RuntimeError("db is down")
+    vectorstore.add_embeddings.side_effect = RuntimeError("db is down")
+    result = _wrapper(vectorstore, workers).index_documents(_documents(5))
+    assert result["status"] == "error"
+    assert "db is down" in result["message"]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_index_documents_propagates_loader_errors(workers):
+    vectorstore = Mock(spec=["add_texts", "add_embeddings"])
+    with pytest.raises(ValueError, match="parser failed"):
+        _wrapper(vectorstore, workers).index_documents(_failing_documents())
+
+
+def test_incremental_duplicates_are_looked_up_per_batch():
+    vectorstore = Mock(spec=["add_texts", "delete"])
+    wrapper = _wrapper(vectorstore)
+    wrapper.vectoradapter.supports_key_lookup = True
+    wrapper.vectoradapter.get_data_by_keys.side_effect = _indexed([
+        ("db-0", {"id": "0", "updated_on": 1}),
+        ("db-1", {"id": "1", "updated_on": 5}),
+        ("db-1b", {"id": "1", "updated_on": 5, "chunk_id": 2}),
+    ])
+
+    docs = [Document(page_content="0", metadata={"id": "0", "updated_on": 2}),
+            Document(page_content="1", metadata={"id": "1", "updated_on": 5}),
+            Document(page_content="1", metadata={"id": "1", "updated_on": 5, "chunk_id": 2}),
+            Document(page_content="2", metadata={"id": "2", "updated_on": 5})]
+    result = list(wrapper._reduce_non_code_duplicates(iter(docs), vectorstore))
+
+    # "0" is outdated and re-indexed, "1" is up to date, "2" is new
+    assert [doc.metadata["id"] for doc in result] == ["0", "2"]
+    vectorstore.delete.assert_called_once_with(ids=["db-0"])
+    looked_up = [set(call.args[1]) for call in wrapper.vectoradapter.get_data_by_keys.call_args_list]
+    # the key of the first batch is not looked up again for the second one
+    assert looked_up == [{"0", "1"}, {"2"}]
+
+
+def test_incremental_duplicates_ignore_documents_written_by_the_run():
+    vectorstore = Mock(spec=["add_texts", "delete"])
+    written = []
+
+    def dependent_docs(docs):
+        for doc in docs:
+            if doc.metadata["id"] == "0":
+                yield Document(page_content="attachment", metadata={"id": "dep", "updated_on": 0})
+
+    def add_texts(texts, metadatas):
+        written.extend(metadatas)
+
+    vectorstore.add_texts.side_effect = add_texts
+    wrapper = _wrapper(vectorstore, process_document_func=dependent_docs)
+    wrapper.vectoradapter.supports_key_lookup = True
+    # lookups see everything written so far, as with a concurrent writer
+    wrapper.vectoradapter.get_data_by_keys.side_effect = lambda field, keys: _indexed(
+        [(f"db-{i}", meta) for i, meta in enumerate(written)])(field, keys)
+
+    docs = [Document(page_content="0", metadata={"id": "0", "updated_on": 0}),
+            Document(page_content="1", metadata={"id": "1", "updated_on": 0}),
+            Document(page_content="dep", metadata={"id": "dep", "updated_on": 1})]
+    result = wrapper.index_documents(iter(docs), clean_index=False)
+
+    assert result["status"] == "ok"
+    vectorstore.delete.assert_not_called()
+    looked_up = set().union(*(set(call.args[1]) for call in wrapper.vectoradapter.get_data_by_keys.call_args_list))
+    assert "dep" not in looked_up
+    assert [meta["id"] for meta in written] == ["0", "dep", "1", "dep"]
@@ -0,0 +1,169 @@
+import os
+import shutil
+import subprocess
+import threading
+
+import pytest
+
+pytest.importorskip("git")
+pytest.importorskip("filelock")
+pytest.importorskip("langchain_core")
+pytest.importorskip("pydantic")
+
+from filelock import FileLock
+from langchain_core.documents import Document
+
+from alita_sdk.tools.chunkers.code import codeparser
+from alita_sdk.tools.elitea_base import BaseCodeToolApiWrapper
+from alita_sdk.tools.localgit import checkout as checkout_module
+from alita_sdk.tools.localgit.checkout import LocalCheckout
+
+
+def _git(cwd, *args):
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True).stdout.strip()
+
+
+def _commit(origin, files):
+    for name, content in files.items():
+        mode = "wb" if isinstance(content, bytes) else "w"
+        with open(os.path.join(origin, name), mode) as file:
+            file.write(content)
+    _git(origin, "add", ".")
+    _git(origin, "-c", "user.name=test", "-c", "user.email=test@example.com", "commit", "-qm", "update")
+    return _git(origin, "rev-parse", "HEAD")
+
+
+@pytest.fixture
+def origin(tmp_path):
+    path = tmp_path / "origin"
+    path.mkdir()
+    _git(path, "init", "-q", "-b", "main")
+    return str(path)
+
+
+def test_sync_lists_and_reads_files(origin, tmp_path):
+    head = _commit(origin, {"app.py": "print(1)\n", "data.bin": b"\x00\xff\xfe"})
+    os.symlink("app.py", os.path.join(origin, "link.py"))
+    head = _commit(origin, {})
+
+    checkout = LocalCheckout(f"file://{origin}", "main", cache_dir=str(tmp_path / "cache"))
+    assert checkout.sync() == head
+
+    files = checkout.ls_tree()
+    assert set(files) == {"app.py", "data.bin"}
+    assert checkout.read_blob(files["app.py"]) == "print(1)\n"
+    assert checkout.read_blob(files["data.bin"]) is None
+
+
+def test_concurrent_sync_does_not_change_read_commit(origin, tmp_path):
+    first = _commit(origin, {"app.py": "v = 1\n"})
+    cache_dir = str(tmp_path / "cache")
+    running = LocalCheckout(f"file://{origin}", "main", cache_dir=cache_dir)
+    running.sync()
+
+    second = _commit(origin, {"app.py": "v = 2\n", "new.py": ""})
+    # another run fetches a newer commit into the shared clone
+    assert LocalCheckout(f"file://{origin}", "main", cache_dir=cache_dir).sync() == second
+
+    files = running.ls_tree()
+    assert running.head == first
+    assert set(files) == {"app.py"}
+    assert running.read_blob(files["app.py"]) == "v = 1\n"
+
+
+def test_changed_files_since_commit(origin, tmp_path):
+    first = _commit(origin, {"a.py": "a = 1\n", "b.py": "b = 1\n"})
+    checkout = LocalCheckout(f"file://{origin}", "main", cache_dir=str(tmp_path / "cache"))
+    checkout.sync()
+    assert checkout.changed_files(None) is None
+
+    _git(origin, "rm", "-q", "a.py")
+    _commit(origin, {"b.py": "b = 2\n", "c.py": "c = 1\n"})
+    # a fresh checkout does not have the commit, it is fetched by SHA
+    checkout = LocalCheckout(f"file://{origin}", "main", cache_dir=str(tmp_path / "other"))
+    checkout.sync()
+    assert checkout.changed_files(first) == {"a.py", "b.py", "c.py"}
+    assert checkout.changed_files("0" * 40) is None
+
+
+class FakeAdapter:
+    """ Vectorstore adapter over in-memory documents {db id: metadata} """
+
+    def __init__(self):
+        self.documents = {}
+        self.collection_metadata = {}
+        self.vectorstore = self
+
+    def get_collection_metadata(self):
+        return dict(self.collection_metadata)
+
+    def update_collection_metadata(self, values):
+        self.collection_metadata.update(values)
+
+    def iter_data(self, where, include):
+        paths = where["filename"]["$in"] if where else None
+        matched = {db_id: meta for db_id, meta in self.documents.items() if paths is None or meta["filename"] in paths}
+        yield {"ids": list(matched), "metadatas": list(matched.values())}
+
+    def delete(self, ids):
+        for db_id in ids:
+            del self.documents[db_id]
+
+    def persist(self):
+        pass
+
+
+class FakeVectorStore:
+    def __init__(self):
+        self.vectoradapter = FakeAdapter()
+        self.indexed = []
+
+    def index_documents(self, documents, clean_index=True, is_code=False):
+        self.indexed = [doc.metadata["filename"] for doc in documents]
+        for file_name in self.indexed:
+            self.vectoradapter.documents[f"{file_name}:{len(self.vectoradapter.documents)}"] = {"filename": file_name}
+        return {"status": "ok"}
+
+
+class CodeWrapper(BaseCodeToolApiWrapper):
+    origin: str
+
+    def _local_checkout_source(self, branch):
+        return f"file://{self.origin}", None, None
+
+
+def test_index_data_from_local_checkout(origin, tmp_path, monkeypatch):
+    monkeypatch.setattr(checkout_module, "CHECKOUT_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(codeparser, "parse_code_files_for_db", lambda files, max_workers=None: (
+        Document(page_content=file["file_content"], metadata={"filename": file["file_name"]}) for file in files))
+    store = FakeVectorStore()
+    wrapper = CodeWrapper(origin=origin, collection_name="code")
+    monkeypatch.setattr(CodeWrapper, "_init_vector_store", lambda self, collection_suffix="": store)
+
+    _commit(origin, {"a.py": "a = 1\n", "b.py": "b = 1\n", "notes.md": "notes\n"})
+    wrapper.index_data(branch="main", whitelist=["*.py"], local_checkout=True)
+    assert sorted(store.indexed) == ["a.py", "b.py"]
+    (marker,) = store.vectoradapter.collection_metadata
+
+    _git(origin, "rm", "-q", "a.py")
+    head = _commit(origin, {"b.py": "b = 2\n", "c.py": "c = 1\n", "notes.md": "more notes\n"})
+    # the indexed commit is read from the collection, not from the local clone
+    shutil.rmtree(tmp_path / "cache")
+    wrapper.index_data(branch="main", whitelist=["*.py"], local_checkout=True)
+
+    assert sorted(store.indexed) == ["b.py", "c.py"]
+    assert store.vectoradapter.collection_metadata == {marker: head}
+    assert "a.py" not in {meta["filename"] for meta in store.vectoradapter.documents.values()}
+
+
+def test_sync_waits_for_clone_lock(origin, tmp_path):
+    _commit(origin, {"app.py": "v = 1\n"})
+    checkout = LocalCheckout(f"file://{origin}", "main", cache_dir=str(tmp_path / "cache"))
+    # lock held by another process (a separate lock file descriptor)
+    with FileLock(checkout.path + ".lock"):
+        sync = threading.Thread(target=checkout.sync)
+        sync.start()
+        sync.join(0.5)
+        assert sync.is_alive()
+    sync.join()
+    assert checkout.head
@@ -0,0 +1,64 @@
+import threading
+import time
+
+import pytest
+
+from alita_sdk.runtime.tools.loop import join_responses, run_iterations
+
+
+def _step(item):
+    time.sleep(0.01 * (5 - item))
+    if item == 2:
+        raise ValueError("bad item")
+    return item * 10
+
+
+@pytest.mark.parametrize("max_concurrency", [None, 4])
+def test_results_keep_input_order_and_collect_errors(max_concurrency):
+    results = run_iterations(_step, list(range(5)), max_concurrency=max_concurrency)
+    assert [result for result, _ in results] == [0, 10, None, 30, 40]
+    assert isinstance(results[2][1], ValueError)
+
+
+def test_fail_fast_raises_first_error():
+    with pytest.raises(ValueError):
+        run_iterations(_step, list(range(5)), max_concurrency=2, fail_fast=True)
+
+
+def test_item_timeout():
+    results = run_iterations(lambda item: time.sleep(item) or item, [0, 0.5, 0], max_concurrency=2, item_timeout=0.1)
+    assert results[0] == (0, None)
+    assert isinstance(results[1][1], TimeoutError)
+    assert results[2] == (0, None)
+
+
+@pytest.mark.parametrize("max_concurrency", [None, 2])
+def test_queued_items_fail_when_all_workers_are_held(max_concurrency):
+    release = threading.Event()
+    calls = []
+
+    def invoke(item):
+        calls.append(item)
+        if item == "hang":
+            release.wait(5)
+        return item
+
+    items = ["ok"] + ["hang"] * (max_concurrency or 1) + ["ok", "ok"]
+    start = time.monotonic()
+    try:
+        results = run_iterations(invoke, items, max_concurrency=max_concurrency, item_timeout=0.1)
+    finally:
+        release.set()
+
+    assert time.monotonic() - start < 2
+    assert results[0] == ("ok", None)
+    assert all(isinstance(error, TimeoutError) for _, error in results[1:])
+    assert "not started" in str(results[-1][1])
+    assert calls.count("ok") == 1
+
+
+def test_join_responses():
+    assert join_responses(["a", 1], "str") == "a\n\n1\n\n"
+    assert join_responses(["a", {"messages": [{"content": "b"}]}], "dict") == {
+        "messages": [{"role": "assistant", "content": "a\n\nb\n\n"}]
+    }
@@ -0,0 +1,263 @@
+import gc
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+pytest.importorskip("psycopg2")
+
+from alita_sdk.runtime.tools import pgvector_search
+from alita_sdk.runtime.tools.pgvector_search import PGVectorSearch
+
+
+class FakePool:
+    def __init__(self, rows=()):
+        self.cursor = MagicMock()
+        self.cursor.__enter__.return_value = self.cursor
+        self.cursor.fetchall.return_value = list(rows)
+        self.conn = MagicMock(closed=False)
+        self.conn.cursor.return_value = self.cursor
+
+    @contextmanager
+    def connection(self):
+        yield self.conn
+
+    def executed(self):
+        """ (sql, params) of the last query """
+        return self.cursor.execute.call_args.args
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = FakePool(rows=[{"id": "1", "document": "text", "cmetadata": {}, "score": 0.5}])
+    monkeypatch.setattr(pgvector_search, "get_connection_pool", lambda *args, **kwargs: pool)
+    monkeypatch.setattr(pgvector_search, "_TEXT_INDEXES", set())
+    monkeypatch.setattr(pgvector_search, "_TEXT_INDEXES_PENDING", set())
+    return pool
+
+
+@pytest.fixture
+def indexes_ready(monkeypatch):
+    monkeypatch.setattr(PGVectorSearch, "ensure_text_index", lambda self, field_name, wait=False: True)
+
+
+def test_tsvector_sql_inlines_language_and_field(pool):
+    search = PGVectorSearch("postgresql://db", "docs", language="german")
+    assert search._tsvector_sql("title") == "to_tsvector('german'::regconfig, cmetadata->>'title')"
+    with pytest.raises(ValueError):
+        search._tsvector_sql("title'; DROP TABLE docs; --")
+
+
+def test_hybrid_search_rrf_fusion(pool, indexes_ready):
+    search = PGVectorSearch("postgresql://db", "docs")
+    rows = search.hybrid_search("query", [0.1, 0.2], ["title"], limit=5, fusion="rrf", rrf_k=10,
+                                vector_weight=1.0, text_weight=0.5, filter_dict={"library": "lib"})
+
+    assert rows == [{"id": "1", "document": "text", "cmetadata": {}, "score": 0.5}]
+    sql, params = pool.executed()
+    assert "%(vector_weight)s / (%(rrf_k)s + v.rank)" in sql
+    assert "%(text_weight)s / (%(rrf_k)s + t.rank)" in sql
+    assert "ts_rank(to_tsvector('english'::regconfig, cmetadata->>'title'), q, 1)" in sql
+    assert params["embedding"] == "[0.1,0.2]"
+    assert params["candidates"] == 15
+    assert params["rrf_k"] == 10
+    # top hit of both rankings scores 1
+    assert ") * %(rrf_scale)s" in sql
+    assert params["rrf_scale"] == pytest.approx(11 / 1.5)
+    assert "lib" in [value.strip('"') for value in params.values() if isinstance(value, str)]
+
+
+def test_hybrid_search_weighted_fusion_without_fields(pool, indexes_ready):
+    search = PGVectorSearch("postgresql://db", "docs")
+    search.hybrid_search("query", [0.1], [])
+
+    sql, _ = pool.executed()
+    assert "%(vector_weight)s * v.score" in sql
+    assert "%(text_weight)s * t.score" in sql
+    assert "WHERE FALSE" in sql
+
+
+@pytest.mark.parametrize("strategy, score_sql, order_sql", [
+    ("cosine", "1 - (embedding <=> %(embedding)s::vector) AS score", "ORDER BY embedding <=> %(embedding)s::vector"),
+    (SimpleNamespace(value="l2"), "1 - (embedding <-> %(embedding)s::vector) / sqrt(2) AS score",
+     "ORDER BY embedding <-> %(embedding)s::vector"),
+    ("max_inner_product", "-(embedding <#> %(embedding)s::vector) AS score",
+     "ORDER BY embedding <#> %(embedding)s::vector"),
+])
+def test_vector_score_follows_distance_strategy(pool, strategy, score_sql, order_sql):
+    search = PGVectorSearch("postgresql://db", "docs", distance_strategy=strategy)
+    search.hybrid_search("query", [0.1], [])
+
+    sql, _ = pool.executed()
+    assert score_sql in sql
+    assert order_sql in sql
+
+
+def _index_statements(pool):
+    return [call.args[0] for call in pool.cursor.execute.call_args_list if "INDEX" in call.args[0]]
+
+
+@pytest.mark.parametrize("state, statements", [
+    ([(True,)], []),
+    ([None, (True,)], ["CREATE INDEX CONCURRENTLY"]),
+    ([(False,), (True,)], ["DROP INDEX CONCURRENTLY", "CREATE INDEX CONCURRENTLY"]),
+])
+def test_text_index_setup(pool, state, statements):
+    pool.cursor.fetchone.side_effect = state
+    search = PGVectorSearch("postgresql://db", "docs")
+
+    assert search.ensure_text_index("title", wait=True)
+    assert [" ".join(sql.split()[:3]) for sql in _index_statements(pool)] == statements
+    # ready index is not checked again
+    pool.cursor.execute.reset_mock()
+    assert search.ensure_text_index("title", wait=True)
+    pool.cursor.execute.assert_not_called()
+
+
+def test_failed_text_index_is_retried(pool):
+    pool.cursor.fetchone.side_effect = [None, (False,), None, (True,)]
+    search = PGVectorSearch("postgresql://db", "docs")
+
+    assert not search.ensure_text_index("title", wait=True)
+    assert search.ensure_text_index("title", wait=True)
+    assert len(_index_statements(pool)) == 2
+
+
+def test_text_index_is_built_in_background(pool, monkeypatch):
+    started = []
+    monkeypatch.setattr(pgvector_search.threading, "Thread", lambda target, args, **kwargs: SimpleNamespace(
+        start=lambda: started.append(args)))
+    search = PGVectorSearch("postgresql://db", "docs")
+
+    assert not search.ensure_text_index("title")
+    # build in progress is not started again, searches do not wait for it
+    assert not search.ensure_text_index("title")
+    assert len(started) == 1
+    pool.cursor.execute.assert_not_called()
+
+
+def test_unsupported_options(pool):
+    with pytest.raises(ValueError):
+        PGVectorSearch("postgresql://db", "docs", distance_strategy="hamming")
+    with pytest.raises(ValueError):
+        PGVectorSearch("postgresql://db", "docs").hybrid_search("query", [0.1], [], fusion="max")
+
+
+class FakeConnection:
+    def __init__(self, alive=True):
+        self.closed = False
+        self.alive = alive
+        self.pings = 0
+
+    @contextmanager
+    def cursor(self):
+        self.pings += 1
+        if not self.alive:
+            raise pgvector_search.psycopg2.Error("server closed the connection")
+        yield MagicMock()
+
+    def rollback(self):
+        pass
+
+
+class FakeThreadedPool:
+    def __init__(self, minconn, maxconn, dsn):
+        self.idle = []
+        self.created = []
+        self.discarded = []
+        self.closed = False
+
+    def getconn(self):
+        if self.idle:
+            return self.idle.pop()
+        conn = FakeConnection()
+        self.created.append(conn)
+        return conn
+
+    def putconn(self, conn, close=False):
+        if close:
+            self.discarded.append(conn)
+        else:
+            self.idle.append(conn)
+
+    def closeall(self):
+        self.closed = True
+
+
+@pytest.fixture
+def threaded_pool(monkeypatch):
+    monkeypatch.setattr(pgvector_search.psycopg2.pool, "ThreadedConnectionPool", FakeThreadedPool)
+
+
+def test_pool_checkout_and_return(threaded_pool):
+    pool = pgvector_search.PGConnectionPool("postgresql://db", max_size=2)
+    with pool.connection() as conn:
+        assert pool.stats()["in_use"] == 1
+    with pool.connection() as again:
+        assert again is conn
+    assert conn.pings == 0
+    stats = pool.stats()
+    assert (stats["checkouts"], stats["in_use"], stats["discarded"]) == (2, 0, 0)
+
+
+def test_pool_pings_and_discards_stale_connection(threaded_pool):
+    pool = pgvector_search.PGConnectionPool("postgresql://db", max_idle=0.0)
+    with pool.connection() as conn:
+        pass
+    conn.alive = False
+    with pool.connection() as fresh:
+        assert fresh is not conn
+    assert conn.pings == 1
+    assert pool._pool.discarded == [conn]
+    assert pool.stats()["discarded"] == 1
+
+
+def test_pool_keeps_alive_stale_connection(threaded_pool):
+    pool = pgvector_search.PGConnectionPool("postgresql://db", max_idle=0.0)
+    with pool.connection() as conn:
+        pass
+    with pool.connection() as again:
+        assert again is conn
+    assert conn.pings == 1
+
+
+def test_pool_discards_closed_connection(threaded_pool):
+    pool = pgvector_search.PGConnectionPool("postgresql://db")
+    with pool.connection() as conn:
+        conn.closed = True
+    assert pool._pool.discarded == [conn]
+    assert pool.stats()["discarded"] == 1
+    assert len(pool._released_at) == 0
+
+
+def test_released_connections_are_tracked_weakly(threaded_pool):
+    pool = pgvector_search.PGConnectionPool("postgresql://db")
+    with pool.connection():
+        pass
+    assert len(pool._released_at) == 1
+    # connection dropped by the underlying pool does not keep its release time
+    pool._pool.idle.clear()
+    pool._pool.created.clear()
+    gc.collect()
+    assert len(pool._released_at) == 0
+
+
+def test_pool_waits_for_free_connection(threaded_pool):
+    pool = pgvector_search.PGConnectionPool("postgresql://db", max_size=1, timeout=0.01)
+    with pool.connection():
+        with pytest.raises(TimeoutError):
+            with pool.connection():
+                pass
+    assert pool.stats()["waits"] == 1
+    with pool.connection():
+        pass
+
+
+def test_close_connection_pools(threaded_pool, monkeypatch):
+    monkeypatch.setattr(pgvector_search, "_POOLS", {})
+    pool = pgvector_search.get_connection_pool("postgresql://db")
+    assert pgvector_search.get_connection_pool("postgresql://db") is pool
+    pgvector_search.close_connection_pools()
+    assert pool._pool.closed
+    assert pgvector_search._POOLS == {}
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("langchain")
+pytest.importorskip("tiktoken")
+
+from langchain_core.documents import Document
+
+from alita_sdk.tools.chunkers.sematic.statistical_chunker import (
+    _calculate_similarity_scores, statistical_chunker
+)
+
+
+class CountingEmbeddings:
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(len(texts))
+        rng = np.random.default_rng(len(texts))
+        return rng.standard_normal((len(texts), 8)).tolist()
+
+
+def test_similarity_scores_match_window_means():
+    encoded = np.random.default_rng(0).standard_normal((20, 4))
+    expected = []
+    for idx in range(1, len(encoded)):
+        context = encoded[max(0, idx - 3):idx].mean(axis=0)
+        expected.append(context @ encoded[idx] / (np.linalg.norm(context) * np.linalg.norm(encoded[idx]) + 1e-10))
+    assert np.allclose(_calculate_similarity_scores(encoded, 3), expected)
+
+
+def test_splits_are_embedded_once_across_documents():
+    embeddings = CountingEmbeddings()
+    docs = [Document(page_content=" ".join(f"word{i}" for i in range(400 * n)), metadata={"n": n}) for n in (1, 2)]
+    config = {"embedding": embeddings, "max_doc_size": 20, "batch_size": 8}
+    chunks = list(statistical_chunker(iter(docs), config))
+    assert len(embeddings.calls) == 1
+    for n in (1, 2):
+        content = "".join(chunk.page_content for chunk in chunks if chunk.metadata["n"] == n)
+        assert content.replace(" ", "") == docs[n - 1].page_content.replace(" ", "")
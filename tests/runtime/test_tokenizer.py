@@ -0,0 +1,37 @@
+import pytest
+
+pytest.importorskip("tiktoken")
+pytest.importorskip("langchain_text_splitters")
+
+from langchain_text_splitters import TokenTextSplitter
+
+from alita_sdk.tools.chunkers.utils import (
+    encode_batch, get_encoder, split_by_tokens, tiktoken_length, tiktoken_lengths
+)
+
+TEXT = "Token counting shows up at the top of indexing profiles. " * 40
+
+
+def test_encoder_is_shared():
+    assert get_encoder() is get_encoder()
+
+
+def test_batch_lengths_match_single_lengths():
+    texts = [TEXT, "short", ""]
+    assert tiktoken_lengths(texts) == [tiktoken_length(text) for text in texts]
+    assert [len(tokens) for tokens in encode_batch(texts)] == tiktoken_lengths(texts)
+
+
+@pytest.mark.parametrize("chunk_size,chunk_overlap", [(50, 0), (64, 10), (10000, 0)])
+def test_split_by_tokens_matches_token_text_splitter(chunk_size, chunk_overlap):
+    expected = TokenTextSplitter(encoding_name="cl100k_base", chunk_size=chunk_size,
+                                 chunk_overlap=chunk_overlap).split_text(TEXT)
+    pieces = split_by_tokens(TEXT, chunk_size, chunk_overlap)
+    assert [piece for piece, _ in pieces] == expected
+    assert all(count <= chunk_size for _, count in pieces)
+
+
+@pytest.mark.parametrize("chunk_overlap", [50, 60])
+def test_split_by_tokens_rejects_overlap_not_smaller_than_chunk(chunk_overlap):
+    with pytest.raises(ValueError):
+        split_by_tokens(TEXT, 50, chunk_overlap, tokens=list(range(200)))
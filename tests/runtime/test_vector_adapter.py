@@ -0,0 +1,158 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock, Mock
+
+import pytest
+
+from alita_sdk.runtime.langchain.tools import vector
+from alita_sdk.runtime.langchain.tools.vector import VectorAdapter
+
+
+class Chroma:
+    """ Vectorstore stub, adapter behaviour depends on the class name """
+
+    embeddings = None
+
+    def __init__(self, results=()):
+        self.results = list(results)
+        self.calls = []
+
+    def similarity_search_with_score_by_vector(self, embedding, k, filter=None):
+        self.calls.append({"embedding": embedding, "k": k, "filter": filter})
+        return self.results[:k]
+
+
+class PGVector(Chroma):
+    pass
+
+
+def _doc(group, name):
+    return SimpleNamespace(page_content=name, metadata={"chunk_type": group, "name": name})
+
+
+def test_search_per_group_uses_single_filtered_search():
+    store = Chroma([(_doc("title", "t1"), 0.9), (_doc("summary", "s1"), 0.8), (_doc("title", "t2"), 0.7),
+                    (_doc("title", "t3"), 0.6), (_doc("other", "o1"), 0.5)])
+    results = VectorAdapter(store).search_by_vector_per_group(
+        [0.1], "chunk_type", ["title", "summary", "title"], k=2, filter={"source": "a"})
+
+    assert len(store.calls) == 1
+    assert store.calls[0]["k"] == 4
+    assert store.calls[0]["filter"] == {"$and": [{"source": "a"}, {"chunk_type": {"$in": ["title", "summary"]}}]}
+    assert {group: [doc.page_content for doc, _ in items] for group, items in results.items()} == {
+        "title": ["t1", "t2"], "summary": ["s1"]}
+
+
+def test_search_per_group_without_values():
+    store = Chroma()
+    assert VectorAdapter(store).search_by_vector_per_group([0.1], "chunk_type", [], k=2) == {}
+    assert store.calls == []
+
+
+def test_search_per_group_falls_back_when_windowed_query_fails():
+    store = PGVector([(_doc("title", "t1"), 0.9)])
+    adapter = VectorAdapter(store)
+    adapter._pgvector_search_per_group = Mock(side_effect=RuntimeError("no window functions"))
+    results = adapter.search_by_vector_per_group([0.1], "chunk_type", ["title"], k=1)
+    assert [doc.page_content for doc, _ in results["title"]] == ["t1"]
+
+
+def test_key_lookup_is_pgvector_only():
+    assert VectorAdapter(PGVector()).supports_key_lookup
+    assert not VectorAdapter(Chroma()).supports_key_lookup
+    with pytest.raises(RuntimeError):
+        VectorAdapter(Chroma()).get_data_by_keys("id", ["1"])
+
+
+def test_get_data_by_keys_without_keys_skips_query():
+    adapter = VectorAdapter(PGVector())
+    adapter._pgvector_engine = Mock(side_effect=AssertionError("no query expected"))
+    assert adapter.get_data_by_keys("id", [None]) == {"ids": [], "metadatas": []}
+
+
+def test_get_data_by_keys_queries_collection(monkeypatch):
+    orm = pytest.importorskip("sqlalchemy.orm")
+    store = PGVector()
+    store.EmbeddingStore = MagicMock()
+    store.get_collection = Mock(return_value=SimpleNamespace(uuid="collection"))
+    session = MagicMock()
+    session.__enter__.return_value = session
+    session.query.return_value.filter.return_value.filter.return_value = iter([
+        ("db-1", {"id": "1"}), ("db-2", {"id": "2", "chunk_id": 2})])
+    monkeypatch.setattr(orm, "Session", Mock(return_value=session))
+
+    adapter = VectorAdapter(store)
+    adapter._pgvector_engine = Mock()
+    adapter._pgvector_ensure_key_index = Mock()
+    data = adapter.get_data_by_keys("id", [1, 2, None])
+
+    assert data == {"ids": ["db-1", "db-2"], "metadatas": [{"id": "1"}, {"id": "2", "chunk_id": 2}]}
+    adapter._pgvector_ensure_key_index.assert_called_once_with("id")
+    store.EmbeddingStore.cmetadata["id"].astext.in_.assert_called_once_with(["1", "2"])
+
+
+def test_chroma_collection_metadata_update_keeps_other_keys():
+    store = Chroma()
+    store._collection = SimpleNamespace(metadata={"hnsw:space": "cosine", "owner": "x"}, modify=Mock())
+    adapter = VectorAdapter(store)
+
+    assert adapter.get_collection_metadata() == {"hnsw:space": "cosine", "owner": "x"}
+    adapter.update_collection_metadata({"indexed_commit": "abc"})
+    # distance function can not be passed to modify
+    store._collection.modify.assert_called_once_with(metadata={"owner": "x", "indexed_commit": "abc"})
+
+
+def _embedding_store():
+    sqlalchemy = pytest.importorskip("sqlalchemy")
+    from sqlalchemy.dialects.postgresql import JSONB
+    from sqlalchemy.orm import declarative_base
+
+    class EmbeddingStore(declarative_base()):
+        __tablename__ = "embeddings"
+        id = sqlalchemy.Column(sqlalchemy.String, primary_key=True)
+        collection_id = sqlalchemy.Column(sqlalchemy.String)
+        cmetadata = sqlalchemy.Column(JSONB)
+
+    return EmbeddingStore
+
+
+def _key_index_adapter(monkeypatch, valid):
+    from sqlalchemy.dialects import postgresql
+
+    monkeypatch.setattr(vector, "_KEY_INDEXES", set())
+    monkeypatch.setattr(vector, "_KEY_INDEXES_PENDING", set())
+    store = PGVector()
+    store.EmbeddingStore = _embedding_store()
+    connection = MagicMock()
+    connection.__enter__.return_value = connection
+    connection.execute.return_value.scalar.side_effect = valid
+    engine = MagicMock(url="postgresql://db")
+    engine.get_execution_options.return_value = {}
+    engine.connect.return_value.execution_options.return_value = connection
+    adapter = VectorAdapter(store)
+    adapter._pgvector_engine = Mock(return_value=engine)
+
+    def statements():
+        return [str(call.args[0].compile(dialect=postgresql.dialect())) for call in connection.execute.call_args_list]
+    return adapter, engine, statements
+
+
+def test_key_index_is_created_concurrently(monkeypatch):
+    adapter, engine, statements = _key_index_adapter(monkeypatch, [None, True])
+    adapter._pgvector_ensure_key_index("id")
+    adapter._pgvector_ensure_key_index("id")
+
+    engine.connect.return_value.execution_options.assert_called_once_with(isolation_level="AUTOCOMMIT")
+    created = [sql for sql in statements() if "INDEX" in sql]
+    assert created == ["CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_embeddings_cmetadata_id "
+                       "ON embeddings (collection_id, (cmetadata ->> 'id'))"]
+
+
+def test_invalid_key_index_is_recreated_and_failures_retried(monkeypatch):
+    adapter, engine, statements = _key_index_adapter(monkeypatch, [False, False, False, True])
+    adapter._pgvector_ensure_key_index("id")
+    # failed build is not remembered as done
+    adapter._pgvector_ensure_key_index("id")
+
+    assert [" ".join(sql.split()[:3]) for sql in statements() if "INDEX" in sql] == [
+        "DROP INDEX CONCURRENTLY", "CREATE INDEX CONCURRENTLY"] * 2
+    assert len(vector._KEY_INDEXES) == 1
@@ -0,0 +1,46 @@
+from unittest.mock import Mock
+
+import pytest
+
+pytest.importorskip("langchain_core")
+pytest.importorskip("pydantic")
+
+from langchain_core.documents import Document
+
+from alita_sdk.runtime.tools.vectorstore import VectorStoreWrapper
+
+
+def _chunk(source, chunk_id):
+    return Document(page_content=f"{source}:{chunk_id}",
+                    metadata={"source": source, "chunk_id": chunk_id, "chunk_type": "document"})
+
+
+def test_fetch_document_chunks_uses_single_search():
+    adapter = Mock()
+    adapter.search_by_vector.return_value = [
+        (_chunk("a", 1), 0.9), (_chunk("a", 1), 0.8), (_chunk("b", 2), 0.7), (_chunk("c", 3), 0.6)]
+    wrapper = VectorStoreWrapper.model_construct(vectoradapter=adapter)
+
+    found = wrapper._fetch_document_chunks([0.1], [("a", 1), ("b", 2)], {"library": "x"})
+
+    assert [(doc.page_content, score) for doc, score in found] == [("a:1", 0.9), ("b:2", 0.7)]
+    adapter.search_by_vector.assert_called_once()
+    kwargs = adapter.search_by_vector.call_args.kwargs
+    assert kwargs["k"] == 4
+    assert kwargs["filter"] == {"$and": [{"library": "x"}, {"$and": [
+        {"chunk_type": {"$eq": "document"}},
+        {"$or": [{"$and": [{"source": {"$eq": "a"}}, {"chunk_id": {"$eq": 1}}]},
+                 {"$and": [{"source": {"$eq": "b"}}, {"chunk_id": {"$eq": 2}}]}]},
+    ]}]}
+
+
+def test_fetch_single_document_chunk_without_or():
+    adapter = Mock()
+    adapter.search_by_vector.return_value = []
+    wrapper = VectorStoreWrapper.model_construct(vectoradapter=adapter)
+
+    assert wrapper._fetch_document_chunks([0.1], [("a", 1)], None) == []
+    assert adapter.search_by_vector.call_args.kwargs["filter"] == {"$and": [
+        {"chunk_type": {"$eq": "document"}},
+        {"$and": [{"source": {"$eq": "a"}}, {"chunk_id": {"$eq": 1}}]},
+    ]}